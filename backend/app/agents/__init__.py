@@ -2,38 +2,39 @@
 CrewAI Agents Module
 """
 
-from app.agents.entity_structuring_agent import (
-    create_entity_structuring_agent,
-    create_entity_structuring_task
-)
-from app.agents.icd_coding_agent import (
-    create_icd_coding_agent,
-    create_icd_coding_task
-)
-from app.agents.cpt_coding_agent import (
-    create_cpt_coding_agent,
-    create_cpt_coding_task
-)
-from app.agents.hcpcs_coding_agent import (
-    create_hcpcs_coding_agent,
-    create_hcpcs_coding_task
-)
-from app.agents.crew import MedicalCodingCrew, get_medical_coding_crew
+import importlib
 
-__all__ = [
+
+_EXPORTS = {
     # Entity Structuring
-    "create_entity_structuring_agent",
-    "create_entity_structuring_task",
+    "create_entity_structuring_agent": "app.agents.entity_structuring_agent",
+    "create_entity_structuring_task": "app.agents.entity_structuring_agent",
     # ICD Coding
-    "create_icd_coding_agent",
-    "create_icd_coding_task",
+    "create_icd_coding_agent": "app.agents.icd_coding_agent",
+    "create_icd_coding_task": "app.agents.icd_coding_agent",
     # CPT Coding
-    "create_cpt_coding_agent",
-    "create_cpt_coding_task",
+    "create_cpt_coding_agent": "app.agents.cpt_coding_agent",
+    "create_cpt_coding_task": "app.agents.cpt_coding_agent",
     # HCPCS Coding
-    "create_hcpcs_coding_agent",
-    "create_hcpcs_coding_task",
+    "create_hcpcs_coding_agent": "app.agents.hcpcs_coding_agent",
+    "create_hcpcs_coding_task": "app.agents.hcpcs_coding_agent",
     # Crew
-    "MedicalCodingCrew",
-    "get_medical_coding_crew"
-]
+    "MedicalCodingCrew": "app.agents.crew",
+    "CodingRunOutput": "app.agents.crew",
+    "get_medical_coding_crew": "app.agents.crew",
+    # Stage graph
+    "CREW_STAGES": "app.agents.stages",
+    "STAGE_DEPENDENCIES": "app.agents.stages",
+}
+
+
+def __getattr__(name: str):
+    # Submodules are imported on first attribute access so that importing
+    # the package does not pull in CrewAI
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
+
+
+__all__ = list(_EXPORTS)
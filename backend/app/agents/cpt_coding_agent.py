@@ -3,14 +3,15 @@ CPT-4 Coding Agent
 Assigns CPT-4 procedure codes using RAG
 """
 
-from crewai import Agent, Task
+from typing import Optional
+from crewai import Agent, Task, LLM
 from app.core.llm_config import llm_models
 from app.tools.cpt_search_tool import CPT_Vector_Search_Tool
 from app.models.cpt_models import CPTCodingOutput
 
 
-def create_cpt_coding_agent() -> Agent:
-    """Create the CPT-4 coding agent"""
+def create_cpt_coding_agent(llm: Optional[LLM] = None) -> Agent:
+    """Create the CPT-4 coding agent (``llm`` overrides the stage's primary model)"""
     return Agent(
         role="CPT-4 Coding Agent",
         goal="Assign the most accurate CPT-4 procedure and service codes using RAG",
@@ -33,9 +34,9 @@ def create_cpt_coding_agent() -> Agent:
         - Return ONLY structured output conforming to the CPT output schema
         """,
         tools=[CPT_Vector_Search_Tool],
-        max_rpm=20,
         max_iter=5,
-        llm=llm_models.get_cpt_coding_llm(),
+        max_retry_limit=0,  # stage_retry_policy owns retries and failover
+        llm=llm if llm is not None else llm_models.get_cpt_coding_llm(),
         verbose=True,
         allow_delegation=False
     )
@@ -3,7 +3,19 @@ CrewAI Crew Configuration
 Orchestrates all agents and tasks for medical coding pipeline
 """
 
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional, Any
 from crewai import Crew
+from app.core.config import settings
+from app.core.llm_config import llm_models
+from app.core.llm_retry import stage_retry_policy
+from app.core.hedging import stage_hedger
+from app.core.cancellation import raise_if_request_cancelled
+from app.core.completion_cache import llm_stage
+from app.core.vector_db import vector_db
+from app.core.observability import observability
+from app.agents.stages import CREW_STAGES, STAGE_DEPENDENCIES
 from app.agents.entity_structuring_agent import (
     create_entity_structuring_agent,
     create_entity_structuring_task
@@ -22,66 +34,189 @@ from app.agents.hcpcs_coding_agent import (
 )
 
 
+STAGE_FACTORIES = {
+    "entities": (create_entity_structuring_agent, create_entity_structuring_task),
+    "icd_codes": (create_icd_coding_agent, create_icd_coding_task),
+    "hcpcs_codes": (create_hcpcs_coding_agent, create_hcpcs_coding_task),
+    "cpt_codes": (create_cpt_coding_agent, create_cpt_coding_task),
+}
+
+
+class CodingRunOutput:
+    """Name-keyed results of a single crew run"""
+
+    def __init__(self):
+        self.stage_outputs: Dict[str, Any] = {}
+        self.stage_attempts: Dict[str, List[Dict[str, Any]]] = {}
+        self.token_usage: Dict[str, Any] = {}
+
+    def add_token_usage(self, usage) -> None:
+        """Accumulate a stage's CrewAI UsageMetrics into the run totals"""
+        if usage is None:
+            return
+        try:
+            usage = usage.model_dump()
+        except AttributeError:
+            usage = dict(getattr(usage, "__dict__", {}))
+        for key, value in usage.items():
+            if isinstance(value, (int, float)):
+                self.token_usage[key] = self.token_usage.get(key, 0) + value
+
+
 class MedicalCodingCrew:
-    """Medical coding crew with all agents and tasks"""
-    
+    """
+    Medical coding crew with all agents and tasks.
+
+    Stages run as a small DAG: entity structuring, then ICD coding, then
+    HCPCS and CPT coding concurrently. Every run builds fresh agents and
+    tasks so concurrent kickoffs never share task state. A failing stage is
+    retried (and failed over to its fallback models) on its own, reusing
+    the outputs of the stages that already completed.
+    """
+
     def __init__(self, verbose: bool = False):
         self.verbose = verbose
-        self._crew = None
+        self.parallel = settings.PIPELINE_PARALLEL_STAGES
+        self.prefetch_retrieval = settings.PIPELINE_PREFETCH_RETRIEVAL
+        # Own thread for the prefetch, so it never takes a stage worker
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="retrieval-prefetch")
         self._initialized = False
-    
+
     def initialize(self):
-        """Initialize all agents and tasks"""
+        """Initialize the LLM clients shared by all stage agents"""
         if not self._initialized:
-            # Create agents
-            self.entity_agent = create_entity_structuring_agent()
-            self.icd_agent = create_icd_coding_agent()
-            self.cpt_agent = create_cpt_coding_agent()
-            self.hcpcs_agent = create_hcpcs_coding_agent()
-            
-            # Create tasks
-            self.entity_task = create_entity_structuring_task(self.entity_agent)
-            self.icd_task = create_icd_coding_task(self.icd_agent)
-            self.hcpcs_task = create_hcpcs_coding_task(self.hcpcs_agent)
-            self.cpt_task = create_cpt_coding_task(self.cpt_agent)
-            
-            # Create crew
-            self._crew = Crew(
-                agents=[
-                    self.entity_agent,
-                    self.icd_agent,
-                    self.hcpcs_agent,
-                    self.cpt_agent
-                ],
-                tasks=[
-                    self.entity_task,
-                    self.icd_task,
-                    self.hcpcs_task,
-                    self.cpt_task
-                ],
-                verbose=self.verbose
-            )
-            
+            llm_models.initialize()
             self._initialized = True
-    
-    def kickoff(self, medical_report_text: str):
+
+    def warmup(self):
+        """Initialize the LLM clients and build every stage agent and task once"""
+        self.initialize()
+        for create_agent, create_task in STAGE_FACTORIES.values():
+            create_task(create_agent())
+
+    def kickoff(
+        self,
+        medical_report_text: str,
+        on_stage_start: Optional[Callable[[str], None]] = None,
+        on_stage_complete: Optional[Callable[[str, Any], None]] = None
+    ) -> CodingRunOutput:
         """
         Execute the medical coding pipeline.
-        
+
         Args:
             medical_report_text: The clinical text to process
-            
+            on_stage_start: Optional callable invoked with the stage name
+                when a stage starts
+            on_stage_complete: Optional callable invoked as
+                ``on_stage_complete(stage_name, task_output)`` when a stage ends
+
         Returns:
-            CrewOutput with results from all tasks
+            CodingRunOutput with name-keyed task outputs and token usage
         """
         self.initialize()
-        return self._crew.kickoff(inputs={"medical_report_text": medical_report_text})
-    
-    @property
-    def crew(self) -> Crew:
-        """Get the crew instance"""
-        self.initialize()
-        return self._crew
+        inputs = {"medical_report_text": medical_report_text}
+        run_output = CodingRunOutput()
+        tasks = {}
+
+        if self.prefetch_retrieval:
+            # Entity-independent retrieval setup overlaps the entity stage
+            prefetch = self._submit(self._prefetch_executor, self._prepare_retrieval)
+            prefetch.add_done_callback(self._report_prefetch)
+
+        max_workers = 3 if self.parallel else 1
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crew-stage") as executor:
+            pending = set(CREW_STAGES)
+            running = {}
+
+            while pending or running:
+                ready = [
+                    stage for stage in CREW_STAGES
+                    if stage in pending
+                    and all(dep in run_output.stage_outputs for dep in STAGE_DEPENDENCIES[stage])
+                ]
+                if ready:
+                    raise_if_request_cancelled()
+                for stage in ready:
+                    pending.discard(stage)
+                    if on_stage_start is not None:
+                        on_stage_start(stage)
+                    future = self._submit(executor, self._run_stage, stage, inputs, tasks)
+                    running[future] = stage
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    task_output, usage, attempts = future.result()
+                    run_output.stage_outputs[stage] = task_output
+                    run_output.stage_attempts[stage] = attempts
+                    run_output.add_token_usage(usage)
+                    if on_stage_complete is not None:
+                        on_stage_complete(stage, task_output)
+
+        return run_output
+
+    @staticmethod
+    def _submit(executor: ThreadPoolExecutor, fn, *args):
+        """Submit work carrying the caller's context so tracing spans nest"""
+        ctx = contextvars.copy_context()
+        return executor.submit(ctx.run, fn, *args)
+
+    def _run_stage(self, stage: str, inputs: Dict[str, str], tasks: Dict[str, Any]):
+        """
+        Run one stage with retries, model failover and (if enabled) hedging.
+
+        Returns:
+            Tuple of (task_output, usage, attempt records)
+        """
+        create_agent, create_task = STAGE_FACTORIES[stage]
+        langfuse = observability.get_langfuse()
+        candidates = llm_models.get_stage_llms(stage)
+        hedge_candidates = llm_models.get_stage_llms(stage, fallbacks=True)
+
+        def run_once(llm):
+            agent = create_agent(llm)
+            task = create_task(agent)
+            task.context = [tasks[dep] for dep in STAGE_DEPENDENCIES[stage]]
+            with langfuse.start_as_current_span(name=f"Coding Stage: {stage}"):
+                crew = Crew(agents=[agent], tasks=[task], verbose=self.verbose)
+                crew_output = crew.kickoff(inputs=inputs)
+            return crew_output.tasks_output[0], crew_output.token_usage, task
+
+        def attempt(llm):
+            # Hedge on the first candidate other than the model being tried
+            hedge_model, hedge_llm = next(
+                ((model, other) for model, other in hedge_candidates if other is not llm), (None, None)
+            )
+            return stage_hedger.run(
+                stage,
+                lambda: run_once(llm),
+                (lambda: run_once(hedge_llm)) if hedge_llm is not None else None,
+                hedge_model,
+                is_valid=lambda result: getattr(result[0], "pydantic", None) is not None
+            )
+
+        with llm_stage(stage):
+            ((task_output, usage, task), hedge), attempts = stage_retry_policy.run(
+                stage, candidates, attempt
+            )
+        if hedge is not None:
+            attempts[-1].update(hedge)
+        # Dependent stages read their context from the winning task
+        tasks[stage] = task
+        return task_output, usage, attempts
+
+    @staticmethod
+    def _prepare_retrieval():
+        """Load the embedding model and open index handles ahead of the ICD stage"""
+        vector_db.initialize()
+        vector_db.open_indexes()
+
+    @staticmethod
+    def _report_prefetch(future: Future):
+        """Log a failed prefetch; the search tools retry the setup and raise on their own"""
+        error = future.exception()
+        if error is not None:
+            print(f"⚠️  Retrieval prefetch failed: {type(error).__name__}: {error}")
 
 
 def get_medical_coding_crew(verbose: bool = False) -> MedicalCodingCrew:
@@ -3,13 +3,14 @@ Medical Entity Structuring Agent
 Extracts and structures medical entities from clinical text
 """
 
-from crewai import Agent, Task
+from typing import Optional
+from crewai import Agent, Task, LLM
 from app.core.llm_config import llm_models
 from app.models.entities import StructuredMedicalEntities
 
 
-def create_entity_structuring_agent() -> Agent:
-    """Create the medical entity structuring agent"""
+def create_entity_structuring_agent(llm: Optional[LLM] = None) -> Agent:
+    """Create the medical entity structuring agent (``llm`` overrides the stage's primary model)"""
     return Agent(
         role="Medical Entity Structuring Agent",
         goal="Convert raw medical prescription content into coding-ready structured entities",
@@ -31,11 +32,11 @@ def create_entity_structuring_agent() -> Agent:
 
         return ONLY structured output conforming to the Structured_Medical_Entities model
         """,
-        max_rpm=2,
         max_iter=5,
+        max_retry_limit=0,  # stage_retry_policy owns retries and failover
         verbose=True,
         allow_delegation=False,
-        llm=llm_models.get_entity_structuring_llm()
+        llm=llm if llm is not None else llm_models.get_entity_structuring_llm()
     )
 
 
@@ -3,14 +3,15 @@ HCPCS Level II Coding Agent
 Assigns HCPCS codes for supplies, drugs, and equipment using RAG
 """
 
-from crewai import Agent, Task
+from typing import Optional
+from crewai import Agent, Task, LLM
 from app.core.llm_config import llm_models
 from app.tools.hcpcs_search_tool import HCPCS_Vector_Search_Tool
 from app.models.hcpcs_models import HCPCSCodingOutput
 
 
-def create_hcpcs_coding_agent() -> Agent:
-    """Create the HCPCS Level II coding agent"""
+def create_hcpcs_coding_agent(llm: Optional[LLM] = None) -> Agent:
+    """Create the HCPCS Level II coding agent (``llm`` overrides the stage's primary model)"""
     return Agent(
         role="HCPCS Level II Coding Agent",
         goal="Assign the most accurate HCPCS Level II codes for supplies, drugs, and equipment using RAG",
@@ -32,9 +33,9 @@ def create_hcpcs_coding_agent() -> Agent:
         - Return ONLY structured output conforming to the HCPCS output schema
         """,
         tools=[HCPCS_Vector_Search_Tool],
-        max_rpm=20,
         max_iter=5,
-        llm=llm_models.get_hcpcs_coding_llm(),
+        max_retry_limit=0,  # stage_retry_policy owns retries and failover
+        llm=llm if llm is not None else llm_models.get_hcpcs_coding_llm(),
         verbose=True,
         allow_delegation=False
     )
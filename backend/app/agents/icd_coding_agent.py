@@ -3,14 +3,15 @@ ICD-10-CM Coding Agent
 Assigns ICD-10-CM diagnosis codes using RAG
 """
 
-from crewai import Agent, Task
+from typing import Optional
+from crewai import Agent, Task, LLM
 from app.core.llm_config import llm_models
 from app.tools.icd_search_tool import ICD_Vector_Search_Tool
 from app.models.icd_models import ICDCodingOutput
 
 
-def create_icd_coding_agent() -> Agent:
-    """Create the ICD-10-CM coding agent"""
+def create_icd_coding_agent(llm: Optional[LLM] = None) -> Agent:
+    """Create the ICD-10-CM coding agent (``llm`` overrides the stage's primary model)"""
     return Agent(
         role="ICD-10-CM Coding Agent",
         goal="Assign the most accurate and specific ICD-10-CM diagnosis codes using RAG",
@@ -31,9 +32,9 @@ def create_icd_coding_agent() -> Agent:
         - Return ONLY valid JSON matching the ICD output schema
         """,
         tools=[ICD_Vector_Search_Tool],
-        max_rpm=20,
         max_iter=5,
-        llm=llm_models.get_icd_coding_llm(),
+        max_retry_limit=0,  # stage_retry_policy owns retries and failover
+        llm=llm if llm is not None else llm_models.get_icd_coding_llm(),
         verbose=True,
         allow_delegation=False
     )
@@ -0,0 +1,16 @@
+"""
+Pipeline Stage Graph
+Stage names and dependencies, importable without loading CrewAI
+"""
+
+# Pipeline stages in topological order, named after the CodingResult fields
+CREW_STAGES = ("entities", "icd_codes", "hcpcs_codes", "cpt_codes")
+
+# Upstream stages whose outputs are passed to each stage as task context.
+# HCPCS and CPT only need the entities and ICD codes, so they run in parallel.
+STAGE_DEPENDENCIES = {
+    "entities": (),
+    "icd_codes": ("entities",),
+    "hcpcs_codes": ("entities", "icd_codes"),
+    "cpt_codes": ("entities", "icd_codes"),
+}
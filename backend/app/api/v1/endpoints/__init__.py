@@ -4,5 +4,12 @@ API v1 Endpoints Module
 
 from app.api.v1.endpoints.health import router as health_router
 from app.api.v1.endpoints.coding import router as coding_router
+from app.api.v1.endpoints.jobs import router as jobs_router
+from app.api.v1.endpoints.evaluations import router as evaluations_router
+from app.api.v1.endpoints.metrics import router as metrics_router
+from app.api.v1.endpoints.cache import router as cache_router
 
-__all__ = ["health_router", "coding_router"]
+__all__ = [
+    "health_router", "coding_router", "jobs_router", "evaluations_router",
+    "metrics_router", "cache_router"
+]
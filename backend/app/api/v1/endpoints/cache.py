@@ -0,0 +1,61 @@
+"""
+Cache Management API Endpoints
+Explicit invalidation of cached results
+"""
+
+from typing import Any, Dict, Optional
+from fastapi import APIRouter
+from app.core.retrieval_cache import retrieval_cache
+from app.core.result_cache import result_cache
+from app.core.completion_cache import completion_cache
+
+router = APIRouter()
+
+
+@router.post(
+    "/retrieval/invalidate",
+    summary="Invalidate Retrieval Cache",
+    description="Drop cached vector search results, e.g. after an index rebuild"
+)
+async def invalidate_retrieval_cache(index: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Invalidate cached retrieval results.
+
+    Args:
+        index: Index name (e.g. "icd10"); all indexes if omitted
+
+    Returns:
+        Number of cache entries removed
+    """
+    removed = retrieval_cache.invalidate(index)
+    return {"index": index, "removed": removed}
+
+
+@router.post(
+    "/results/invalidate",
+    summary="Invalidate Pipeline Result Cache",
+    description="Drop every cached pipeline response"
+)
+async def invalidate_result_cache() -> Dict[str, Any]:
+    """
+    Invalidate cached pipeline responses.
+
+    Returns:
+        Number of cache entries removed
+    """
+    return {"removed": result_cache.invalidate()}
+
+
+@router.post(
+    "/completions/invalidate",
+    summary="Invalidate LLM Completion Cache",
+    description="Drop every cached LLM completion, e.g. after changing a prompt"
+)
+async def invalidate_completion_cache() -> Dict[str, Any]:
+    """
+    Invalidate cached LLM completions.
+
+    Returns:
+        Number of cache entries removed
+    """
+    return {"removed": completion_cache.clear()}
@@ -3,14 +3,154 @@ Medical Coding API Endpoints
 Main endpoints for processing medical reports
 """
 
+import json
+import asyncio
+import threading
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+from typing import Any, Dict
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
+from app.agents.stages import CREW_STAGES
 from app.models.requests import ProcessTextRequest
 from app.models.responses import PipelineResponse
-from app.services.coding_pipeline import coding_pipeline_service
+from app.services.coding_pipeline import get_shared_pipeline_service
+from app.services.admission_control import admission_controller
+from app.core.cancellation import cancellation_scope
+from app.utils.exceptions import AdmissionRejectedError, RequestCancelledError
 
 router = APIRouter()
 
+# How often a quiet event stream checks whether its client is still connected
+SSE_DISCONNECT_POLL_SECONDS = 1.0
+
+
+async def run_pipeline(fn, **kwargs) -> PipelineResponse:
+    """
+    Run a blocking pipeline call under admission control.
+    
+    The call executes on the bounded pipeline executor so the event loop
+    stays free; saturation is surfaced as 429/503 with Retry-After.
+    """
+    try:
+        return await admission_controller.run(fn, **kwargs)
+    except AdmissionRejectedError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def stream_pipeline(request: Request, fn, **kwargs) -> StreamingResponse:
+    """
+    Run a blocking pipeline call under admission control and stream its
+    progress as server-sent events.
+    
+    Events:
+        progress: ``{"stage", "status"}`` as each stage starts
+        stage: ``{"stage", "output"}`` with the stage's pydantic output as
+            soon as it completes
+        result: final ``{"success", "trace_id", "token_usage", "evaluation",
+            "evaluation_status", "cache_status", "coalesced", "error"}``
+        error: ``{"error", "status_code"}`` if the call was not admitted
+    
+    An immediate admission rejection is returned as a plain 429 before the
+    stream starts.
+    
+    When the client disconnects, the run is cancelled: a queued run never
+    starts, and a running one stops before its next stage or LLM call (a
+    request already sent to a provider completes). Requests coalesced onto
+    the cancelled run retry on their own.
+    """
+    loop = asyncio.get_running_loop()
+    events: "asyncio.Queue[tuple]" = asyncio.Queue()
+    cancelled = threading.Event()
+    
+    def on_progress(stage: str, status: str, output: Any = None):
+        loop.call_soon_threadsafe(events.put_nowait, (stage, status, output))
+    
+    def run_cancellable(**call_kwargs) -> PipelineResponse:
+        if cancelled.is_set():
+            raise RequestCancelledError("Request cancelled before it started")
+        with cancellation_scope(cancelled):
+            return fn(**call_kwargs)
+    
+    task = asyncio.ensure_future(
+        admission_controller.run(run_cancellable, progress_callback=on_progress, **kwargs)
+    )
+    # Let the task reach its first await so a full queue surfaces as 429 here
+    await asyncio.wait({task}, timeout=0)
+    if task.done() and isinstance(task.exception(), AdmissionRejectedError):
+        e = task.exception()
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    def format_event(stage: str, status: str, output: Any) -> str:
+        if status == "completed" and stage in CREW_STAGES:
+            return sse_event("stage", {
+                "stage": stage,
+                "output": output.model_dump(mode="json") if output is not None else None
+            })
+        return sse_event("progress", {"stage": stage, "status": status})
+    
+    def cancel_run():
+        if not task.done():
+            cancelled.set()
+            task.cancel()
+            print("🛑 Stream client disconnected; pipeline run cancelled")
+    
+    async def event_stream():
+        try:
+            while True:
+                next_event = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait(
+                    {next_event, task},
+                    timeout=SSE_DISCONNECT_POLL_SECONDS,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if next_event in done:
+                    yield format_event(*next_event.result())
+                    continue
+                next_event.cancel()
+                if task.done():
+                    break
+                if await request.is_disconnected():
+                    cancel_run()
+                    return
+            
+            # Events posted before the run finished are already queued
+            while not events.empty():
+                yield format_event(*events.get_nowait())
+            
+            try:
+                result: PipelineResponse = task.result()
+            except AdmissionRejectedError as e:
+                yield sse_event("error", {"error": e.message, "status_code": e.status_code,
+                                          "retry_after": e.retry_after})
+                return
+            yield sse_event("result", result.model_dump(
+                mode="json",
+                include={"success", "trace_id", "token_usage", "evaluation",
+                         "evaluation_status", "cache_status", "coalesced", "error"}
+            ))
+        finally:
+            # Also reached when the server closes the stream on disconnect
+            cancel_run()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 
 @router.post(
     "/process",
@@ -35,9 +175,11 @@ async def process_medical_text(request: ProcessTextRequest) -> PipelineResponse:
     Returns:
         PipelineResponse with coding results and optional evaluation
     """
-    result = coding_pipeline_service.process_text(
+    result = await run_pipeline(
+        get_shared_pipeline_service().process_text,
         medical_report_text=request.medical_report_text,
-        include_evaluation=request.include_evaluation
+        include_evaluation=request.include_evaluation,
+        bypass_cache=request.bypass_cache
     )
     
     if not result.success:
@@ -57,7 +199,8 @@ async def process_medical_text(request: ProcessTextRequest) -> PipelineResponse:
 )
 async def process_medical_pdf(
     file: UploadFile = File(..., description="PDF file to process"),
-    include_evaluation: bool = True
+    include_evaluation: bool = True,
+    bypass_cache: bool = False
 ) -> PipelineResponse:
     """
     Process uploaded medical report PDF through the multi-agent coding pipeline.
@@ -65,6 +208,7 @@ async def process_medical_pdf(
     Args:
         file: Uploaded PDF file
         include_evaluation: Whether to include LLM judge evaluation
+        bypass_cache: Recompute even if a cached result exists
         
     Returns:
         PipelineResponse with coding results and optional evaluation
@@ -86,9 +230,11 @@ async def process_medical_pdf(
         )
     
     # Process through pipeline
-    result = coding_pipeline_service.process_pdf_bytes(
+    result = await run_pipeline(
+        get_shared_pipeline_service().process_pdf_bytes,
         pdf_bytes=content,
-        include_evaluation=include_evaluation
+        include_evaluation=include_evaluation,
+        bypass_cache=bypass_cache
     )
     
     if not result.success:
@@ -100,6 +246,81 @@ async def process_medical_pdf(
     return result
 
 
+@router.post(
+    "/process/stream",
+    summary="Stream Medical Report Text Processing",
+    description="Process medical report text and stream each stage's output as server-sent events"
+)
+async def stream_medical_text(request: ProcessTextRequest, http_request: Request) -> StreamingResponse:
+    """
+    Process medical report text, emitting each stage's result as it completes.
+    
+    Entities and ICD codes typically arrive well before the CPT/HCPCS codes
+    and the evaluation, so clients can render them early.
+    
+    Args:
+        request: ProcessTextRequest with medical report text
+        http_request: Raw request, watched for client disconnects
+        
+    Returns:
+        text/event-stream of progress, stage and result events
+    """
+    return await stream_pipeline(
+        http_request,
+        get_shared_pipeline_service().process_text,
+        medical_report_text=request.medical_report_text,
+        include_evaluation=request.include_evaluation,
+        bypass_cache=request.bypass_cache
+    )
+
+
+@router.post(
+    "/process-pdf/stream",
+    summary="Stream Medical Report PDF Processing",
+    description="Upload a medical report PDF and stream each stage's output as server-sent events"
+)
+async def stream_medical_pdf(
+    http_request: Request,
+    file: UploadFile = File(..., description="PDF file to process"),
+    include_evaluation: bool = True,
+    bypass_cache: bool = False
+) -> StreamingResponse:
+    """
+    Process an uploaded medical report PDF, emitting each stage's result as
+    it completes.
+    
+    Args:
+        http_request: Raw request, watched for client disconnects
+        file: Uploaded PDF file
+        include_evaluation: Whether to include LLM judge evaluation
+        bypass_cache: Recompute even if a cached result exists
+        
+    Returns:
+        text/event-stream of progress, stage and result events
+    """
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=400,
+            detail="Only PDF files are supported"
+        )
+    
+    try:
+        content = await file.read()
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to read uploaded file: {str(e)}"
+        )
+    
+    return await stream_pipeline(
+        http_request,
+        get_shared_pipeline_service().process_pdf_bytes,
+        pdf_bytes=content,
+        include_evaluation=include_evaluation,
+        bypass_cache=bypass_cache
+    )
+
+
 @router.post(
     "/process-test-pdf",
     response_model=PipelineResponse,
@@ -108,7 +329,8 @@ async def process_medical_pdf(
 )
 async def process_test_pdf(
     filename: str = "sample_medical_report_1.pdf", 
-    include_evaluation: bool = True
+    include_evaluation: bool = True,
+    bypass_cache: bool = False
 ) -> PipelineResponse:
     """
     Process a test PDF file from the backend folder.
@@ -117,6 +339,7 @@ async def process_test_pdf(
     Args:
         filename: Name of the PDF file in the backend folder
         include_evaluation: Whether to include LLM judge evaluation
+        bypass_cache: Recompute even if a cached result exists
         
     Returns:
         PipelineResponse with coding results and optional evaluation
@@ -133,9 +356,11 @@ async def process_test_pdf(
         )
     
     # Process through pipeline
-    result = coding_pipeline_service.process_pdf(
+    result = await run_pipeline(
+        get_shared_pipeline_service().process_pdf,
         pdf_path=str(pdf_path),
-        include_evaluation=include_evaluation
+        include_evaluation=include_evaluation,
+        bypass_cache=bypass_cache
     )
     
     if not result.success:
@@ -0,0 +1,37 @@
+"""
+Evaluation API Endpoints
+Retrieve LLM judge verdicts produced in deferred evaluation mode
+"""
+
+from fastapi import APIRouter, HTTPException
+from app.models.responses import EvaluationStatusResponse
+from app.services.evaluation_service import evaluation_service
+
+router = APIRouter()
+
+
+@router.get(
+    "/{trace_id}",
+    response_model=EvaluationStatusResponse,
+    summary="Get Evaluation",
+    description="Return the status and, once finished, the LLM judge verdict for a coding run"
+)
+async def get_evaluation(trace_id: str) -> EvaluationStatusResponse:
+    """
+    Poll a deferred judge evaluation.
+
+    Args:
+        trace_id: Trace id returned with the coding result
+
+    Returns:
+        EvaluationStatusResponse with status and, once completed, the evaluation
+    """
+    record = evaluation_service.get(trace_id)
+
+    if record is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Evaluation not found or expired: {trace_id}"
+        )
+
+    return record.to_response()
@@ -2,9 +2,10 @@
 Health Check API Endpoint
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
 from app.core.config import settings
-from app.models.responses import HealthResponse
+from app.models.responses import HealthResponse, ReadinessResponse
+from app.services.warmup_service import warmup_service
 
 router = APIRouter()
 
@@ -27,3 +28,23 @@ async def health_check() -> HealthResponse:
         version=settings.APP_VERSION,
         environment=settings.ENVIRONMENT
     )
+
+
+@router.get(
+    "/ready",
+    response_model=ReadinessResponse,
+    summary="Readiness Check",
+    description="Returns 200 once startup warmup has completed, 503 until then",
+    responses={503: {"model": ReadinessResponse, "description": "Warmup still in progress"}}
+)
+async def readiness_check(response: Response) -> ReadinessResponse:
+    """
+    Readiness endpoint for load balancers and orchestrators.
+    
+    Returns:
+        ReadinessResponse with per-component warmup timings
+    """
+    readiness = warmup_service.status()
+    if not readiness["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessResponse(**readiness)
@@ -0,0 +1,127 @@
+"""
+Coding Job API Endpoints
+Submit pipeline runs asynchronously and poll for their results
+"""
+
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from app.core.config import settings
+from app.models.requests import ProcessTextRequest
+from app.models.jobs import JobSubmitResponse, JobStatusResponse
+from app.services.job_service import job_service
+from app.utils.exceptions import JobQueueFullError
+
+router = APIRouter()
+
+
+def queue_full(error: JobQueueFullError) -> HTTPException:
+    """503 for a saturated job queue, with the same Retry-After hint as the sync endpoints"""
+    return HTTPException(
+        status_code=503,
+        detail=error.message,
+        headers={"Retry-After": str(settings.PIPELINE_RETRY_AFTER_SECONDS)}
+    )
+
+
+@router.post(
+    "",
+    response_model=JobSubmitResponse,
+    status_code=202,
+    summary="Submit Medical Text Job",
+    description="Queue medical report text for coding and return a job id immediately"
+)
+async def submit_text_job(request: ProcessTextRequest) -> JobSubmitResponse:
+    """
+    Queue medical report text for processing by the job workers.
+
+    Args:
+        request: ProcessTextRequest with medical report text
+
+    Returns:
+        JobSubmitResponse with the job id to poll
+    """
+    try:
+        job = job_service.submit_text(
+            medical_report_text=request.medical_report_text,
+            include_evaluation=request.include_evaluation,
+            bypass_cache=request.bypass_cache
+        )
+    except JobQueueFullError as e:
+        raise queue_full(e)
+
+    return JobSubmitResponse(job_id=job.job_id, status=job.status)
+
+
+@router.post(
+    "/pdf",
+    response_model=JobSubmitResponse,
+    status_code=202,
+    summary="Submit Medical PDF Job",
+    description="Upload a medical report PDF for coding and return a job id immediately"
+)
+async def submit_pdf_job(
+    file: UploadFile = File(..., description="PDF file to process"),
+    include_evaluation: bool = True,
+    bypass_cache: bool = False
+) -> JobSubmitResponse:
+    """
+    Queue an uploaded medical report PDF for processing by the job workers.
+
+    Args:
+        file: Uploaded PDF file
+        include_evaluation: Whether to include LLM judge evaluation
+        bypass_cache: Recompute even if a cached result exists
+
+    Returns:
+        JobSubmitResponse with the job id to poll
+    """
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=400,
+            detail="Only PDF files are supported"
+        )
+
+    try:
+        content = await file.read()
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to read uploaded file: {str(e)}"
+        )
+
+    try:
+        job = job_service.submit_pdf_bytes(
+            pdf_bytes=content,
+            include_evaluation=include_evaluation,
+            bypass_cache=bypass_cache
+        )
+    except JobQueueFullError as e:
+        raise queue_full(e)
+
+    return JobSubmitResponse(job_id=job.job_id, status=job.status)
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobStatusResponse,
+    summary="Get Job Status",
+    description="Return status, per-stage progress and the final result of a job"
+)
+async def get_job(job_id: str) -> JobStatusResponse:
+    """
+    Poll a previously submitted coding job.
+
+    Args:
+        job_id: Identifier returned on submission
+
+    Returns:
+        JobStatusResponse with progress and, once finished, the PipelineResponse
+    """
+    job = job_service.get_job(job_id)
+
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job not found or expired: {job_id}"
+        )
+
+    return job_service.job_status(job)
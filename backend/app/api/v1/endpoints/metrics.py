@@ -0,0 +1,52 @@
+"""
+Metrics API Endpoint
+Runtime statistics used for capacity planning
+"""
+
+from typing import Any, Dict
+from fastapi import APIRouter
+from app.core.vector_db import vector_db
+from app.core.retrieval_cache import retrieval_cache
+from app.core.result_cache import result_cache
+from app.core.single_flight import pipeline_flights
+from app.core.rate_limiter import llm_rate_limiter
+from app.core.llm_retry import stage_retry_policy
+from app.core.hedging import stage_hedger
+from app.core.completion_cache import completion_cache
+from app.core.replay import replay
+from app.services.admission_control import admission_controller
+from app.services.job_service import job_service
+from app.services.evaluation_service import evaluation_service
+from app.tools.vector_search import retrieval_stats
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    summary="Runtime Metrics",
+    description="Queue depth, concurrency and wait-time statistics"
+)
+async def get_metrics() -> Dict[str, Any]:
+    """
+    Runtime metrics endpoint.
+
+    Returns:
+        Dictionary of statistics grouped by component
+    """
+    return {
+        "admission": admission_controller.stats(),
+        "jobs": job_service.stats(),
+        "evaluation": evaluation_service.stats(),
+        "embedding_cache": vector_db.cache_stats(),
+        "embedding_batcher": vector_db.batcher_stats(),
+        "retrieval_cache": retrieval_cache.stats(),
+        "result_cache": result_cache.stats(),
+        "coalescing": pipeline_flights.stats(),
+        "llm_rate_limits": llm_rate_limiter.stats(),
+        "llm_retries": stage_retry_policy.stats(),
+        "hedging": stage_hedger.stats(),
+        "completion_cache": completion_cache.stats(),
+        "replay": replay.stats(),
+        "retrieval": retrieval_stats()
+    }
@@ -6,6 +6,10 @@ Combines all v1 routes
 from fastapi import APIRouter
 from app.api.v1.endpoints.health import router as health_router
 from app.api.v1.endpoints.coding import router as coding_router
+from app.api.v1.endpoints.jobs import router as jobs_router
+from app.api.v1.endpoints.evaluations import router as evaluations_router
+from app.api.v1.endpoints.metrics import router as metrics_router
+from app.api.v1.endpoints.cache import router as cache_router
 
 # Create main v1 router
 api_router = APIRouter()
@@ -21,3 +25,26 @@ api_router.include_router(
     prefix="/coding",
     tags=["Medical Coding"]
 )
+
+api_router.include_router(
+    jobs_router,
+    prefix="/coding/jobs",
+    tags=["Coding Jobs"]
+)
+
+api_router.include_router(
+    evaluations_router,
+    prefix="/coding/evaluations",
+    tags=["Evaluations"]
+)
+
+api_router.include_router(
+    metrics_router,
+    tags=["Metrics"]
+)
+
+api_router.include_router(
+    cache_router,
+    prefix="/cache",
+    tags=["Cache"]
+)
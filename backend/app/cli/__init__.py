@@ -0,0 +1,4 @@
+"""
+Command-Line Tools
+Offline utilities run with ``python -m app.cli.<tool>``
+"""
@@ -0,0 +1,322 @@
+"""
+Offline Index Builder
+Embed ICD-10-CM, CPT or HCPCS code tables into local and/or Pinecone indexes
+
+Usage:
+    python -m app.cli.build_index --system icd --input icd10cm.tsv
+    python -m app.cli.build_index --system cpt --input cpt.csv --pinecone --no-local
+"""
+
+import os
+import csv
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from app.core.config import settings
+from app.core.vector_store import LocalVectorStore, get_pinecone_client
+from app.core.lexical_index import LexicalIndex
+from app.core.embedding_runtime import (
+    RUNTIMES,
+    load_embedding_model,
+    output_dimension,
+    truncate_embeddings,
+)
+
+
+# Resident memory of one encoding worker (model + torch runtime), used to
+# size the default worker count; the fp32 0.6B model needs about 3 GB
+WORKER_MEMORY_BYTES = 3 * 1024 ** 3
+MAX_DEFAULT_WORKERS = 2
+
+
+def default_workers() -> int:
+    """
+    Encoding processes to start when --workers is not given.
+
+    Each process holds its own model copy, so the count is capped by the
+    memory available now and by MAX_DEFAULT_WORKERS; the cores are shared
+    between the processes as torch threads either way.
+    """
+    workers = min(MAX_DEFAULT_WORKERS, os.cpu_count() or 1)
+    try:
+        available = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):  # not exposed on this platform
+        return workers
+    return max(1, min(workers, available // WORKER_MEMORY_BYTES))
+
+
+# Default column layout per code system. ICD metadata carries the
+# category/disease fields compress_icd_vector_db_response reads; CPT and
+# HCPCS carry the description compress_vector_db_response reads.
+SYSTEM_DEFAULTS = {
+    "icd": {
+        "index": lambda: settings.PINECONE_INDEX_ICD,
+        "text_column": "disease",
+        "metadata_columns": ["category", "disease"],
+    },
+    "cpt": {
+        "index": lambda: settings.PINECONE_INDEX_CPT,
+        "text_column": "description",
+        "metadata_columns": ["description"],
+    },
+    "hcpcs": {
+        "index": lambda: settings.PINECONE_INDEX_HCPCS,
+        "text_column": "description",
+        "metadata_columns": ["description"],
+    },
+}
+
+PINECONE_UPSERT_BATCH = 100
+
+_worker_model = None
+_worker_batch_size = 32
+_worker_dimension = 0
+
+
+def read_code_table(
+    path: str,
+    id_column: str,
+    text_column: str,
+    metadata_columns: List[str]
+) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+    """
+    Read a CSV/TSV code table.
+
+    Args:
+        path: Table path; ``.tsv``/``.txt`` are tab-separated, others comma
+        id_column: Column holding the code
+        text_column: Column embedded for retrieval
+        metadata_columns: Columns stored as match metadata
+
+    Returns:
+        Tuple of (ids, texts, metadata)
+    """
+    delimiter = "\t" if path.lower().endswith((".tsv", ".txt")) else ","
+    ids, texts, metadata = [], [], []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        missing = {id_column, text_column, *metadata_columns} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"Missing columns in {path}: {sorted(missing)}")
+        for row in reader:
+            code = row[id_column].strip()
+            text = row[text_column].strip()
+            if not code or not text:
+                continue
+            ids.append(code)
+            texts.append(text)
+            metadata.append({column: row[column].strip() for column in metadata_columns})
+    return ids, texts, metadata
+
+
+def _init_worker(model_name: str, runtime: str, dimension: int, batch_size: int, threads: int):
+    """Load the embedding model once per worker process"""
+    global _worker_model, _worker_batch_size, _worker_dimension
+    _worker_model = load_embedding_model(runtime, model_name, threads)
+    _worker_batch_size = batch_size
+    _worker_dimension = output_dimension(_worker_model, dimension)
+
+
+def _encode_chunk(job: Tuple[int, List[str], str]) -> Tuple[int, int]:
+    """Encode one chunk and write it to the checkpoint directory"""
+    chunk_id, texts, checkpoint_dir = job
+    embeddings = _worker_model.encode(texts, batch_size=_worker_batch_size)
+    path = os.path.join(checkpoint_dir, f"chunk_{chunk_id:06d}.npy")
+    np.save(path + ".tmp.npy", truncate_embeddings(embeddings, _worker_dimension))
+    os.replace(path + ".tmp.npy", path)
+    return chunk_id, len(texts)
+
+
+def encode_with_checkpoints(
+    texts: List[str],
+    checkpoint_dir: str,
+    fingerprint: str,
+    model_name: str,
+    runtime: str,
+    dimension: int,
+    workers: int,
+    batch_size: int,
+    chunk_size: int
+) -> np.ndarray:
+    """
+    Embed texts across worker processes, resuming from saved chunks.
+
+    Every finished chunk is written to ``checkpoint_dir``; a rerun with
+    the same fingerprint skips chunks that already exist.
+
+    Returns:
+        Embedding matrix in input order
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    state_path = os.path.join(checkpoint_dir, "checkpoint.json")
+    if os.path.exists(state_path):
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("fingerprint") != fingerprint:
+            raise SystemExit(
+                f"Checkpoint in {checkpoint_dir} belongs to a different input/model; "
+                "remove it or pass another --checkpoint-dir"
+            )
+    else:
+        with open(state_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint, "chunk_size": chunk_size}, f)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    jobs = [
+        (chunk_id, chunk, checkpoint_dir)
+        for chunk_id, chunk in enumerate(chunks)
+        if not os.path.exists(os.path.join(checkpoint_dir, f"chunk_{chunk_id:06d}.npy"))
+    ]
+    done_rows = len(texts) - sum(len(job[1]) for job in jobs)
+    if done_rows:
+        print(f"♻️  Resuming: {done_rows} rows already encoded")
+
+    if jobs:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        started = time.perf_counter()
+        encoded = 0
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(model_name, runtime, dimension, batch_size, threads)
+        ) as pool:
+            for chunk_id, rows in pool.imap_unordered(_encode_chunk, jobs):
+                encoded += rows
+                elapsed = time.perf_counter() - started
+                print(
+                    f"   chunk {chunk_id:>5}  {done_rows + encoded}/{len(texts)} rows  "
+                    f"{encoded / elapsed:,.1f} rows/sec"
+                )
+
+    return np.concatenate([
+        np.load(os.path.join(checkpoint_dir, f"chunk_{chunk_id:06d}.npy"))
+        for chunk_id in range(len(chunks))
+    ])
+
+
+def upsert_to_pinecone(
+    index_name: str,
+    ids: List[str],
+    embeddings: np.ndarray,
+    metadata: List[Dict[str, Any]]
+) -> None:
+    """Upsert vectors into an existing Pinecone index in batches"""
+    index = get_pinecone_client().Index(index_name)
+    started = time.perf_counter()
+    for start in range(0, len(ids), PINECONE_UPSERT_BATCH):
+        end = start + PINECONE_UPSERT_BATCH
+        index.upsert(vectors=[
+            {"id": row_id, "values": vector.tolist(), "metadata": row_metadata}
+            for row_id, vector, row_metadata in zip(ids[start:end], embeddings[start:end], metadata[start:end])
+        ])
+    elapsed = time.perf_counter() - started
+    print(f"📤 Upserted {len(ids)} vectors to Pinecone '{index_name}' ({len(ids) / elapsed:,.1f} rows/sec)")
+
+
+def file_fingerprint(path: str, *extra: str) -> str:
+    """Hash of the input file contents plus build parameters"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    for value in extra:
+        digest.update(value.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build ICD-10-CM / CPT / HCPCS vector indexes")
+    parser.add_argument("--system", required=True, choices=sorted(SYSTEM_DEFAULTS))
+    parser.add_argument("--input", required=True, help="CSV/TSV code table")
+    parser.add_argument("--name", help="Index name (defaults to PINECONE_INDEX_* setting)")
+    parser.add_argument("--version", help="Index version (defaults to a build timestamp)")
+    parser.add_argument("--id-column", default="code")
+    parser.add_argument("--text-column", help="Column to embed")
+    parser.add_argument("--metadata-columns", help="Comma-separated metadata columns")
+    parser.add_argument("--output-dir", default=settings.LOCAL_INDEX_DIR)
+    parser.add_argument("--no-local", action="store_true", help="Skip writing the local index files")
+    parser.add_argument("--pinecone", action="store_true", help="Upsert into the Pinecone index")
+    parser.add_argument("--no-lexical", action="store_true", help="Skip building the BM25 index")
+    parser.add_argument("--runtime", default=settings.EMBEDDING_RUNTIME, choices=RUNTIMES,
+                        help="Embedding runtime; match the API's EMBEDDING_RUNTIME")
+    parser.add_argument("--dimension", type=int, default=settings.EMBEDDING_DIMENSION,
+                        help="Truncated embedding dimension (0 = full); match EMBEDDING_DIMENSION")
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="Encoding processes, each loading its own model copy (~3 GB fp32); "
+                             f"defaults to at most {MAX_DEFAULT_WORKERS}, fewer if free memory is short")
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--chunk-size", type=int, default=2048, help="Rows per checkpoint chunk")
+    parser.add_argument("--checkpoint-dir", help="Defaults to .cache/index_build/<name>")
+    args = parser.parse_args(argv)
+
+    defaults = SYSTEM_DEFAULTS[args.system]
+    name = args.name or defaults["index"]()
+    text_column = args.text_column or defaults["text_column"]
+    metadata_columns = (
+        args.metadata_columns.split(",") if args.metadata_columns
+        else defaults["metadata_columns"]
+    )
+    version = args.version or time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    model_name = settings.EMBEDDING_MODEL_NAME
+    checkpoint_dir = args.checkpoint_dir or os.path.join(".cache", "index_build", name)
+
+    started = time.perf_counter()
+    ids, texts, metadata = read_code_table(args.input, args.id_column, text_column, metadata_columns)
+    if not ids:
+        raise SystemExit(f"No usable rows in {args.input}")
+    print(f"📄 Loaded {len(ids)} {args.system.upper()} rows from {args.input}")
+
+    fingerprint = file_fingerprint(
+        args.input, model_name, args.runtime, str(args.dimension), text_column, str(args.chunk_size)
+    )
+    embeddings = encode_with_checkpoints(
+        texts,
+        checkpoint_dir=checkpoint_dir,
+        fingerprint=fingerprint,
+        model_name=model_name,
+        runtime=args.runtime,
+        dimension=args.dimension,
+        workers=max(1, args.workers),
+        batch_size=args.batch_size,
+        chunk_size=args.chunk_size
+    )
+
+    directory = os.path.join(args.output_dir, name)
+    if not args.no_local:
+        LocalVectorStore.write(
+            directory,
+            ids=ids,
+            embeddings=embeddings,
+            metadata=metadata,
+            manifest={
+                "name": name,
+                "version": version,
+                "model": model_name,
+                "runtime": args.runtime,
+                "code_system": args.system,
+                "source": os.path.basename(args.input),
+                "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }
+        )
+        print(f"💾 Wrote local index {directory} (version {version})")
+
+    if not args.no_lexical:
+        # Built for either backend; the search tools load it from LOCAL_INDEX_DIR
+        LexicalIndex(ids, texts, metadata, name=name, version=version).save(directory)
+        print(f"🔤 Wrote BM25 index {os.path.join(directory, LexicalIndex.FILE)}")
+
+    if args.pinecone:
+        upsert_to_pinecone(name, ids, embeddings, metadata)
+        print(f"ℹ️  Bump PINECONE_INDEX_{args.system.upper()}_VERSION so cached retrievals are refreshed")
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Built '{name}': {len(ids)} rows in {elapsed:,.1f}s ({len(ids) / elapsed:,.1f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Embedding Dimension Benchmark
+Recall@k of truncated (Matryoshka) embeddings against the full dimension
+
+Usage:
+    python -m app.cli.dimension_benchmark --system icd --dimensions 768,512,256,128
+    python -m app.cli.dimension_benchmark --input cpt.csv --system cpt --queries terms.txt
+"""
+
+import time
+import argparse
+from typing import List, Optional
+import numpy as np
+from app.core.config import settings
+from app.core.embedding_runtime import load_embedding_model, truncate_embeddings
+from app.cli.build_index import SYSTEM_DEFAULTS
+from app.cli.embedding_parity import load_sample
+
+
+def top_k_rows(queries: np.ndarray, corpus: np.ndarray, k: int, exclude: Optional[np.ndarray] = None) -> np.ndarray:
+    """Exact top-k corpus rows per query (cosine; inputs are normalized)"""
+    scores = queries @ corpus.T
+    if exclude is not None:
+        scores[np.arange(len(queries)), exclude] = -np.inf
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1)
+    return np.take_along_axis(part, order, axis=1)
+
+
+def recall_at_k(baseline: np.ndarray, candidate: np.ndarray) -> float:
+    """Mean fraction of each baseline top-k list recovered by the candidate"""
+    k = baseline.shape[1]
+    return float(np.mean([
+        len(set(expected) & set(found)) / k
+        for expected, found in zip(baseline.tolist(), candidate.tolist())
+    ]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recall@k of truncated embedding dimensions")
+    parser.add_argument("--system", default="icd", choices=sorted(SYSTEM_DEFAULTS))
+    parser.add_argument("--input", help="CSV/TSV code table (defaults to the built BM25 index)")
+    parser.add_argument("--queries", help="File with one query term per line "
+                                          "(defaults to held-out code descriptions)")
+    parser.add_argument("--dimensions", help="Comma-separated dimensions (defaults to full/2, /4, /8)")
+    parser.add_argument("--corpus-size", type=int, default=20000)
+    parser.add_argument("--query-count", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    corpus_texts = load_sample(args.system, args.input, args.corpus_size, args.seed)
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            query_texts = [line.strip() for line in f if line.strip()][:args.query_count]
+        exclude = None
+    else:
+        # Each description queries the rest of the corpus (its own row excluded)
+        query_texts = corpus_texts[:args.query_count]
+        exclude = np.arange(len(query_texts))
+
+    model = load_embedding_model()
+    full = model.get_sentence_embedding_dimension()
+    print(f"📄 {len(corpus_texts)} {args.system.upper()} descriptions, {len(query_texts)} queries, "
+          f"model {settings.EMBEDDING_MODEL_NAME} ({settings.EMBEDDING_RUNTIME}, {full} dims)")
+
+    started = time.perf_counter()
+    corpus = truncate_embeddings(model.encode(corpus_texts, batch_size=args.batch_size), full)
+    queries = truncate_embeddings(model.encode(query_texts, batch_size=args.batch_size), full)
+    print(f"   encoded in {time.perf_counter() - started:,.1f}s")
+
+    if args.dimensions:
+        dimensions = [int(value) for value in args.dimensions.split(",")]
+    else:
+        dimensions = [full // 2, full // 4, full // 8]
+    dimensions = [full] + [dim for dim in dimensions if 0 < dim < full]
+
+    baseline = top_k_rows(queries, corpus, args.top_k, exclude)
+    header = f"{'dims':>6} {f'recall@{args.top_k}':>10} {'top-1 agree':>12} {'index MB':>9} {'ms/query':>9}"
+    print(header)
+    print("-" * len(header))
+    for dim in dimensions:
+        corpus_dim = truncate_embeddings(corpus, dim)
+        queries_dim = truncate_embeddings(queries, dim)
+        started = time.perf_counter()
+        found = top_k_rows(queries_dim, corpus_dim, args.top_k, exclude)
+        ms_per_query = 1000 * (time.perf_counter() - started) / len(queries_dim)
+        index_mb = corpus_dim.shape[0] * dim * 2 / 1024 / 1024  # float16, as stored locally
+        print(
+            f"{dim:>6} {recall_at_k(baseline, found):>10.4f} "
+            f"{float(np.mean(baseline[:, 0] == found[:, 0])):>12.4f} {index_mb:>9.1f} {ms_per_query:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Embedding Runtime Parity Check
+Compare int8 / bf16 / ONNX embeddings against the fp32 reference
+
+Usage:
+    python -m app.cli.embedding_parity --system icd --runtimes int8,onnx
+    python -m app.cli.embedding_parity --input cpt.csv --system cpt --sample 1000
+"""
+
+import os
+import gc
+import time
+import random
+import argparse
+from typing import List, Tuple
+import numpy as np
+from app.core.config import settings
+from app.core.embedding_runtime import RUNTIMES, load_embedding_model, process_rss_mb
+from app.core.lexical_index import LexicalIndex
+from app.cli.build_index import SYSTEM_DEFAULTS, read_code_table
+
+
+def load_sample(system: str, input_path: str, size: int, seed: int) -> List[str]:
+    """
+    Sample code descriptions from a code table, or from the built BM25 index.
+
+    Args:
+        system: "icd", "cpt" or "hcpcs"
+        input_path: CSV/TSV code table; None to read LOCAL_INDEX_DIR/<index>/lexical.json
+        size: Number of descriptions
+        seed: Sampling seed
+
+    Returns:
+        Sampled descriptions
+    """
+    defaults = SYSTEM_DEFAULTS[system]
+    if input_path:
+        _, texts, _ = read_code_table(input_path, "code", defaults["text_column"], [])
+    else:
+        lexical = LexicalIndex.load(os.path.join(settings.LOCAL_INDEX_DIR, defaults["index"]()))
+        if lexical is None:
+            raise SystemExit("No code table: pass --input or build the index first")
+        texts = lexical.texts
+    texts = list(dict.fromkeys(texts))
+    random.Random(seed).shuffle(texts)
+    return texts[:size]
+
+
+def measure(runtime: str, texts: List[str], batch_size: int, threads: int) -> Tuple[np.ndarray, dict]:
+    """Load one runtime, embed the sample and record load RSS and throughput"""
+    gc.collect()
+    rss_before = process_rss_mb()
+    started = time.perf_counter()
+    model = load_embedding_model(runtime, threads=threads)
+    load_seconds = time.perf_counter() - started
+    rss_loaded = process_rss_mb()
+
+    model.encode(texts[:batch_size], batch_size=batch_size)  # warm-up
+    started = time.perf_counter()
+    embeddings = np.asarray(model.encode(texts, batch_size=batch_size), dtype=np.float32)
+    encode_seconds = time.perf_counter() - started
+
+    del model
+    gc.collect()
+    return embeddings, {
+        "load_s": load_seconds,
+        "rss_mb": rss_loaded - rss_before,
+        "rows_per_s": len(texts) / encode_seconds,
+        "ms_per_row": 1000 * encode_seconds / len(texts),
+    }
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity"""
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return np.sum(a * b, axis=1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report embedding drift of CPU runtimes against fp32")
+    parser.add_argument("--system", default="icd", choices=sorted(SYSTEM_DEFAULTS))
+    parser.add_argument("--input", help="CSV/TSV code table (defaults to the built BM25 index)")
+    parser.add_argument("--runtimes", default="int8,bf16,onnx", help="Comma-separated runtimes to compare")
+    parser.add_argument("--sample", type=int, default=500, help="Number of descriptions")
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--threads", type=int, default=settings.EMBEDDING_NUM_THREADS)
+    parser.add_argument("--min-cosine", type=float, default=0.99,
+                        help="Fail if a runtime's mean cosine to fp32 is below this")
+    args = parser.parse_args(argv)
+
+    runtimes = [runtime.strip().lower() for runtime in args.runtimes.split(",") if runtime.strip()]
+    unknown = set(runtimes) - set(RUNTIMES)
+    if unknown:
+        raise SystemExit(f"Unknown runtimes: {sorted(unknown)}")
+
+    texts = load_sample(args.system, args.input, args.sample, args.seed)
+    print(f"📄 {len(texts)} {args.system.upper()} descriptions, model {settings.EMBEDDING_MODEL_NAME}")
+
+    reference, stats = measure("fp32", texts, args.batch_size, args.threads)
+    header = f"{'runtime':<8} {'mean cos':>9} {'p1 cos':>8} {'min cos':>8} {'ms/row':>8} {'rows/s':>8} {'RSS MB':>8} {'load s':>7}"
+    print(header)
+    print("-" * len(header))
+    print(
+        f"{'fp32':<8} {1.0:>9.5f} {1.0:>8.5f} {1.0:>8.5f} {stats['ms_per_row']:>8.2f} "
+        f"{stats['rows_per_s']:>8.1f} {stats['rss_mb']:>8.0f} {stats['load_s']:>7.1f}"
+    )
+
+    failed = []
+    for runtime in runtimes:
+        if runtime == "fp32":
+            continue
+        try:
+            embeddings, stats = measure(runtime, texts, args.batch_size, args.threads)
+        except Exception as e:
+            print(f"{runtime:<8} unavailable: {e}")
+            failed.append(runtime)
+            continue
+        cosine = cosine_rows(reference, embeddings)
+        mean = float(cosine.mean())
+        print(
+            f"{runtime:<8} {mean:>9.5f} {float(np.percentile(cosine, 1)):>8.5f} {float(cosine.min()):>8.5f} "
+            f"{stats['ms_per_row']:>8.2f} {stats['rows_per_s']:>8.1f} {stats['rss_mb']:>8.0f} {stats['load_s']:>7.1f}"
+        )
+        if mean < args.min_cosine:
+            failed.append(runtime)
+
+    if failed:
+        raise SystemExit(f"❌ Below parity (mean cosine < {args.min_cosine}) or unavailable: {', '.join(failed)}")
+    print(f"✅ All runtimes within parity (mean cosine >= {args.min_cosine})")
+
+
+if __name__ == "__main__":
+    main()
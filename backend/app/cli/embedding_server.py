@@ -0,0 +1,31 @@
+"""
+Embedding Server
+Run one shared embedding model per host for all API workers
+
+Usage:
+    export EMBEDDING_SERVER_AUTHKEY=$(python -c 'import secrets; print(secrets.token_hex(32))')
+    python -m app.cli.embedding_server --address /run/user/1000/medical-coding-embeddings.sock
+    EMBEDDING_SERVER_ADDRESS=/run/user/1000/medical-coding-embeddings.sock uvicorn app.main:app --workers 4
+"""
+
+import argparse
+from app.core.config import settings
+from app.core.embedding_server import EmbeddingServer, default_address
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve embeddings to local API workers")
+    parser.add_argument(
+        "--address",
+        default=settings.EMBEDDING_SERVER_ADDRESS or default_address(),
+        help='Unix socket path (default, created 0600) or "host:port"'
+    )
+    args = parser.parse_args(argv)
+    try:
+        EmbeddingServer(args.address).serve_forever()
+    except KeyboardInterrupt:
+        print("👋 Embedding server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Record / Replay Benchmark
+Record a note's external calls once, then replay it offline under concurrency
+
+Usage:
+    python -m app.cli.replay_bench record --note note.txt --fixture fixtures/note.jsonl
+    python -m app.cli.replay_bench bench --note note.txt --fixture fixtures/note.jsonl \\
+        --requests 50 --concurrency 8 --llm-latency-ms 800 --query-latency-ms 40
+"""
+
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+
+def configure(args, mode: str):
+    """Set the harness environment before any app module reads the settings"""
+    os.environ["REPLAY_MODE"] = mode
+    os.environ["REPLAY_FIXTURE"] = args.fixture
+    # Every request must run the pipeline: no result reuse between runs
+    os.environ["RESULT_CACHE_ENABLED"] = "false"
+    os.environ["SINGLE_FLIGHT_ENABLED"] = "false"
+    os.environ["COMPLETION_CACHE_ENABLED"] = "false"
+    os.environ["EVALUATION_MODE"] = "sync"
+    os.environ["HEDGE_ENABLED"] = "false"
+    if mode == "replay":
+        os.environ["REPLAY_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+        os.environ["REPLAY_QUERY_LATENCY_MS"] = str(args.query_latency_ms)
+        os.environ["REPLAY_LATENCY_JITTER"] = str(args.jitter)
+        os.environ["REPLAY_SEED"] = str(args.seed)
+        if not args.rate_limits:
+            os.environ["LLM_RATE_LIMIT_ENABLED"] = "false"
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))] if ordered else 0.0
+
+
+def record(args):
+    """Run the note once against the live providers and write the fixture"""
+    configure(args, "record")
+    if os.path.exists(args.fixture) and not args.append:
+        os.remove(args.fixture)
+
+    from app.core.replay import replay
+    from app.services import get_shared_pipeline_service
+
+    with open(args.note, encoding="utf-8") as f:
+        note = f.read()
+    started = time.perf_counter()
+    response = get_shared_pipeline_service().process_text(
+        note, include_evaluation=args.evaluate, bypass_cache=True
+    )
+    replay.close()
+    print(f"\n🎙️  Recorded {replay.recorded} exchanges to {args.fixture} "
+          f"in {time.perf_counter() - started:.1f}s (success={response.success})")
+    if not response.success:
+        print(f"❌ {response.error}")
+
+
+def bench(args):
+    """Replay the note ``--requests`` times with ``--concurrency`` callers"""
+    configure(args, "replay")
+
+    from app.core.replay import replay
+    from app.services import get_shared_pipeline_service
+
+    with open(args.note, encoding="utf-8") as f:
+        note = f.read()
+    service = get_shared_pipeline_service()
+
+    def run_one(_) -> Dict[str, float]:
+        started = time.perf_counter()
+        response = service.process_text(note, include_evaluation=args.evaluate, bypass_cache=True)
+        return {"seconds": time.perf_counter() - started, "success": response.success,
+                "error": response.error}
+
+    # One untimed run loads the fixture and builds the crew
+    warm = run_one(0)
+    if not warm["success"]:
+        print(f"❌ Replay failed: {warm['error']}")
+        return
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(run_one, range(args.requests)))
+    wall = time.perf_counter() - started
+
+    latencies = [r["seconds"] for r in results if r["success"]]
+    failures = [r["error"] for r in results if not r["success"]]
+    print(f"\n⏱️  {args.requests} requests, concurrency {args.concurrency}, "
+          f"LLM latency {args.llm_latency_ms} ms, query latency {args.query_latency_ms} ms")
+    print(f"{'throughput':<12} {args.requests / wall:>9.2f} req/s")
+    for label, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+        print(f"{label:<12} {1000 * percentile(latencies, q):>9.1f} ms")
+    print(f"{'failures':<12} {len(failures):>9}")
+    if failures:
+        print(f"   first: {failures[0]}")
+    print(f"replay: {replay.stats()}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record a pipeline run and replay it offline")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("record", "bench"):
+        command = sub.add_parser(name)
+        command.add_argument("--note", required=True, help="Clinical note text file")
+        command.add_argument("--fixture", default="fixtures/replay.jsonl")
+        command.add_argument("--evaluate", action="store_true", help="Include the LLM judge")
+
+    sub.choices["record"].add_argument("--append", action="store_true",
+                                       help="Add to an existing fixture instead of replacing it")
+
+    bench_parser = sub.choices["bench"]
+    bench_parser.add_argument("--requests", type=int, default=20)
+    bench_parser.add_argument("--concurrency", type=int, default=4)
+    bench_parser.add_argument("--llm-latency-ms", type=float, default=0.0,
+                              help="Injected latency per LLM exchange (-1 = recorded)")
+    bench_parser.add_argument("--query-latency-ms", type=float, default=0.0,
+                              help="Injected latency per index query (-1 = recorded)")
+    bench_parser.add_argument("--jitter", type=float, default=0.0,
+                              help="Random +/- fraction of the latency (seeded)")
+    bench_parser.add_argument("--seed", type=int, default=0)
+    bench_parser.add_argument("--rate-limits", action="store_true",
+                              help="Keep the provider rate limits active during replay")
+
+    args = parser.parse_args(argv)
+    record(args) if args.command == "record" else bench(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Worker Memory Report
+Per-worker RSS, PSS and shared/private memory of a multi-worker server (Linux)
+
+Usage:
+    python -m app.cli.worker_memory --pid <gunicorn master pid>
+    python -m app.cli.worker_memory --compare --workers 4 --settle 90
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import subprocess
+from typing import Dict, List
+
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def memory_mb(pid: int) -> Dict[str, float]:
+    """
+    Memory breakdown of one process from /proc/<pid>/smaps_rollup.
+
+    Args:
+        pid: Process id
+
+    Returns:
+        Field -> MB for FIELDS (Pss counts shared pages split between sharers)
+    """
+    totals = dict.fromkeys(FIELDS, 0.0)
+    path = f"/proc/{pid}/smaps_rollup"
+    if not os.path.exists(path):
+        path = f"/proc/{pid}/smaps"  # kernels before 4.14
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            field, _, rest = line.partition(":")
+            if field in totals:
+                totals[field] += int(rest.split()[0]) / 1024
+    return totals
+
+
+def worker_pids(master: int) -> List[int]:
+    """Child process ids of the server master"""
+    children = f"/proc/{master}/task/{master}/children"
+    if os.path.exists(children):
+        with open(children, encoding="utf-8") as f:
+            return sorted(int(pid) for pid in f.read().split())
+    pids = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat", encoding="utf-8") as f:
+                    if int(f.read().rsplit(")", 1)[1].split()[1]) == master:
+                        pids.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+    return sorted(pids)
+
+
+def report(master: int) -> Dict[str, float]:
+    """Print the per-process table and return per-worker averages and totals"""
+    pids = worker_pids(master)
+    rows = [("master", master, memory_mb(master))] + [
+        (f"worker {i + 1}", pid, memory_mb(pid)) for i, pid in enumerate(pids)
+    ]
+    header = f"{'process':<10} {'pid':>7} {'RSS MB':>9} {'PSS MB':>9} {'shared MB':>10} {'private MB':>11}"
+    print(header)
+    print("-" * len(header))
+    for label, pid, mem in rows:
+        shared = mem["Shared_Clean"] + mem["Shared_Dirty"]
+        private = mem["Private_Clean"] + mem["Private_Dirty"]
+        print(f"{label:<10} {pid:>7} {mem['Rss']:>9.1f} {mem['Pss']:>9.1f} {shared:>10.1f} {private:>11.1f}")
+
+    workers = [mem for _, _, mem in rows[1:]]
+    count = max(len(workers), 1)
+    summary = {
+        "workers": len(workers),
+        "worker_rss": sum(mem["Rss"] for mem in workers) / count,
+        "worker_private": sum(mem["Private_Clean"] + mem["Private_Dirty"] for mem in workers) / count,
+        "total_pss": sum(mem["Pss"] for _, _, mem in rows),
+    }
+    print(f"{'':<10} {'':>7} {'':>9} {summary['total_pss']:>9.1f}  total PSS (actual footprint)")
+    return summary
+
+
+def measure_server(preload: bool, workers: int, port: int, settle: float) -> Dict[str, float]:
+    """Start gunicorn with or without preloading, let workers warm up, then report"""
+    env = dict(
+        os.environ,
+        SERVER_PRELOAD=str(preload).lower(),
+        SERVER_WORKERS=str(workers),
+        PORT=str(port),
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        env=env,
+    )
+    try:
+        deadline = time.monotonic() + settle
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with code {process.returncode}")
+            time.sleep(1)
+        print(f"\n📏 SERVER_PRELOAD={str(preload).lower()}, {workers} workers")
+        return report(process.pid)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-worker memory of a multi-worker server")
+    parser.add_argument("--pid", type=int, help="Gunicorn master pid to inspect")
+    parser.add_argument("--compare", action="store_true",
+                        help="Start the server without and with preloading and compare")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--settle", type=float, default=90.0,
+                        help="Seconds to let workers finish warmup before measuring")
+    args = parser.parse_args(argv)
+
+    if args.pid:
+        report(args.pid)
+        return
+    if not args.compare:
+        parser.error("pass --pid or --compare")
+
+    before = measure_server(False, args.workers, args.port, args.settle)
+    after = measure_server(True, args.workers, args.port, args.settle)
+    print(f"\n{'':<22} {'no preload':>11} {'preload':>11}")
+    for key, label in (
+        ("worker_rss", "RSS per worker MB"),
+        ("worker_private", "private per worker MB"),
+        ("total_pss", "total PSS MB"),
+    ):
+        print(f"{label:<22} {before[key]:>11.1f} {after[key]:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
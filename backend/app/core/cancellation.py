@@ -0,0 +1,44 @@
+"""
+Request Cancellation
+Cooperative cancellation of a pipeline run whose client has gone away
+"""
+
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from app.core.llm_hooks import LLMCall, LLMHook
+from app.utils.exceptions import RequestCancelledError
+
+# Cancellation flag of the request whose pipeline runs in the current context
+_request_cancel: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "request_cancel_event", default=None
+)
+
+
+@contextmanager
+def cancellation_scope(event: threading.Event) -> Iterator[None]:
+    """Tie the work inside the block (and the threads it spawns) to ``event``"""
+    token = _request_cancel.set(event)
+    try:
+        yield
+    finally:
+        _request_cancel.reset(token)
+
+
+def raise_if_request_cancelled():
+    """Stop a pipeline run at its next stage or LLM call once its client is gone"""
+    event = _request_cancel.get()
+    if event is not None and event.is_set():
+        raise RequestCancelledError("Request cancelled: the client disconnected")
+
+
+class RequestCancelHook(LLMHook):
+    """Stops a cancelled request before it sends another LLM request"""
+
+    def before(self, call: LLMCall) -> None:
+        raise_if_request_cancelled()
+
+
+# Request cancellation hook for agent LLMs
+request_cancel_hook = RequestCancelHook()
@@ -0,0 +1,243 @@
+"""
+LLM Completion Cache
+SQLite cache of LLM completions keyed by model, messages, tools and temperature
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from app.core.config import settings
+from app.core.llm_hooks import LLMCall, LLMHook
+from app.core.rate_limiter import estimate_tokens
+
+# Pipeline stage (or "judge") issuing the LLM calls in the current context
+_current_stage: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "completion_cache_stage", default=None
+)
+
+
+@contextmanager
+def llm_stage(stage: str) -> Iterator[None]:
+    """Attribute LLM calls made inside the block (and its threads) to ``stage``"""
+    token = _current_stage.set(stage)
+    try:
+        yield
+    finally:
+        _current_stage.reset(token)
+
+
+def current_stage() -> Optional[str]:
+    return _current_stage.get()
+
+
+def completion_key(
+    model: str,
+    messages: Any,
+    tools: Any = None,
+    temperature: Optional[float] = None,
+    response_format: Any = None
+) -> str:
+    """
+    Cache key of one completion request.
+
+    Args:
+        model: Provider-prefixed model id
+        messages: Full message list (or prompt)
+        tools: Tools offered to the model
+        temperature: Sampling temperature
+        response_format: Output schema of a structured-output call
+
+    Returns:
+        Hex SHA-256 of the canonical JSON of all of them
+    """
+    request = {"model": model, "messages": messages, "tools": tools, "temperature": temperature}
+    if response_format is not None:
+        request["response_format"] = response_format
+    payload = json.dumps(request, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    """
+    Completion cache for replays, load tests and deterministic re-runs.
+
+    Entries live in one SQLite file shared by the workers on a host. When
+    the file grows past COMPLETION_CACHE_MAX_MB, the least recently used
+    entries are evicted. Each entry records its estimated token count, so
+    hits report the tokens they saved. Caching is switched on per stage
+    with COMPLETION_CACHE_STAGES.
+
+    Entry count and total size are read from the file once and then kept
+    in memory, so ``put`` and ``stats`` need no aggregate queries. Writes
+    by other workers are picked up whenever eviction re-reads the total.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_mb: Optional[float] = None):
+        self.path = path if path is not None else settings.COMPLETION_CACHE_DB
+        self.max_bytes = int((max_mb if max_mb is not None else settings.COMPLETION_CACHE_MAX_MB) * 1024 * 1024)
+        self.stages = {stage.strip() for stage in settings.COMPLETION_CACHE_STAGES.split(",") if stage.strip()}
+        self._local = threading.local()
+        self._schema_ready = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        self.evictions = 0
+        self._entries: Optional[int] = None
+        self._size = 0
+
+    def enabled_for(self, stage: Optional[str]) -> bool:
+        """Whether calls from ``stage`` are cached (unattributed calls are not)"""
+        return settings.COMPLETION_CACHE_ENABLED and stage in self.stages
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+            with self._lock:
+                if not self._schema_ready:
+                    with db:
+                        db.execute(
+                            "CREATE TABLE IF NOT EXISTS completions ("
+                            "key TEXT PRIMARY KEY, stage TEXT, model TEXT, value TEXT NOT NULL, "
+                            "tokens INTEGER NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+                        )
+                        db.execute("CREATE INDEX IF NOT EXISTS completions_lru ON completions (last_used)")
+                    self._schema_ready = True
+                    self._load_totals(db)
+        return db
+
+    def _load_totals(self, db: sqlite3.Connection):
+        """Read entry count and total size from the file (caller holds the lock)"""
+        self._entries, self._size = db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+        ).fetchone()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached completion, counting its tokens as saved"""
+        db = self._connection()
+        row = db.execute("SELECT value, tokens FROM completions WHERE key = ?", (key,)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_tokens += row[1]
+        with db:
+            db.execute("UPDATE completions SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, key: str, value: str, tokens: int, model: str, stage: Optional[str] = None):
+        """Store a completion and evict least recently used entries over the size cap"""
+        db = self._connection()
+        size = len(value.encode("utf-8"))
+        with db:
+            replaced = db.execute("SELECT size FROM completions WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO completions (key, stage, model, value, tokens, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, stage, model, value, tokens, size, time.time())
+            )
+            with self._lock:
+                if replaced is None:
+                    self._entries += 1
+                self._size += size - (replaced[0] if replaced else 0)
+                over_cap = self._size > self.max_bytes
+                if over_cap:
+                    # Rare: resync with the file, which other workers also write
+                    self._load_totals(db)
+                    over_cap = self._size > self.max_bytes
+            while over_cap:
+                oldest = db.execute(
+                    "SELECT key, size FROM completions ORDER BY last_used LIMIT 100"
+                ).fetchall()
+                if not oldest:
+                    break
+                for old_key, old_size in oldest:
+                    db.execute("DELETE FROM completions WHERE key = ?", (old_key,))
+                    with self._lock:
+                        self._entries -= 1
+                        self._size -= old_size
+                        self.evictions += 1
+                        over_cap = self._size > self.max_bytes
+                    if not over_cap:
+                        break
+
+    def clear(self) -> int:
+        """Drop every cached completion; returns the number removed"""
+        with self._connection() as db:
+            removed = db.execute("DELETE FROM completions").rowcount
+        with self._lock:
+            self._entries, self._size = 0, 0
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, saved tokens and store size (no database access)"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "enabled": settings.COMPLETION_CACHE_ENABLED,
+                "stages": sorted(self.stages),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "saved_tokens": self.saved_tokens,
+                "evictions": self.evictions,
+            }
+            if self._entries is not None:
+                stats["entries"] = self._entries
+                stats["size_mb"] = round(self._size / (1024 * 1024), 2)
+        return stats
+
+
+# Global completion cache instance
+completion_cache = CompletionCache()
+
+
+def is_tool_exchange(call: LLMCall) -> bool:
+    """
+    Whether a call uses native function calling: tools are offered, or the
+    conversation already carries tool calls or tool results. CrewAI runs
+    the tools inside such a call and may return a tool's output as the
+    completion, so these calls are never cached.
+    """
+    if call.tools:
+        return True
+    if not isinstance(call.messages, list):
+        return False
+    return any(
+        isinstance(message, dict) and (message.get("role") == "tool" or message.get("tool_calls"))
+        for message in call.messages
+    )
+
+
+class CompletionCacheHook(LLMHook):
+    """Answers agent and judge LLM calls from the completion cache and stores new text completions"""
+
+    def before(self, call: LLMCall) -> Optional[str]:
+        if not completion_cache.enabled_for(call.stage) or is_tool_exchange(call):
+            return None
+        call.cache_key = completion_key(call.model, call.messages, call.tools, call.temperature,
+                                        call.response_format)
+        return completion_cache.get(call.cache_key)
+
+    def after(self, call: LLMCall):
+        # Tool exchanges never get a key, so only text completions are stored
+        if call.cache_key is not None and isinstance(call.completion, str):
+            tokens = estimate_tokens(call.messages) + estimate_tokens(call.completion)
+            completion_cache.put(call.cache_key, call.completion, tokens, call.model, call.stage)
+
+
+# Completion cache hook for agent and judge LLM calls
+completion_cache_hook = CompletionCacheHook()
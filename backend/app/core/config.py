@@ -21,6 +21,11 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     
+    # Multi-worker server (gunicorn -c gunicorn.conf.py app.main:app)
+    SERVER_WORKERS: int = 0  # 0 = one per CPU core
+    SERVER_PRELOAD: bool = True  # load the model in the master, share it copy-on-write
+    SERVER_TIMEOUT: int = 120
+    
     # LLM API Keys
     GOOGLE_API_KEY: str = ""
     GROQ_API_KEY: str = ""
@@ -37,6 +42,136 @@ class Settings(BaseSettings):
     PINECONE_INDEX_HCPCS: str = "hcpcs"
     PINECONE_INDEX_CPT: str = "cpt"
     
+    # Vector store backend: "pinecone" or "local" (files under LOCAL_INDEX_DIR,
+    # one directory per index name above)
+    VECTOR_STORE_BACKEND: str = "pinecone"
+    LOCAL_INDEX_DIR: str = "indexes"
+    LOCAL_INDEX_ANN_THRESHOLD: int = 50000
+    LOCAL_INDEX_ANN_EF: int = 64
+    
+    # Index versions (bump after a rebuild to invalidate cached retrievals)
+    PINECONE_INDEX_ICD_VERSION: str = "1"
+    PINECONE_INDEX_HCPCS_VERSION: str = "1"
+    PINECONE_INDEX_CPT_VERSION: str = "1"
+    
+    # Vector Search
+    VECTOR_QUERY_MAX_WORKERS: int = 8
+    VECTOR_QUERY_TIMEOUT_SECONDS: float = 10.0
+    
+    # Hybrid Retrieval (BM25 index built alongside each index, fused with RRF)
+    LEXICAL_SEARCH_ENABLED: bool = True
+    LEXICAL_SHORT_CIRCUIT: bool = True
+    LEXICAL_RRF_K: int = 60
+    LEXICAL_FUSION_DEPTH: int = 10
+    
+    # Retrieval Result Cache
+    RETRIEVAL_CACHE_ENABLED: bool = True
+    RETRIEVAL_CACHE_MAX_ENTRIES: int = 10000
+    RETRIEVAL_CACHE_TTL_SECONDS: int = 86400
+    
+    # Pipeline Result Cache (whole responses keyed by note + pipeline config)
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_ENTRIES: int = 1000
+    RESULT_CACHE_TTL_SECONDS: int = 86400
+    RESULT_CACHE_DB: str = ""  # SQLite file shared by workers; empty = memory only
+    
+    # Request Coalescing (identical concurrent requests share one run)
+    SINGLE_FLIGHT_ENABLED: bool = True
+    SINGLE_FLIGHT_WAIT_SECONDS: float = 600.0
+    
+    # LLM Rate Limits (process-wide, "<provider or provider/model>=<rpm>:<tpm>", 0 = unlimited)
+    LLM_RATE_LIMIT_ENABLED: bool = True
+    LLM_RATE_LIMITS: str = (
+        "groq/moonshotai/kimi-k2-instruct-0905=60:10000,"
+        "groq/llama-3.3-70b-versatile=30:12000,"
+        "groq/meta-llama/llama-4-maverick-17b-128e-instruct=30:6000,"
+        "gemini/gemini-2.5-flash=10:250000,"
+        "openrouter=20:0"
+    )
+    LLM_RATE_LIMIT_MAX_WAIT_SECONDS: float = 120.0
+    LLM_RATE_LIMIT_COMPLETION_TOKENS: int = 1000  # reserved per call when max_tokens is unset
+    
+    # LLM Stage Retries (per model, then fail over along STAGE_FALLBACK_MODELS)
+    LLM_RETRY_ENABLED: bool = True
+    LLM_RETRY_ATTEMPTS: int = 3
+    LLM_RETRY_BASE_SECONDS: float = 1.0
+    LLM_RETRY_MAX_SECONDS: float = 20.0
+    LLM_FAILOVER_ENABLED: bool = True
+    
+    # Hedged Stage Requests (duplicate slow stages on the stage's fallback model)
+    HEDGE_ENABLED: bool = False
+    HEDGE_STAGES: str = "icd_codes,hcpcs_codes,cpt_codes"
+    HEDGE_PERCENTILE: float = 95.0  # hedge after this percentile of recent stage durations
+    HEDGE_MIN_SAMPLES: int = 20
+    HEDGE_DEFAULT_DELAY_SECONDS: float = 30.0  # until HEDGE_MIN_SAMPLES durations are known
+    HEDGE_MIN_DELAY_SECONDS: float = 2.0
+    HEDGE_BUDGET_RATIO: float = 0.1  # max hedges per stage call
+    HEDGE_BUDGET_ALLOWANCE: int = 3  # hedges per stage allowed on top of the ratio
+    HEDGE_MAX_WORKERS: int = 16  # threads running primary and hedged attempts
+    
+    # LLM Completion Cache (replays, load tests and deterministic re-runs)
+    COMPLETION_CACHE_ENABLED: bool = False
+    COMPLETION_CACHE_STAGES: str = "entities,icd_codes,hcpcs_codes,cpt_codes,judge"
+    COMPLETION_CACHE_DB: str = ".cache/completions.sqlite3"
+    COMPLETION_CACHE_MAX_MB: float = 256.0
+    
+    # Record / Replay Harness ("off", "record" or "replay"; see app/cli/replay_bench.py)
+    REPLAY_MODE: str = "off"
+    REPLAY_FIXTURE: str = "fixtures/replay.jsonl"
+    REPLAY_LLM_LATENCY_MS: float = 0.0  # injected per LLM exchange; -1 = recorded latency
+    REPLAY_QUERY_LATENCY_MS: float = 0.0  # injected per index query; -1 = recorded latency
+    REPLAY_LATENCY_JITTER: float = 0.0  # +/- fraction, drawn from a seeded generator
+    REPLAY_SEED: int = 0
+    
+    # Embeddings
+    EMBEDDING_MODEL_NAME: str = "Qwen/Qwen3-Embedding-0.6B"
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_RUNTIME: str = "fp32"  # fp32 | int8 | bf16 | onnx
+    EMBEDDING_NUM_THREADS: int = 0  # 0 = library default
+    EMBEDDING_ONNX_FILE: str = ""  # e.g. onnx/model_qint8_avx512_vnni.onnx
+    EMBEDDING_DIMENSION: int = 0  # Matryoshka truncation; 0 = full model dimension
+    EMBEDDING_BATCHER_ENABLED: bool = True
+    EMBEDDING_BATCHER_MAX_BATCH: int = 64
+    EMBEDDING_BATCHER_MAX_WAIT_MS: float = 5.0
+    EMBEDDING_SERVER_ADDRESS: str = ""  # "host:port" or Unix socket path; empty = in-process model
+    EMBEDDING_SERVER_AUTHKEY: str = ""  # required to run or reach the embedding server
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MEMORY_MB: int = 64
+    EMBEDDING_CACHE_DIR: str = ".cache/embeddings"
+    EMBEDDING_CACHE_DTYPE: str = "float16"
+    
+    # Pipeline Execution
+    PIPELINE_PARALLEL_STAGES: bool = True
+    PIPELINE_PREFETCH_RETRIEVAL: bool = True
+    
+    # Startup Warmup (components: observability, embedding_model, vector_indexes,
+    # llm_clients, crew, judge; empty = all)
+    WARMUP_ENABLED: bool = True
+    WARMUP_COMPONENTS: str = ""
+    WARMUP_BLOCKING: bool = False
+    WARMUP_MAX_WORKERS: int = 4
+    WARMUP_RETRY_SECONDS: float = 30.0
+    
+    # LLM Judge Evaluation ("sync" judges before responding, "deferred" in the background)
+    EVALUATION_MODE: str = "sync"
+    EVALUATION_SAMPLE_RATE: float = 1.0
+    EVALUATION_WORKERS: int = 2
+    EVALUATION_QUEUE_MAX_SIZE: int = 100
+    EVALUATION_TTL_SECONDS: int = 3600
+    EVALUATION_MAX_RETAINED: int = 5000
+    
+    # Admission Control (synchronous endpoints)
+    PIPELINE_MAX_CONCURRENCY: int = 4
+    PIPELINE_MAX_QUEUE: int = 16
+    PIPELINE_QUEUE_TIMEOUT_SECONDS: float = 30.0
+    PIPELINE_RETRY_AFTER_SECONDS: int = 10
+    
+    # Coding Jobs
+    JOB_WORKERS: int = 2
+    JOB_QUEUE_MAX_SIZE: int = 100
+    JOB_TTL_SECONDS: int = 3600
+    JOB_MAX_RETAINED: int = 1000
+    
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://127.0.0.1:3000"
     
@@ -0,0 +1,150 @@
+"""
+Embedding Micro-Batcher
+Coalesce concurrent embedding requests into shared batched forward passes
+"""
+
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, List, Optional
+import numpy as np
+from app.core.config import settings
+
+
+class _Request:
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class EmbeddingBatcher:
+    """
+    Single encode thread fed by every concurrent caller.
+
+    The first queued request opens a batch window of ``max_wait_ms``; requests
+    arriving within it are encoded together (duplicates once) until
+    ``max_batch_size`` texts are collected, then each caller gets its rows
+    back. A request larger than ``max_batch_size`` is encoded on its own.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size or settings.EMBEDDING_BATCHER_MAX_BATCH
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else settings.EMBEDDING_BATCHER_MAX_WAIT_MS) / 1000
+
+        self._queue: Deque[_Request] = deque()
+        self._queued_texts = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        self.requests = 0
+        self.completed = 0
+        self.batches = 0
+        self.batched_texts = 0
+        self.unique_texts = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0.0
+        self.total_encode = 0.0
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts as part of the next shared batch.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embedding matrix in the order of ``texts``
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        request = _Request(list(texts))
+        with self._cond:
+            self._ensure_thread()
+            self._queue.append(request)
+            self._queued_texts += len(request.texts)
+            self.requests += 1
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+            self._cond.notify()
+        return request.future.result()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+            self._thread.start()
+
+    def _next_batch(self) -> List[_Request]:
+        """Wait for a request, hold the batch window open, then take a batch"""
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = self._queue[0].enqueued_at + self.max_wait
+            while self._queued_texts < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = [self._queue.popleft()]
+            size = len(batch[0].texts)
+            while self._queue and size + len(self._queue[0].texts) <= self.max_batch_size:
+                request = self._queue.popleft()
+                batch.append(request)
+                size += len(request.texts)
+            self._queued_texts -= size
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            started = time.monotonic()
+            unique: Dict[str, int] = {}
+            for request in batch:
+                for text in request.texts:
+                    unique.setdefault(text, len(unique))
+            try:
+                embeddings = np.asarray(self.encode_fn(list(unique)), dtype=np.float32)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            finished = time.monotonic()
+
+            for request in batch:
+                rows = [unique[text] for text in request.texts]
+                request.future.set_result(embeddings[rows])
+
+            with self._cond:
+                self.batches += 1
+                self.completed += len(batch)
+                self.batched_texts += sum(len(request.texts) for request in batch)
+                self.unique_texts += len(unique)
+                self.total_wait += sum(started - request.enqueued_at for request in batch)
+                self.total_encode += finished - started
+
+    def stats(self) -> Dict[str, float]:
+        """Queue depth, batch sizes and wait/encode times"""
+        with self._cond:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "queue_depth": len(self._queue),
+                "queued_texts": self._queued_texts,
+                "max_queue_depth": self.max_queue_depth,
+                "requests": self.requests,
+                "batches": self.batches,
+                "avg_requests_per_batch": round(self.completed / self.batches, 2) if self.batches else 0.0,
+                "avg_batch_texts": round(self.unique_texts / self.batches, 2) if self.batches else 0.0,
+                "duplicate_texts": self.batched_texts - self.unique_texts,
+                "avg_wait_ms": round(1000 * self.total_wait / self.completed, 3) if self.completed else 0.0,
+                "avg_encode_ms": round(1000 * self.total_encode / self.batches, 3) if self.batches else 0.0,
+            }
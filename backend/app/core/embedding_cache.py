@@ -0,0 +1,293 @@
+"""
+Embedding Cache
+In-memory LRU plus a memory-mapped on-disk store for term embeddings
+"""
+
+import os
+import re
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking for the disk store
+    fcntl = None
+
+
+class MemoryEmbeddingCache:
+    """Thread-safe LRU of embeddings bounded by a memory budget"""
+
+    def __init__(self, dimension: int, max_bytes: int):
+        self.max_entries = max(1, max_bytes // (dimension * 4))
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+            return vector
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskEmbeddingStore:
+    """
+    Persistent embedding matrix backed by a memory-mapped file.
+
+    Layout inside ``<root>/<model>-<dim>/``:
+        meta.json        model name, dimension and dtype
+        vectors.mmap     row-major matrix, grown in place as terms are added
+        index.jsonl      one JSON-encoded term per line; line number == row
+
+    A vector is flushed before its index line is appended, so a crash can
+    leave an unused row but never an index entry without a vector; a torn
+    index line is cut off by the next writer before it appends. The
+    directory name includes the model and dimension, so switching either
+    starts a fresh store.
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, root: str, model_name: str, dimension: int, dtype: str = "float16"):
+        self.model_name = model_name
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.directory = os.path.join(root, f"{slug}-{dimension}")
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._meta_path = os.path.join(self.directory, "meta.json")
+        self._vectors_path = os.path.join(self.directory, "vectors.mmap")
+        self._index_path = os.path.join(self.directory, "index.jsonl")
+        self._lock_path = os.path.join(self.directory, ".lock")
+
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._row_count = 0
+        self._index_offset = 0
+        self._matrix = None
+
+        self._validate_meta()
+        self._open_matrix()
+        self._refresh_index()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None and self._refresh_index():
+                row = self._rows.get(key)
+            if row is None:
+                return None
+            return np.asarray(self._matrix[row], dtype=np.float32)
+
+    def put_many(self, items: List[Tuple[str, np.ndarray]]) -> None:
+        with self._lock, self._file_lock():
+            self._refresh_index()
+            new_items = [(key, vector) for key, vector in items if key not in self._rows]
+            if not new_items:
+                return
+
+            start = self._row_count
+            self._ensure_capacity(start + len(new_items))
+            for offset, (_, vector) in enumerate(new_items):
+                self._matrix[start + offset] = vector
+            self._matrix.flush()
+
+            # Bytes past the last complete line are a torn write from a
+            # crashed writer; drop them so the next line starts cleanly
+            if os.path.exists(self._index_path) and os.path.getsize(self._index_path) > self._index_offset:
+                os.truncate(self._index_path, self._index_offset)
+            with open(self._index_path, "a", encoding="utf-8") as f:
+                for key, _ in new_items:
+                    f.write(json.dumps(key) + "\n")
+            self._refresh_index()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _validate_meta(self):
+        meta = {"model": self.model_name, "dimension": self.dimension, "dtype": self.dtype.name}
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, encoding="utf-8") as f:
+                if json.load(f) == meta:
+                    return
+            # Incompatible store (e.g. dtype changed): start over
+            for path in (self._vectors_path, self._index_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        with open(self._meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def _open_matrix(self, capacity: Optional[int] = None):
+        row_bytes = self.dimension * self.dtype.itemsize
+        if capacity is None:
+            size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+            capacity = max(size // row_bytes, self.INITIAL_CAPACITY)
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < capacity * row_bytes:
+                f.truncate(capacity * row_bytes)
+        self._matrix = np.memmap(
+            self._vectors_path, dtype=self.dtype, mode="r+",
+            shape=(capacity, self.dimension)
+        )
+
+    def _ensure_capacity(self, rows: int):
+        capacity = self._matrix.shape[0]
+        if rows <= capacity:
+            # Another process may have grown the file already
+            row_bytes = self.dimension * self.dtype.itemsize
+            if os.path.getsize(self._vectors_path) // row_bytes > capacity:
+                self._matrix.flush()
+                self._open_matrix()
+            return
+        while capacity < rows:
+            capacity *= 2
+        self._matrix.flush()
+        self._matrix = None
+        self._open_matrix(capacity)
+
+    def _refresh_index(self) -> bool:
+        """Load index lines appended since the last read; True if any were new"""
+        if not os.path.exists(self._index_path):
+            return False
+        if os.path.getsize(self._index_path) <= self._index_offset:
+            return False
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_offset)
+            lines = f.readlines()
+            if lines and not lines[-1].endswith(b"\n"):
+                lines = lines[:-1]  # partially written line
+            for line in lines:
+                self._rows.setdefault(json.loads(line), self._row_count)
+                self._row_count += 1
+                self._index_offset += len(line)
+        if self._row_count > self._matrix.shape[0]:
+            self._open_matrix()
+        return bool(lines)
+
+    def _file_lock(self):
+        return _FileLock(self._lock_path)
+
+
+class _FileLock:
+    """Exclusive advisory lock so several processes can share one store"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._file = open(self.path, "a")
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache: memory LRU in front of the disk store.
+
+    With a disk tier, every vector is rounded through the disk dtype before
+    it is cached or returned, so a term gets bit-identical vectors (and
+    scores) whether it was just computed or served from memory or disk.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        dimension: int,
+        memory_bytes: int,
+        disk_dir: Optional[str] = None,
+        disk_dtype: str = "float16"
+    ):
+        self.memory = MemoryEmbeddingCache(dimension, memory_bytes)
+        self.disk = DiskEmbeddingStore(disk_dir, model_name, dimension, disk_dtype) if disk_dir else None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: List[str]) -> Tuple[Dict[str, np.ndarray], List[str]]:
+        """
+        Look up embeddings for several keys.
+
+        Args:
+            keys: Cache keys (texts)
+
+        Returns:
+            Tuple of (found key -> vector, keys that missed both tiers)
+        """
+        found: Dict[str, np.ndarray] = {}
+        missing: List[str] = []
+        memory_hits = disk_hits = 0
+        for key in keys:
+            if key in found:
+                continue
+            vector = self.memory.get(key)
+            if vector is not None:
+                memory_hits += 1
+            elif self.disk is not None:
+                vector = self.disk.get(key)
+                if vector is not None:
+                    disk_hits += 1
+                    self.memory.put(key, vector)
+            if vector is None:
+                if key not in missing:
+                    missing.append(key)
+            else:
+                found[key] = vector
+
+        with self._lock:
+            self.memory_hits += memory_hits
+            self.disk_hits += disk_hits
+            self.misses += len(missing)
+        return found, missing
+
+    def put_many(self, items: List[Tuple[str, np.ndarray]]) -> List[Tuple[str, np.ndarray]]:
+        """
+        Store freshly computed embeddings in both tiers.
+
+        Returns:
+            The items as cached (float32, rounded through the disk dtype);
+            callers should use these rather than the raw vectors
+        """
+        if self.disk is not None:
+            dtype = self.disk.dtype
+            items = [(key, np.asarray(vector, dtype=dtype).astype(np.float32)) for key, vector in items]
+        for key, vector in items:
+            self.memory.put(key, vector)
+        if self.disk is not None:
+            self.disk.put_many(items)
+        return items
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and tier sizes"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+        }
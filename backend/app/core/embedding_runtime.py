@@ -0,0 +1,166 @@
+"""
+Embedding Runtimes
+Load the embedding model in fp32, int8, bf16 or ONNX form and size its output
+"""
+
+import os
+from typing import Optional
+import numpy as np
+from app.core.config import settings
+
+
+RUNTIMES = ("fp32", "int8", "bf16", "onnx")
+
+
+def embedding_model_id(runtime: Optional[str] = None, model_name: Optional[str] = None) -> str:
+    """
+    Identifier for the configured (or given) model and runtime.
+
+    Runtimes produce slightly different vectors, so caches and indexes key
+    on this rather than on the model name alone.
+    """
+    runtime = (runtime or settings.EMBEDDING_RUNTIME).lower()
+    model_name = model_name or settings.EMBEDDING_MODEL_NAME
+    if runtime == "fp32":
+        return model_name
+    return f"{model_name}@{runtime}"
+
+
+def load_embedding_model(
+    runtime: Optional[str] = None,
+    model_name: Optional[str] = None,
+    threads: Optional[int] = None
+):
+    """
+    Load the embedding model with the selected CPU runtime.
+
+    Args:
+        runtime: "fp32", "int8" (dynamic quantization of Linear layers),
+            "bf16" (falls back to fp32 without CPU bf16 support) or "onnx"
+            (ONNX Runtime via the sentence-transformers ONNX backend);
+            defaults to EMBEDDING_RUNTIME
+        model_name: Model to load (defaults to EMBEDDING_MODEL_NAME)
+        threads: Intra-op threads (defaults to EMBEDDING_NUM_THREADS; 0 keeps
+            the library default)
+
+    Returns:
+        SentenceTransformer exposing ``encode``
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    runtime = (runtime or settings.EMBEDDING_RUNTIME).lower()
+    model_name = model_name or settings.EMBEDDING_MODEL_NAME
+    threads = settings.EMBEDDING_NUM_THREADS if threads is None else threads
+    if runtime not in RUNTIMES:
+        raise ValueError(f"Unknown EMBEDDING_RUNTIME '{runtime}', expected one of {RUNTIMES}")
+
+    if threads > 0:
+        torch.set_num_threads(threads)
+
+    if runtime == "onnx":
+        return SentenceTransformer(
+            model_name,
+            device="cpu",
+            backend="onnx",
+            model_kwargs=_onnx_model_kwargs(threads)
+        )
+
+    if runtime == "bf16" and not _cpu_supports_bf16():
+        print("⚠️  CPU has no native bf16 support; loading the embedding model in fp32")
+        runtime = "fp32"
+
+    if runtime == "bf16":
+        return SentenceTransformer(
+            model_name,
+            device="cpu",
+            model_kwargs={"torch_dtype": torch.bfloat16}
+        )
+
+    model = SentenceTransformer(model_name, device="cpu")
+    if runtime == "int8":
+        torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+    return model
+
+
+def output_dimension(model, dimension: Optional[int] = None) -> int:
+    """
+    Embedding dimension served by this deployment.
+
+    Args:
+        model: Loaded SentenceTransformer
+        dimension: Requested (Matryoshka) dimension; defaults to
+            EMBEDDING_DIMENSION, 0 meaning the model's full dimension
+
+    Returns:
+        Output dimension
+    """
+    full = model.get_sentence_embedding_dimension()
+    dimension = settings.EMBEDDING_DIMENSION if dimension is None else dimension
+    if not dimension:
+        return full
+    if dimension > full:
+        raise ValueError(f"EMBEDDING_DIMENSION {dimension} exceeds the model's {full} dimensions")
+    return dimension
+
+
+def truncate_embeddings(embeddings, dimension: int) -> np.ndarray:
+    """
+    Keep the leading ``dimension`` components and L2-normalize each row.
+
+    Matryoshka-trained models (Qwen3-Embedding) front-load information, so
+    a prefix of the vector is itself a usable embedding once re-normalized.
+
+    Args:
+        embeddings: Matrix of full-dimension embeddings
+        dimension: Output dimension
+
+    Returns:
+        float32 matrix of shape (rows, dimension)
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)[:, :dimension]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def _onnx_model_kwargs(threads: int) -> dict:
+    """ONNX Runtime session options for the sentence-transformers ONNX backend"""
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if threads > 0:
+        options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+
+    kwargs = {"provider": "CPUExecutionProvider", "session_options": options}
+    if settings.EMBEDDING_ONNX_FILE:
+        # e.g. onnx/model_qint8_avx512_vnni.onnx for a quantized export
+        kwargs["file_name"] = settings.EMBEDDING_ONNX_FILE
+    return kwargs
+
+
+def _cpu_supports_bf16() -> bool:
+    """True when the CPU advertises bf16 instructions (AVX512-BF16 or AMX)"""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            flags = f.read()
+    except OSError:
+        # Not Linux: trust torch's detected capability
+        import torch
+        return "AVX512" in getattr(torch.backends.cpu, "get_cpu_capability", lambda: "")()
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+def process_rss_mb() -> float:
+    """Resident set size of this process in MB (0.0 where unavailable)"""
+    try:
+        with open(f"/proc/{os.getpid()}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
@@ -0,0 +1,185 @@
+"""
+Embedding Server
+Host-local process that owns the embedding model for several API workers
+"""
+
+import os
+import json
+import tempfile
+import threading
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+from app.core.config import settings
+from app.core.embedding_batcher import EmbeddingBatcher
+from app.core.embedding_runtime import (
+    embedding_model_id,
+    load_embedding_model,
+    output_dimension,
+    truncate_embeddings,
+)
+
+
+def default_address() -> str:
+    """Unix socket in the user's runtime directory (or the temp directory)"""
+    directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(directory, "medical-coding-embeddings.sock")
+
+
+def server_authkey() -> bytes:
+    """
+    Shared secret for the embedding server connection handshake.
+
+    Raises:
+        ValueError: If EMBEDDING_SERVER_AUTHKEY is unset
+    """
+    key = settings.EMBEDDING_SERVER_AUTHKEY
+    if not key:
+        raise ValueError(
+            "EMBEDDING_SERVER_AUTHKEY must be set to a private value "
+            "(e.g. the output of `python -c 'import secrets; print(secrets.token_hex(32))'`)"
+        )
+    return key.encode()
+
+
+def parse_address(address: str) -> Union[str, tuple]:
+    """``"host:port"`` -> TCP address tuple; anything else is a Unix socket path"""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return address
+
+
+class EmbeddingServer:
+    """
+    Serves ``encode`` requests from every connected worker through one
+    EmbeddingBatcher, so the model is loaded once per host and concurrent
+    requests from different workers share forward passes.
+
+    Messages are JSON frames, never pickles: requests are
+    ``{"command": "info" | "stats" | "encode", "texts": [...]}`` and replies
+    ``{"status": "ok", "value": ...}`` or ``{"status": "error", "message": ...}``.
+    An ``encode`` reply carries ``shape`` instead of ``value`` and is followed
+    by one frame holding the raw float32 rows.
+    """
+
+    def __init__(self, address: Optional[str] = None):
+        self.address = parse_address(address or settings.EMBEDDING_SERVER_ADDRESS or default_address())
+        self.authkey = server_authkey()
+        self.model = load_embedding_model()
+        self.dimension = output_dimension(self.model)
+        self.batcher = EmbeddingBatcher(self._encode)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        embeddings = self.model.encode(texts, batch_size=settings.EMBEDDING_BATCH_SIZE)
+        return truncate_embeddings(embeddings, self.dimension)
+
+    def serve_forever(self):
+        """Accept connections until interrupted; one thread per connection"""
+        if isinstance(self.address, str):
+            if os.path.exists(self.address):
+                os.remove(self.address)  # stale socket from a previous run
+            # Socket is created owner-only (0600)
+            previous_umask = os.umask(0o177)
+            try:
+                listener = Listener(self.address, authkey=self.authkey)
+            finally:
+                os.umask(previous_umask)
+        else:
+            print(f"⚠️  Embedding server listening on TCP {self.address}: any local user can attempt to connect")
+            listener = Listener(self.address, authkey=self.authkey)
+        with listener:
+            print(f"🧮 Embedding server on {self.address} ({embedding_model_id()}, {self.dimension} dims)")
+            while True:
+                try:
+                    connection = listener.accept()
+                except (OSError, EOFError):
+                    continue  # failed handshake; keep serving
+                threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+
+    def _handle(self, connection):
+        with connection:
+            while True:
+                try:
+                    request = json.loads(connection.recv_bytes())
+                except (EOFError, OSError):
+                    return
+                except ValueError as e:
+                    _send_json(connection, {"status": "error", "message": f"Malformed request: {e}"})
+                    continue
+                try:
+                    value = self._dispatch(request)
+                except Exception as e:
+                    _send_json(connection, {"status": "error", "message": str(e)})
+                    continue
+                if isinstance(value, np.ndarray):
+                    rows = np.ascontiguousarray(value, dtype=np.float32)
+                    _send_json(connection, {"status": "ok", "shape": list(rows.shape)})
+                    connection.send_bytes(rows.tobytes())
+                else:
+                    _send_json(connection, {"status": "ok", "value": value})
+
+    def _dispatch(self, request: Dict[str, Any]) -> Any:
+        command = request.get("command")
+        if command == "encode":
+            texts = request.get("texts")
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError("encode expects a list of strings")
+            return self.batcher.encode(texts)
+        if command == "info":
+            return {"model": embedding_model_id(), "dimension": self.dimension}
+        if command == "stats":
+            return self.batcher.stats()
+        raise ValueError(f"Unknown command: {command}")
+
+
+def _send_json(connection, payload: Dict[str, Any]):
+    connection.send_bytes(json.dumps(payload).encode("utf-8"))
+
+
+class EmbeddingClient:
+    """Client for EmbeddingServer; one connection per calling thread"""
+
+    def __init__(self, address: Optional[str] = None):
+        self.address = parse_address(address or settings.EMBEDDING_SERVER_ADDRESS or default_address())
+        self.authkey = server_authkey()
+        self._local = threading.local()
+
+    def _call(self, command: str, **payload) -> Any:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = Client(self.address, authkey=self.authkey)
+            self._local.connection = connection
+        try:
+            _send_json(connection, {"command": command, **payload})
+            reply = json.loads(connection.recv_bytes())
+            if reply.get("status") == "ok" and "shape" in reply:
+                data = connection.recv_bytes()
+                return np.frombuffer(data, dtype=np.float32).reshape(reply["shape"]).copy()
+        except (EOFError, OSError):
+            # Server restarted: drop the connection so the next call reconnects
+            self._local.connection = None
+            connection.close()
+            raise
+        if reply.get("status") != "ok":
+            raise RuntimeError(f"Embedding server error: {reply.get('message')}")
+        return reply["value"]
+
+    def close(self):
+        """Close the calling thread's connection (the next call reconnects)"""
+        connection = getattr(self._local, "connection", None)
+        self._local.connection = None
+        if connection is not None:
+            connection.close()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts on the server (shared batch, truncated to its dimension)"""
+        return self._call("encode", texts=list(texts))
+
+    def info(self) -> Dict[str, Any]:
+        """Model id and output dimension served"""
+        return self._call("info")
+
+    def stats(self) -> Dict[str, Any]:
+        """Server-side batcher statistics"""
+        return self._call("stats")
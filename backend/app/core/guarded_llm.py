@@ -0,0 +1,51 @@
+"""
+Guarded LLM
+CrewAI LLM whose calls run through the shared LLM call hooks
+"""
+
+from typing import Any, Optional
+from crewai import LLM
+from app.core.completion_cache import current_stage
+from app.core.llm_hooks import LLMCall, run_llm_call
+from app.core.llm_hook_chain import LLM_CALL_HOOKS
+
+
+class GuardedLLM(LLM):
+    """
+    CrewAI LLM applying ``LLM_CALL_HOOKS`` to every ``call``.
+
+    Instances are created with ``is_litellm=True`` so CrewAI builds this
+    class for every provider instead of substituting a native client class.
+    ``hook_model`` is the model id the hooks see (rate limit key, cache and
+    replay keys), which may differ from the routed LiteLLM id in replay.
+    """
+
+    hook_model: str = ""
+
+    def call(self, messages, **kwargs) -> Any:
+        call = LLMCall(
+            model=self.hook_model or self.model,
+            messages=messages,
+            tools=kwargs.get("tools"),
+            temperature=getattr(self, "temperature", None),
+            max_tokens=getattr(self, "max_tokens", None),
+            stage=current_stage()
+        )
+        return run_llm_call(LLM_CALL_HOOKS, call, lambda: super(GuardedLLM, self).call(messages, **kwargs))
+
+
+def create_guarded_llm(model: str, route_model: Optional[str] = None, **kwargs) -> GuardedLLM:
+    """
+    Build a GuardedLLM.
+
+    Args:
+        model: Provider-prefixed model id the hooks key on
+        route_model: LiteLLM model id to send requests to, if not ``model``
+        **kwargs: Further LLM options (e.g. ``base_url``, ``api_key``)
+
+    Returns:
+        GuardedLLM instance
+    """
+    llm = GuardedLLM(model=route_model or model, is_litellm=True, **kwargs)
+    llm.hook_model = model
+    return llm
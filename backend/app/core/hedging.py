@@ -0,0 +1,210 @@
+"""
+Hedged Stage Requests
+Duplicate a slow stage on a secondary model and keep the first valid output
+"""
+
+import time
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.llm_hooks import LLMCall, LLMHook
+from app.utils.exceptions import HedgeCancelledError
+
+# Cancellation flag of the hedged attempt running in the current thread
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "hedge_cancel_event", default=None
+)
+
+
+def raise_if_cancelled():
+    """Stop a losing hedged attempt at its next LLM call"""
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise HedgeCancelledError("Hedged attempt cancelled: the other attempt finished first")
+
+
+class HedgeCancelHook(LLMHook):
+    """Stops a cancelled hedged attempt before it sends another LLM request"""
+
+    def before(self, call: LLMCall) -> None:
+        raise_if_cancelled()
+
+
+class StageHedger:
+    """
+    Hedges slow LLM stages.
+
+    When a stage's call is still running after the HEDGE_PERCENTILE of its
+    recent durations, the same stage is started on a secondary model and
+    the first attempt to produce a valid structured output wins. The loser
+    is cancelled cooperatively: it stops before its next LLM call (a request
+    already sent to the provider cannot be recalled).
+
+    Hedges per stage are capped at HEDGE_BUDGET_ALLOWANCE plus
+    HEDGE_BUDGET_RATIO of that stage's calls, so the first slow calls after
+    startup can be hedged too. Attempts run on a pool of HEDGE_MAX_WORKERS
+    threads; when every worker is busy (losers still finishing an LLM call
+    count), the stage runs in the caller's thread without a hedge.
+    """
+
+    def __init__(
+        self,
+        percentile: Optional[float] = None,
+        budget_ratio: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        budget_allowance: Optional[int] = None,
+        max_workers: Optional[int] = None
+    ):
+        self.percentile = percentile if percentile is not None else settings.HEDGE_PERCENTILE
+        self.budget_ratio = budget_ratio if budget_ratio is not None else settings.HEDGE_BUDGET_RATIO
+        self.min_samples = min_samples if min_samples is not None else settings.HEDGE_MIN_SAMPLES
+        self.budget_allowance = (
+            budget_allowance if budget_allowance is not None else settings.HEDGE_BUDGET_ALLOWANCE
+        )
+        self.max_workers = max_workers or settings.HEDGE_MAX_WORKERS
+        self.stages = {stage.strip() for stage in settings.HEDGE_STAGES.split(",") if stage.strip()}
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hedge")
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._lock = threading.Lock()
+        self._durations: Dict[str, deque] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def enabled_for(self, stage: str) -> bool:
+        return settings.HEDGE_ENABLED and stage in self.stages
+
+    def delay(self, stage: str) -> float:
+        """Seconds to wait for the primary attempt before hedging"""
+        with self._lock:
+            durations = sorted(self._durations.get(stage, ()))
+        if len(durations) < self.min_samples:
+            return settings.HEDGE_DEFAULT_DELAY_SECONDS
+        value = durations[int(self.percentile / 100 * (len(durations) - 1))]
+        return max(value, settings.HEDGE_MIN_DELAY_SECONDS)
+
+    def run(
+        self,
+        stage: str,
+        primary: Callable[[], Any],
+        secondary: Optional[Callable[[], Any]],
+        secondary_model: Optional[str],
+        is_valid: Callable[[Any], bool]
+    ) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        """
+        Run a stage attempt, hedging it if it is slow.
+
+        Args:
+            stage: Stage name
+            primary: Runs the stage on the current model
+            secondary: Runs the stage on the hedge model (None disables hedging)
+            secondary_model: Model id of the hedge, for reporting
+            is_valid: Whether a result holds a usable structured output
+
+        Returns:
+            Tuple of (result, hedge info or None when no hedge was sent)
+        """
+        if secondary is None or not self.enabled_for(stage):
+            return primary(), None
+
+        self._count(stage, "calls")
+        started = time.monotonic()
+        primary_cancel = threading.Event()
+        primary_future = self._submit(primary, primary_cancel)
+        if primary_future is None:
+            self._count(stage, "saturated")
+            result = primary()
+            self._record(stage, time.monotonic() - started)
+            return result, None
+
+        delay = self.delay(stage)
+        done, _ = wait([primary_future], timeout=delay)
+        secondary_future = None
+        secondary_cancel = threading.Event()
+        if not done and self._take_budget(stage):
+            secondary_future = self._submit(secondary, secondary_cancel)
+            if secondary_future is None:
+                self._count(stage, "hedged", -1)
+                self._count(stage, "saturated")
+        if secondary_future is None:
+            result = primary_future.result()
+            self._record(stage, time.monotonic() - started)
+            return result, None
+
+        attempts = {primary_future: ("primary", primary_cancel), secondary_future: ("hedge", secondary_cancel)}
+        info = {"hedge_model": secondary_model, "hedge_after_seconds": round(delay, 2)}
+
+        running = set(attempts)
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and is_valid(future.result()):
+                    for other in running:
+                        attempts[other][1].set()
+                    winner = attempts[future][0]
+                    self._record(stage, time.monotonic() - started, hedge_won=winner == "hedge")
+                    return future.result(), dict(info, served_by=winner)
+
+        # Neither attempt produced a valid output: report the primary's outcome
+        return primary_future.result(), dict(info, served_by="primary")
+
+    def _submit(self, fn: Callable[[], Any], cancel: threading.Event) -> Optional[Future]:
+        """Run ``fn`` on a free hedge worker, in a copy of the caller's context (None if all are busy)"""
+        if not self._slots.acquire(blocking=False):
+            return None
+        ctx = contextvars.copy_context()
+
+        def task():
+            _cancel_event.set(cancel)
+            try:
+                return fn()
+            finally:
+                self._slots.release()
+
+        return self._executor.submit(ctx.run, task)
+
+    def _take_budget(self, stage: str) -> bool:
+        with self._lock:
+            counters = self._stage_counters(stage)
+            if counters["hedged"] + 1 > self.budget_allowance + self.budget_ratio * counters["calls"]:
+                counters["budget_denied"] += 1
+                return False
+            counters["hedged"] += 1
+            return True
+
+    def _record(self, stage: str, duration: float, hedge_won: bool = False):
+        with self._lock:
+            self._durations.setdefault(stage, deque(maxlen=500)).append(duration)
+            self._stage_counters(stage)["hedge_wins"] += hedge_won
+
+    def _count(self, stage: str, counter: str, amount: int = 1):
+        with self._lock:
+            self._stage_counters(stage)[counter] += amount
+
+    def _stage_counters(self, stage: str) -> Dict[str, int]:
+        return self._counters.setdefault(
+            stage, {"calls": 0, "hedged": 0, "hedge_wins": 0, "budget_denied": 0, "saturated": 0}
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-stage hedge counts and current hedge delays"""
+        with self._lock:
+            counters = {stage: dict(values) for stage, values in self._counters.items()}
+        for stage, values in counters.items():
+            values["delay_seconds"] = round(self.delay(stage), 2)
+        return {
+            "enabled": settings.HEDGE_ENABLED,
+            "percentile": self.percentile,
+            "budget_ratio": self.budget_ratio,
+            "budget_allowance": self.budget_allowance,
+            "max_workers": self.max_workers,
+            "stages": counters,
+        }
+
+
+# Global stage hedger
+stage_hedger = StageHedger()
+
+# Hedge cancellation hook for agent LLMs
+hedge_cancel_hook = HedgeCancelHook()
@@ -0,0 +1,192 @@
+"""
+Lexical Index
+BM25 inverted index over code descriptions and reciprocal rank fusion
+"""
+
+import os
+import re
+import json
+import math
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from app.core.vector_store import QueryResult
+
+
+# Dropped from BM25 scoring only; exact-match keys keep every token
+STOPWORDS = frozenset({"a", "an", "the", "of", "and", "or", "in", "on", "to", "for", "by", "as"})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[a-z0-9]+)?")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased alphanumeric tokens (dotted codes such as ``e11.9`` stay whole)"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class LexicalIndex:
+    """
+    In-memory BM25 index over the descriptions of one code system.
+
+    Stored as ``lexical.json`` next to the local vector index files
+    (``LOCAL_INDEX_DIR/<index name>/``) and written by the index build CLI.
+    Postings are rebuilt on load with per-posting BM25 weights precomputed,
+    so a query is a handful of NumPy scatter-adds.
+    """
+
+    FILE = "lexical.json"
+
+    def __init__(
+        self,
+        ids: List[str],
+        texts: List[str],
+        metadata: List[Dict[str, Any]],
+        name: str = "",
+        version: str = "",
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        self.ids = ids
+        self.texts = texts
+        self.metadata = metadata
+        self.name = name
+        self.version = version
+
+        # Exact-match key -> rows; a code's own id is an exact key too
+        self._exact: Dict[str, List[int]] = {}
+        postings: Dict[str, Dict[int, int]] = {}
+        lengths = np.zeros(len(ids), dtype=np.float32)
+        for row, (code, text) in enumerate(zip(ids, texts)):
+            tokens = tokenize(text)
+            self._exact.setdefault(" ".join(tokens), []).append(row)
+            self._exact.setdefault(code.lower(), []).append(row)
+            terms = [token for token in tokens if token not in STOPWORDS]
+            lengths[row] = len(terms)
+            for token in terms:
+                counts = postings.setdefault(token, {})
+                counts[row] = counts.get(row, 0) + 1
+
+        average = float(lengths.mean()) if len(ids) else 0.0
+        norm = k1 * (1 - b + b * lengths / max(average, 1e-9))
+        self._postings: Dict[str, tuple] = {}
+        for token, counts in postings.items():
+            rows = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            idf = math.log(1 + (len(ids) - len(rows) + 0.5) / (len(rows) + 0.5))
+            self._postings[token] = (rows, idf * tf * (k1 + 1) / (tf + norm[rows]))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, term: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Rank descriptions against a term with BM25.
+
+        Args:
+            term: Search term
+            top_k: Maximum number of matches
+
+        Returns:
+            Pinecone-shaped matches (id, score, metadata), best first
+        """
+        hits = [self._postings[token] for token in tokenize(term) if token in self._postings]
+        if not hits:
+            return []
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for rows, weights in hits:
+            scores[rows] += weights
+        candidates = np.unique(np.concatenate([rows for rows, _ in hits]))
+        if len(candidates) > top_k:
+            best = np.argpartition(-scores[candidates], top_k - 1)[:top_k]
+            candidates = candidates[best]
+        ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [self._match(int(row), float(scores[row])) for row in ordered]
+
+    def exact_match(self, term: str) -> Optional[Dict[str, Any]]:
+        """
+        The single code whose description (or code) equals the term.
+
+        Returns:
+            The match, or None if no code or several distinct codes match
+        """
+        rows = self._exact.get(" ".join(tokenize(term)))
+        if not rows or len({self.ids[row] for row in rows}) != 1:
+            return None
+        return self._match(rows[0], 1.0)
+
+    def _match(self, row: int, score: float) -> Dict[str, Any]:
+        return {"id": self.ids[row], "score": score, "metadata": self.metadata[row]}
+
+    def save(self, directory: str) -> None:
+        """Write the index documents to ``directory/lexical.json``"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "name": self.name,
+                "version": self.version,
+                "documents": [
+                    {"id": code, "text": text, "metadata": row_metadata}
+                    for code, text, row_metadata in zip(self.ids, self.texts, self.metadata)
+                ],
+            }, f)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["LexicalIndex"]:
+        """Load ``directory/lexical.json``; None if the index was not built"""
+        path = os.path.join(directory, cls.FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        documents = data["documents"]
+        return cls(
+            ids=[doc["id"] for doc in documents],
+            texts=[doc["text"] for doc in documents],
+            metadata=[doc.get("metadata", {}) for doc in documents],
+            name=data.get("name", ""),
+            version=str(data.get("version", ""))
+        )
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[Any]],
+    top_k: int,
+    k: int = 60,
+    dense: Optional[int] = None
+) -> QueryResult:
+    """
+    Fuse ranked match lists with reciprocal rank fusion.
+
+    Each match contributes ``1 / (k + rank)`` per list it appears in. Scores
+    are scaled so a match ranked first in every list scores 1.0. Fused
+    matches are marked ``score_type="rrf"``; the cosine similarity from the
+    dense list, when there is one, is kept as ``cosine``.
+
+    Args:
+        ranked_lists: Match lists (Pinecone matches or lexical matches), best first
+        top_k: Number of fused matches to return
+        k: RRF rank constant
+        dense: Position of the dense (cosine-scored) list in ``ranked_lists``
+
+    Returns:
+        QueryResult with fused matches, best first
+    """
+    fused: Dict[str, float] = {}
+    metadata: Dict[str, Any] = {}
+    cosine: Dict[str, float] = {}
+    for position, matches in enumerate(ranked_lists):
+        for rank, match in enumerate(matches, start=1):
+            code = match["id"]
+            fused[code] = fused.get(code, 0.0) + 1.0 / (k + rank)
+            metadata.setdefault(code, match["metadata"])
+            if position == dense:
+                cosine[code] = float(match["score"])
+
+    scale = (k + 1) / max(len(ranked_lists), 1)
+    best = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
+    return QueryResult([
+        {"id": code, "score": score * scale, "score_type": "rrf",
+         "cosine": cosine.get(code), "metadata": metadata[code]}
+        for code, score in best
+    ])
@@ -4,8 +4,37 @@ Initialize all LLM models used by CrewAI agents
 """
 
 import os
-from crewai import LLM
+import threading
+from typing import TYPE_CHECKING, List, Optional, Tuple
 from app.core.config import settings
+from app.core.replay import replay
+
+if TYPE_CHECKING:
+    from crewai import LLM
+
+
+# Model ids (also part of the pipeline result cache key)
+KIMI_K2_MODEL = "groq/moonshotai/kimi-k2-instruct-0905"
+LLAMA_4_MAVERICK_MODEL = "groq/meta-llama/llama-4-maverick-17b-128e-instruct"
+LLAMA_3_3_70B_MODEL = "groq/llama-3.3-70b-versatile"
+GEMINI_FLASH_MODEL = "gemini/gemini-2.5-flash"
+XIAOMI_MIMO_MODEL = "openrouter/xiaomi/mimo-v2-flash:free"
+
+# Model used by each pipeline stage
+STAGE_MODELS = {
+    "entities": GEMINI_FLASH_MODEL,
+    "icd_codes": KIMI_K2_MODEL,
+    "hcpcs_codes": XIAOMI_MIMO_MODEL,
+    "cpt_codes": LLAMA_3_3_70B_MODEL,
+}
+
+# Ordered fallbacks per stage, on a different provider than the primary model
+STAGE_FALLBACK_MODELS = {
+    "entities": [LLAMA_3_3_70B_MODEL],
+    "icd_codes": [GEMINI_FLASH_MODEL],
+    "hcpcs_codes": [LLAMA_3_3_70B_MODEL],
+    "cpt_codes": [GEMINI_FLASH_MODEL],
+}
 
 
 def setup_llm_environment():
@@ -15,35 +44,51 @@ def setup_llm_environment():
     os.environ["OPENROUTER_API_KEY"] = settings.OPENROUTER_API_KEY
 
 
-def get_kimi_k2() -> LLM:
+def _create_llm(model: str) -> "LLM":
+    """CrewAI LLM for a model id, running through the shared LLM call hooks"""
+    from app.core.guarded_llm import create_guarded_llm
+    if replay.replaying:
+        # Served through LiteLLM by the in-process OpenAI-compatible replay server
+        from app.core.replay_server import replay_llm_server
+        return create_guarded_llm(
+            model,
+            route_model=f"openai/{model}",
+            base_url=replay_llm_server.start(),
+            api_key="replay"
+        )
+    return create_guarded_llm(model)
+
+
+def get_kimi_k2() -> "LLM":
     """Kimi K2 model via Groq - for ICD coding"""
-    return LLM(model="groq/moonshotai/kimi-k2-instruct-0905")
+    return _create_llm(KIMI_K2_MODEL)
 
 
-def get_llama_4_maverick() -> LLM:
+def get_llama_4_maverick() -> "LLM":
     """Llama 4 Maverick model via Groq"""
-    return LLM(model="groq/meta-llama/llama-4-maverick-17b-128e-instruct")
+    return _create_llm(LLAMA_4_MAVERICK_MODEL)
 
 
-def get_llama_3_3_70b() -> LLM:
+def get_llama_3_3_70b() -> "LLM":
     """Llama 3.3 70B model via Groq - for CPT coding (stable tool calling)"""
-    return LLM(model="groq/llama-3.3-70b-versatile")
+    return _create_llm(LLAMA_3_3_70B_MODEL)
 
 
-def get_gemini_flash() -> LLM:
+def get_gemini_flash() -> "LLM":
     """Gemini 2.5 Flash model - for entity structuring"""
-    return LLM(model="gemini/gemini-2.5-flash")
+    return _create_llm(GEMINI_FLASH_MODEL)
 
 
-def get_xiaomi_mimo() -> LLM:
+def get_xiaomi_mimo() -> "LLM":
     """Xiaomi MIMO v2 Flash via OpenRouter - for HCPCS coding"""
-    return LLM(model="openrouter/xiaomi/mimo-v2-flash:free")
+    return _create_llm(XIAOMI_MIMO_MODEL)
 
 
 # Initialize LLM instances (lazy loading)
 class LLMModels:
     """Container for all LLM model instances"""
     _instance = None
+    _init_lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
@@ -52,31 +97,54 @@ class LLMModels:
         return cls._instance
     
     def initialize(self):
-        """Initialize all LLM models"""
-        if not self._initialized:
-            setup_llm_environment()
-            self.gemini_flash = get_gemini_flash()
-            self.kimi_k2 = get_kimi_k2()
-            self.llama_3_3_70b = get_llama_3_3_70b()
-            self.xiaomi_mimo = get_xiaomi_mimo()
-            self._initialized = True
+        """Initialize all LLM models (once, even when called from several threads)"""
+        if self._initialized:
+            return
+        with self._init_lock:
+            if not self._initialized:
+                setup_llm_environment()
+                self.gemini_flash = get_gemini_flash()
+                self.kimi_k2 = get_kimi_k2()
+                self.llama_3_3_70b = get_llama_3_3_70b()
+                self.xiaomi_mimo = get_xiaomi_mimo()
+                self._by_model = {
+                    GEMINI_FLASH_MODEL: self.gemini_flash,
+                    KIMI_K2_MODEL: self.kimi_k2,
+                    LLAMA_3_3_70B_MODEL: self.llama_3_3_70b,
+                    XIAOMI_MIMO_MODEL: self.xiaomi_mimo,
+                }
+                self._initialized = True
+    
+    def get_stage_llms(self, stage: str, fallbacks: Optional[bool] = None) -> List[Tuple[str, "LLM"]]:
+        """
+        Ordered (model id, LLM) candidates for a pipeline stage, primary first.
+        
+        Args:
+            stage: Pipeline stage name
+            fallbacks: Include STAGE_FALLBACK_MODELS (default: LLM_FAILOVER_ENABLED)
+        """
+        self.initialize()
+        models = [STAGE_MODELS[stage]]
+        if settings.LLM_FAILOVER_ENABLED if fallbacks is None else fallbacks:
+            models += STAGE_FALLBACK_MODELS.get(stage, [])
+        return [(model, self._by_model[model]) for model in models]
     
-    def get_entity_structuring_llm(self) -> LLM:
+    def get_entity_structuring_llm(self) -> "LLM":
         """LLM for entity structuring agent"""
         self.initialize()
         return self.gemini_flash
     
-    def get_icd_coding_llm(self) -> LLM:
+    def get_icd_coding_llm(self) -> "LLM":
         """LLM for ICD coding agent"""
         self.initialize()
         return self.kimi_k2
     
-    def get_cpt_coding_llm(self) -> LLM:
+    def get_cpt_coding_llm(self) -> "LLM":
         """LLM for CPT coding agent"""
         self.initialize()
         return self.llama_3_3_70b
     
-    def get_hcpcs_coding_llm(self) -> LLM:
+    def get_hcpcs_coding_llm(self) -> "LLM":
         """LLM for HCPCS coding agent"""
         self.initialize()
         return self.xiaomi_mimo
@@ -0,0 +1,22 @@
+"""
+LLM Hook Chain
+The hooks every agent and judge LLM call runs through
+"""
+
+from typing import List
+from app.core.hedging import hedge_cancel_hook
+from app.core.cancellation import request_cancel_hook
+from app.core.completion_cache import completion_cache_hook
+from app.core.rate_limiter import rate_limit_hook
+from app.core.replay import replay_record_hook
+from app.core.llm_hooks import LLMHook
+
+# Applied in order: stop a cancelled request or hedge, answer from the cache,
+# hold a rate limit slot around the request, record the exchange for replay
+LLM_CALL_HOOKS: List[LLMHook] = [
+    request_cancel_hook,
+    hedge_cancel_hook,
+    completion_cache_hook,
+    rate_limit_hook,
+    replay_record_hook,
+]
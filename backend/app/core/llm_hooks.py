@@ -0,0 +1,90 @@
+"""
+LLM Call Hooks
+Small, independent steps run around every agent LLM call
+"""
+
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+
+class LLMCall:
+    """
+    One LLM request as seen by the hooks.
+
+    ``tools`` are the tools offered to an agent; ``response_format`` is the
+    JSON schema of a structured-output call (the judge), whose completion
+    is that JSON as text.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        messages: Any,
+        tools: Any = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stage: Optional[str] = None,
+        response_format: Any = None
+    ):
+        self.model = model
+        self.messages = messages
+        self.tools = tools
+        self.response_format = response_format
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.stage = stage
+        self.completion: Any = None
+        self.latency_ms = 0.0
+        self.cache_key: Optional[str] = None
+
+
+class LLMHook:
+    """
+    Base class of a call hook; override only the phases you need.
+
+    ``before`` may answer the call itself (skipping the provider and every
+    later hook), ``around`` wraps the provider request and ``after`` sees
+    the completion.
+    """
+
+    def before(self, call: LLMCall) -> Optional[Any]:
+        return None
+
+    @contextmanager
+    def around(self, call: LLMCall) -> Iterator[None]:
+        yield
+
+    def after(self, call: LLMCall):
+        pass
+
+
+def run_llm_call(hooks: Sequence[LLMHook], call: LLMCall, send: Callable[[], Any]) -> Any:
+    """
+    Run ``send`` (the provider request) through ``hooks``, in order.
+
+    Args:
+        hooks: Hooks to apply; ``before`` and ``after`` run in list order,
+            ``around`` contexts nest in list order
+        call: Description of the request
+        send: Performs the request and returns the completion
+
+    Returns:
+        The completion, or the answer of the first ``before`` that gave one
+    """
+    for hook in hooks:
+        answer = hook.before(call)
+        if answer is not None:
+            return answer
+
+    with ExitStack() as stack:
+        for hook in hooks:
+            stack.enter_context(hook.around(call))
+        started = time.perf_counter()
+        call.completion = send()
+        call.latency_ms = 1000 * (time.perf_counter() - started)
+
+    for hook in hooks:
+        hook.after(call)
+    return call.completion
+
@@ -0,0 +1,160 @@
+"""
+LLM Stage Retry Policy
+Jittered exponential backoff and ordered model failover for pipeline stages
+"""
+
+import time
+import random
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from app.core.config import settings
+from app.utils.exceptions import CodingAgentError, LLMRateLimitError
+
+# Exception class names (LiteLLM / OpenAI / httpx) that mark transient failures
+TRANSIENT_ERROR_NAMES = {
+    "RateLimitError",
+    "ServiceUnavailableError",
+    "InternalServerError",
+    "APIConnectionError",
+    "APITimeoutError",
+    "Timeout",
+    "TimeoutException",
+    "ConnectError",
+    "ReadTimeout",
+}
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Whether an error is worth retrying: 429, 408 and 5xx responses, timeouts,
+    connection errors and local rate-limit waits, anywhere in the cause chain.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, (LLMRateLimitError, TimeoutError, ConnectionError)):
+            return True
+        if type(error).__name__ in TRANSIENT_ERROR_NAMES:
+            return True
+        status_code = getattr(error, "status_code", None)
+        if isinstance(status_code, int) and (status_code in (408, 429) or status_code >= 500):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Retry-After header of a provider response carried by the error, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class StageRetryPolicy:
+    """
+    Runs one pipeline stage against an ordered list of models.
+
+    Transient errors are retried on the same model up to ``attempts`` times
+    with full-jitter exponential backoff (honouring a provider Retry-After
+    when one is given), then the next model in the list takes over. Other
+    errors fail the stage immediately. Every attempt is recorded so the
+    response can show what happened.
+    """
+
+    def __init__(
+        self,
+        attempts: Optional[int] = None,
+        base_seconds: Optional[float] = None,
+        max_seconds: Optional[float] = None
+    ):
+        self.attempts = attempts or settings.LLM_RETRY_ATTEMPTS
+        self.base_seconds = base_seconds if base_seconds is not None else settings.LLM_RETRY_BASE_SECONDS
+        self.max_seconds = max_seconds if max_seconds is not None else settings.LLM_RETRY_MAX_SECONDS
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.failovers = 0
+        self.exhausted = 0
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        """Seconds to wait before retry number ``attempt`` (1-based)"""
+        delay = random.uniform(0, min(self.max_seconds, self.base_seconds * 2 ** (attempt - 1)))
+        hint = retry_after_seconds(error)
+        if hint is not None:
+            delay = max(delay, min(hint, self.max_seconds))
+        return delay
+
+    def run(
+        self,
+        stage: str,
+        candidates: Sequence[Tuple[str, Any]],
+        fn: Callable[[Any], Any]
+    ) -> Tuple[Any, List[Dict[str, Any]]]:
+        """
+        Run ``fn`` with each candidate LLM in turn until one succeeds.
+
+        Args:
+            stage: Stage name (for error messages)
+            candidates: Ordered (model id, LLM) pairs, primary first
+            fn: Callable running the stage with the given LLM
+
+        Returns:
+            Tuple of (fn result, attempt records)
+
+        Raises:
+            CodingAgentError: If every candidate failed; the last error is chained
+        """
+        records: List[Dict[str, Any]] = []
+        retries_per_model = self.attempts if settings.LLM_RETRY_ENABLED else 1
+        last_error: Optional[BaseException] = None
+
+        for index, (model, llm) in enumerate(candidates):
+            if index > 0:
+                with self._lock:
+                    self.failovers += 1
+            for attempt in range(1, retries_per_model + 1):
+                try:
+                    result = fn(llm)
+                except Exception as e:
+                    last_error = e
+                    record = {"model": model, "attempt": attempt, "status": "failed",
+                              "error": f"{type(e).__name__}: {e}"[:500]}
+                    records.append(record)
+                    if not is_transient(e):
+                        raise CodingAgentError(
+                            f"Stage {stage} failed on {model}: {e}",
+                            {"attempts": records}
+                        ) from e
+                    if attempt < retries_per_model:
+                        record["backoff_seconds"] = round(self.backoff(attempt, e), 2)
+                        with self._lock:
+                            self.retries += 1
+                        time.sleep(record["backoff_seconds"])
+                    continue
+                records.append({"model": model, "attempt": attempt, "status": "succeeded"})
+                return result, records
+
+        with self._lock:
+            self.exhausted += 1
+        raise CodingAgentError(
+            f"Stage {stage} failed after {len(records)} attempts: {last_error}",
+            {"attempts": records}
+        ) from last_error
+
+    def stats(self) -> Dict[str, Any]:
+        """Retry, failover and give-up counters"""
+        with self._lock:
+            return {
+                "enabled": settings.LLM_RETRY_ENABLED,
+                "failover_enabled": settings.LLM_FAILOVER_ENABLED,
+                "attempts_per_model": self.attempts,
+                "retries": self.retries,
+                "failovers": self.failovers,
+                "exhausted": self.exhausted,
+            }
+
+
+# Global stage retry policy
+stage_retry_policy = StageRetryPolicy()
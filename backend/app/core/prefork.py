@@ -0,0 +1,88 @@
+"""
+Pre-fork Model Sharing
+Load the embedding model and read-only code tables once in the server master
+"""
+
+import gc
+import os
+import time
+from typing import Dict
+from app.core.config import settings
+from app.core.vector_db import vector_db
+from app.core.vector_store import reset_pinecone_client
+
+
+CODE_SYSTEMS = ("ICD", "CPT", "HCPCS")
+
+
+def preload() -> Dict[str, str]:
+    """
+    Load shared read-only state in the master process before workers fork.
+
+    The embedding model weights, local vector indexes and BM25 tables are
+    loaded here so every worker maps the same pages copy-on-write instead of
+    loading its own copy. No forward pass runs in the master: thread pools
+    and tokenizer parallelism are not fork-safe, so each worker's warmup
+    runs its first pass itself. Remote clients (Pinecone, the embedding
+    server) are left for the workers to open.
+
+    Returns:
+        Component name -> "ok" or the error that left it to the workers
+    """
+    started = time.perf_counter()
+    loaded: Dict[str, str] = {}
+
+    try:
+        vector_db.initialize()
+        loaded["embedding_model"] = "ok"
+    except Exception as e:
+        # Workers load their own copy on warmup
+        loaded["embedding_model"] = f"{type(e).__name__}: {e}"
+        print(f"⚠️  Pre-fork embedding model load failed: {e}")
+        return loaded
+
+    if vector_db.embedding_client is not None:
+        # The model lives in the embedding server; don't share its socket
+        vector_db.embedding_client.close()
+
+    for code_system in CODE_SYSTEMS:
+        tables = []
+        if settings.VECTOR_STORE_BACKEND.lower() == "local":
+            tables.append(("vectors", vector_db.get_index))
+        if settings.LEXICAL_SEARCH_ENABLED:
+            tables.append(("lexical", vector_db.get_lexical_index))
+        for kind, load in tables:
+            try:
+                table = load(code_system)
+                loaded[f"{code_system.lower()}_{kind}"] = "ok" if table is not None else "not built"
+            except Exception as e:
+                loaded[f"{code_system.lower()}_{kind}"] = f"{type(e).__name__}: {e}"
+                print(f"⚠️  Pre-fork {code_system} {kind} table not loaded: {e}")
+
+    # Move everything loaded so far out of the collector's generations, so
+    # collections in the workers don't write to (and un-share) these pages
+    gc.collect()
+    gc.freeze()
+    print(f"🧠 Pre-fork preload done in {time.perf_counter() - started:.1f}s "
+          f"({sum(state == 'ok' for state in loaded.values())}/{len(loaded)} components)")
+    return loaded
+
+
+def after_fork(workers: int):
+    """
+    Reset per-process state in a freshly forked worker.
+
+    Args:
+        workers: Number of workers sharing the host, used to split CPU
+            threads when EMBEDDING_NUM_THREADS is 0
+    """
+    reset_pinecone_client()
+
+    if not vector_db._initialized:
+        return
+    if vector_db.embedding_client is not None:
+        vector_db.embedding_client.close()
+    if vector_db.embedding_model is not None:
+        import torch
+        threads = settings.EMBEDDING_NUM_THREADS or max(1, (os.cpu_count() or 1) // workers)
+        torch.set_num_threads(threads)
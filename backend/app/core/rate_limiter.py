@@ -0,0 +1,246 @@
+"""
+LLM Rate Limiter
+Process-wide token buckets for requests/min and tokens/min per provider and model
+"""
+
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+from app.core.config import settings
+from app.core.llm_hooks import LLMCall, LLMHook
+from app.utils.exceptions import LLMRateLimitError
+
+# Rough characters-per-token ratio used to estimate prompt and completion sizes
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(content: Any) -> int:
+    """Approximate token count of a prompt, message list or response"""
+    if content is None:
+        return 0
+    if not isinstance(content, str):
+        try:
+            content = json.dumps(content, default=str)
+        except (TypeError, ValueError):
+            content = str(content)
+    return len(content) // CHARS_PER_TOKEN + 1
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Parse LLM_RATE_LIMITS.
+
+    Args:
+        spec: Comma-separated ``<provider or provider/model>=<rpm>:<tpm>``
+            entries; 0 disables that dimension
+
+    Returns:
+        Limit key -> (requests per minute, tokens per minute)
+    """
+    limits = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        key, _, values = entry.strip().rpartition("=")
+        rpm, _, tpm = values.partition(":")
+        limits[key.strip()] = (float(rpm or 0), float(tpm or 0))
+    return limits
+
+
+class TokenBucket:
+    """Refills continuously at ``per_minute / 60`` per second up to ``per_minute``"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until ``amount`` is available (requests larger than the bucket wait for a full one)"""
+        needed = min(amount, self.capacity) - self.level
+        return max(needed, 0.0) / self.rate
+
+
+class ModelLimiter:
+    """Requests/min and tokens/min buckets shared by every caller of one limit key"""
+
+    def __init__(self, key: str, rpm: float, tpm: float):
+        self.key = key
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.waited = 0
+        self.timeouts = 0
+        self.tokens_used = 0
+        self.wait_times = deque(maxlen=1000)
+
+    def acquire(self, tokens: int, max_wait: float) -> float:
+        """
+        Block until one request and ``tokens`` tokens are available.
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            LLMRateLimitError: If the budget would not free up within ``max_wait``
+        """
+        started = time.monotonic()
+        slept = False
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                wait = 0.0
+                for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+                    if bucket is not None:
+                        bucket.refill(now)
+                        wait = max(wait, bucket.wait_for(amount))
+
+                if wait <= 0:
+                    if self.requests is not None:
+                        self.requests.level -= 1
+                    if self.tokens is not None:
+                        # May go negative for oversized prompts; later calls repay the debt
+                        self.tokens.level -= tokens
+                    waited = now - started if slept else 0.0
+                    self.calls += 1
+                    self.waited += slept
+                    self.wait_times.append(waited)
+                    return waited
+
+                if now - started + wait > max_wait:
+                    self.timeouts += 1
+                    raise LLMRateLimitError(
+                        f"Rate limit for {self.key} would need a {wait:.0f}s wait",
+                        {"key": self.key, "wait_seconds": round(wait, 1)}
+                    )
+            time.sleep(wait)
+            slept = True
+
+    def settle(self, reserved: int, used: int):
+        """Correct the tokens/min bucket once the actual call size is known"""
+        with self.lock:
+            self.tokens_used += used
+            if self.tokens is not None:
+                self.tokens.level = min(self.tokens.capacity, self.tokens.level + reserved - used)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            waits = sorted(self.wait_times)
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "calls": self.calls,
+                "waited": self.waited,
+                "timeouts": self.timeouts,
+                "tokens_used": self.tokens_used,
+                "wait_ms_avg": round(1000 * sum(waits) / len(waits), 1) if waits else 0.0,
+                "wait_ms_p95": round(1000 * waits[int(0.95 * (len(waits) - 1))], 1) if waits else 0.0,
+                "wait_ms_max": round(1000 * waits[-1], 1) if waits else 0.0,
+            }
+
+
+class LLMRateLimiter:
+    """
+    Shared rate limiter for every LLM call in the process.
+
+    Limits are configured per ``provider/model`` or per ``provider``. A
+    model entry gives that model its own buckets; a provider entry is one
+    budget shared by all of the provider's models without their own entry.
+    Models with no matching entry are counted but not limited.
+
+    Each call reserves one request and its estimated prompt plus completion
+    tokens, waiting while either bucket is empty, and settles the token
+    bucket with the measured size afterwards.
+    """
+
+    def __init__(self, limits: Optional[str] = None, max_wait: Optional[float] = None):
+        self.limits = parse_rate_limits(limits if limits is not None else settings.LLM_RATE_LIMITS)
+        self.max_wait = max_wait if max_wait is not None else settings.LLM_RATE_LIMIT_MAX_WAIT_SECONDS
+        self._limiters: Dict[str, ModelLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter_for(self, model: str) -> ModelLimiter:
+        """Limiter for a LiteLLM-style model id such as ``groq/llama-3.3-70b-versatile``"""
+        provider = model.split("/", 1)[0]
+        key = model if model in self.limits or provider not in self.limits else provider
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                rpm, tpm = self.limits.get(key, (0.0, 0.0))
+                limiter = self._limiters[key] = ModelLimiter(key, rpm, tpm)
+            return limiter
+
+    @contextmanager
+    def limit(self, model: str, prompt: Any, max_tokens: Optional[int] = None) -> Iterator["_Usage"]:
+        """
+        Hold a request slot and token budget for one LLM call.
+
+        Args:
+            model: Model id, prefixed with its provider
+            prompt: Prompt text or message list (used to estimate tokens)
+            max_tokens: Completion limit of the call, if set
+
+        Yields:
+            Usage record; set ``completion`` to the response to settle the
+            token estimate (otherwise the reservation stands)
+        """
+        usage = _Usage(estimate_tokens(prompt))
+        if not settings.LLM_RATE_LIMIT_ENABLED:
+            yield usage
+            return
+
+        limiter = self.limiter_for(model)
+        reserved = usage.prompt_tokens + (max_tokens or settings.LLM_RATE_LIMIT_COMPLETION_TOKENS)
+        limiter.acquire(reserved, self.max_wait)
+        try:
+            yield usage
+        finally:
+            used = reserved if usage.completion is None else usage.prompt_tokens + estimate_tokens(usage.completion)
+            limiter.settle(reserved, used)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-limit call counts and wait times"""
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {
+            "enabled": settings.LLM_RATE_LIMIT_ENABLED,
+            "limits": {key: limiter.stats() for key, limiter in sorted(limiters.items())},
+        }
+
+
+class _Usage:
+    """Token estimate of one limited call"""
+
+    def __init__(self, prompt_tokens: int):
+        self.prompt_tokens = prompt_tokens
+        self.completion: Any = None
+
+
+class RateLimitHook(LLMHook):
+    """Holds a shared limiter slot around each agent and judge LLM request"""
+
+    @contextmanager
+    def around(self, call: LLMCall) -> Iterator[None]:
+        with llm_rate_limiter.limit(call.model, call.messages, call.max_tokens) as usage:
+            try:
+                yield
+            finally:
+                usage.completion = call.completion
+
+
+# Global rate limiter instance
+llm_rate_limiter = LLMRateLimiter()
+
+# Rate limit hook for agent and judge LLM calls (see app/core/llm_hook_chain.py)
+rate_limit_hook = RateLimitHook()
@@ -0,0 +1,323 @@
+"""
+Record / Replay Harness
+Capture a run's LLM exchanges and index queries, then serve them offline
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.core.llm_hooks import LLMCall, LLMHook
+from app.core.vector_store import QueryResult, VectorStore
+from app.utils.exceptions import ReplayMissError
+
+
+def _message_text(content: Any) -> str:
+    """Text of a message's content (plain string or OpenAI content parts)"""
+    if isinstance(content, list):
+        content = "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part) for part in content
+        )
+    return str(content or "").strip()
+
+
+def exchange_key(model: str, messages: Any, tools: Any = None) -> str:
+    """
+    Key of one LLM exchange, identical whether computed from the CrewAI
+    ``LLM.call`` arguments (record) or the OpenAI request body LiteLLM sends
+    to the fake server (replay).
+
+    Messages are reduced to (role, text) and tools to their names, so
+    provider-specific formatting differences do not change the key.
+    """
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    normalized = [(m.get("role"), _message_text(m.get("content"))) for m in messages or []]
+    tool_names = sorted(
+        (tool.get("function") or tool).get("name", "") if isinstance(tool, dict) else str(tool)
+        for tool in tools or []
+    )
+    payload = json.dumps([model, normalized, tool_names], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def vector_digest(vector) -> str:
+    """Digest identifying an embedding handed from the embedder to an index query"""
+    return hashlib.sha1(np.asarray(vector, dtype=np.float32).tobytes()).hexdigest()
+
+
+def _match_dict(match) -> Dict[str, Any]:
+    """Plain-dict copy of a Pinecone (or local) match"""
+    metadata = match["metadata"]
+    return {
+        "id": match["id"],
+        "score": float(match["score"]),
+        "metadata": dict(metadata) if metadata is not None else {},
+    }
+
+
+class ReplayEmbedder:
+    """
+    Model-free stand-in for the embedding model during replay.
+
+    Vectors are derived from a hash of the text, so they are stable across
+    runs; the fake index maps them back to the recorded term.
+    """
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, texts: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        rows = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            rows.append(np.random.default_rng(seed).standard_normal(self.dimension))
+        return np.asarray(rows, dtype=np.float32)
+
+
+class ReplayHarness:
+    """
+    Records or replays the external calls of pipeline runs (REPLAY_MODE).
+
+    record: every CrewAI LLM exchange, judge verdict and index query of the
+        run is appended to REPLAY_FIXTURE (JSON lines) with its latency.
+    replay: the fixture is served back. LLM stages talk to an in-process
+        OpenAI-compatible server through LiteLLM, index queries go to a fake
+        Pinecone index, the embedding model is replaced by ReplayEmbedder,
+        the judge returns its recorded verdict and Langfuse is a no-op.
+        REPLAY_LLM_LATENCY_MS / REPLAY_QUERY_LATENCY_MS inject latency
+        (-1 replays the recorded latency).
+    """
+
+    def __init__(self):
+        self.mode = settings.REPLAY_MODE.lower()
+        self.path = settings.REPLAY_FIXTURE
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._llm: Dict[str, Dict[str, Any]] = {}
+        self._judge: Dict[str, Dict[str, Any]] = {}
+        self._queries: Dict[Tuple[str, str, int], Dict[str, Any]] = {}
+        self._texts: Dict[str, str] = {}
+        self._file = None
+        self._random = random.Random(settings.REPLAY_SEED)
+        self.dimension = 0
+        self.served = 0
+        self.misses = 0
+        self.recorded = 0
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def load(self):
+        """Read the fixture (replay mode)"""
+        with self._lock:
+            if self._loaded:
+                return
+            if not os.path.exists(self.path):
+                raise ReplayMissError(f"Replay fixture not found: {self.path}")
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    kind = record.get("kind")
+                    if kind == "llm":
+                        self._llm[record["key"]] = record
+                    elif kind == "judge":
+                        self._judge[record["key"]] = record
+                    elif kind == "query":
+                        self._queries[(record["index"], record["text"], record["top_k"])] = record
+                        self.dimension = record.get("dimension") or self.dimension
+            self._loaded = True
+            print(f"🎞️  Replay fixture loaded: {len(self._llm)} LLM exchanges, "
+                  f"{len(self._queries)} index queries, {len(self._judge)} judge verdicts")
+
+    def _append(self, record: Dict[str, Any]):
+        with self._lock:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record, default=str) + "\n")
+            self._file.flush()
+            self.recorded += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _sleep(self, configured_ms: float, recorded_ms: Optional[float]):
+        delay_ms = (recorded_ms or 0.0) if configured_ms < 0 else configured_ms
+        if delay_ms and settings.REPLAY_LATENCY_JITTER > 0:
+            with self._lock:
+                factor = 1 + self._random.uniform(-1, 1) * settings.REPLAY_LATENCY_JITTER
+            delay_ms *= factor
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+    def record_llm(self, model: str, messages: Any, tools: Any, response: str,
+                   latency_ms: float, stage: Optional[str] = None):
+        self._append({
+            "kind": "llm",
+            "key": exchange_key(model, messages, tools),
+            "model": model,
+            "stage": stage,
+            "messages": messages,
+            "response": response,
+            "latency_ms": round(latency_ms, 1),
+        })
+
+    def llm_response(self, model: str, messages: Any, tools: Any = None) -> str:
+        """Recorded completion text for an exchange, after the injected latency"""
+        self.load()
+        record = self._llm.get(exchange_key(model, messages, tools))
+        self._count(record is not None)
+        if record is None:
+            raise ReplayMissError(f"No recorded {model} exchange for this conversation")
+        self._sleep(settings.REPLAY_LLM_LATENCY_MS, record.get("latency_ms"))
+        return record["response"]
+
+    @staticmethod
+    def _judge_key(model: str, prompt: List[str]) -> str:
+        return exchange_key(model, [{"role": "user", "content": part} for part in prompt])
+
+    def record_judge(self, model: str, prompt: List[str], verdict: Dict[str, Any], latency_ms: float):
+        self._append({
+            "kind": "judge",
+            "key": self._judge_key(model, prompt),
+            "model": model,
+            "response": verdict,
+            "latency_ms": round(latency_ms, 1),
+        })
+
+    def judge_response(self, model: str, prompt: List[str]) -> Dict[str, Any]:
+        self.load()
+        record = self._judge.get(self._judge_key(model, prompt))
+        self._count(record is not None)
+        if record is None:
+            raise ReplayMissError("No recorded judge verdict for this coding output")
+        self._sleep(settings.REPLAY_LLM_LATENCY_MS, record.get("latency_ms"))
+        return record["response"]
+
+    def register_vectors(self, texts: List[str], vectors: List[list]):
+        """Remember which term each embedding came from, for recording and replay"""
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                self._texts[vector_digest(vector)] = text
+
+    def text_for_vector(self, vector) -> Optional[str]:
+        with self._lock:
+            return self._texts.get(vector_digest(vector))
+
+    def record_query(self, index: str, vector, top_k: int, matches: List[Any], latency_ms: float):
+        self._append({
+            "kind": "query",
+            "index": index,
+            "text": self.text_for_vector(vector),
+            "top_k": top_k,
+            "dimension": len(vector),
+            "matches": [_match_dict(match) for match in matches],
+            "latency_ms": round(latency_ms, 1),
+        })
+
+    def query_response(self, index: str, vector, top_k: int) -> List[Dict[str, Any]]:
+        self.load()
+        record = self._queries.get((index, self.text_for_vector(vector), top_k))
+        self._count(record is not None)
+        if record is None:
+            raise ReplayMissError(f"No recorded {index} query for this term")
+        self._sleep(settings.REPLAY_QUERY_LATENCY_MS, record.get("latency_ms"))
+        return record["matches"]
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.served += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "fixture": self.path,
+                "recorded": self.recorded,
+                "served": self.served,
+                "misses": self.misses,
+            }
+
+
+class RecordingVectorStore(VectorStore):
+    """Wraps a real index and records every query into the fixture"""
+
+    def __init__(self, store: VectorStore):
+        self.store = store
+        self.name = store.name
+        self.version = store.version
+
+    def query(self, vector, top_k: int = 5, include_metadata: bool = True, **kwargs):
+        started = time.perf_counter()
+        result = self.store.query(vector=vector, top_k=top_k, include_metadata=include_metadata, **kwargs)
+        replay.record_query(self.name, vector, top_k, result.matches, 1000 * (time.perf_counter() - started))
+        return result
+
+    def describe(self) -> Dict[str, Any]:
+        return self.store.describe()
+
+
+class ReplayVectorStore(VectorStore):
+    """Fake Pinecone index answering from the fixture"""
+
+    def __init__(self, name: str, version: str):
+        self.name = name
+        self.version = version
+
+    def query(self, vector, top_k: int = 5, include_metadata: bool = True, **kwargs) -> QueryResult:
+        return QueryResult(replay.query_response(self.name, vector, top_k))
+
+    def describe(self) -> Dict[str, Any]:
+        replay.load()
+        return {
+            "backend": "replay",
+            "name": self.name,
+            "version": self.version,
+            "dimension": replay.dimension or None,
+            "count": None,
+        }
+
+
+# Global record/replay harness
+replay = ReplayHarness()
+
+
+class ReplayRecordHook(LLMHook):
+    """Appends each agent text completion and judge verdict to the fixture in record mode"""
+
+    def after(self, call: LLMCall):
+        if not replay.recording or not isinstance(call.completion, str):
+            return
+        if call.response_format is not None:
+            replay.record_judge(call.model, call.messages, json.loads(call.completion), call.latency_ms)
+        else:
+            replay.record_llm(call.model, call.messages, call.tools, call.completion,
+                              call.latency_ms, call.stage)
+
+
+# Replay recording hook for agent and judge LLM calls
+replay_record_hook = ReplayRecordHook()
@@ -0,0 +1,105 @@
+"""
+Replay LLM Server
+In-process OpenAI-compatible chat completions endpoint serving recorded exchanges
+"""
+
+import json
+import time
+import uuid
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from app.core.replay import replay
+from app.core.rate_limiter import estimate_tokens
+from app.utils.exceptions import ReplayMissError
+
+
+class _ChatCompletionsHandler(BaseHTTPRequestHandler):
+    """Handles ``POST /v1/chat/completions`` (non-streaming)"""
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": f"Unknown path {self.path}", "type": "not_found"}})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if body.get("stream"):
+            self._send(400, {"error": {"message": "Streaming is not supported in replay", "type": "invalid_request_error"}})
+            return
+
+        model = body.get("model", "")
+        messages = body.get("messages", [])
+        try:
+            content = replay.llm_response(model, messages, body.get("tools"))
+        except ReplayMissError as e:
+            self._send(404, {"error": {"message": e.message, "type": "replay_miss"}})
+            return
+
+        prompt_tokens = estimate_tokens(messages)
+        completion_tokens = estimate_tokens(content)
+        self._send(200, {
+            "id": f"chatcmpl-replay-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _send(self, status: int, payload: dict):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # one line per completion would drown the crew's own logging
+
+
+class ReplayLLMServer:
+    """Runs the fake chat completions endpoint on a background thread"""
+
+    def __init__(self):
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> str:
+        """
+        Start the server on an ephemeral localhost port (once).
+
+        Returns:
+            OpenAI-style base URL, e.g. ``http://127.0.0.1:53121/v1``
+        """
+        with self._lock:
+            if self._server is None:
+                self._server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatCompletionsHandler)
+                self._server.daemon_threads = True
+                threading.Thread(
+                    target=self._server.serve_forever,
+                    name="replay-llm-server",
+                    daemon=True
+                ).start()
+            host, port = self._server.server_address[:2]
+            return f"http://{host}:{port}/v1"
+
+    def stop(self):
+        with self._lock:
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+                self._server = None
+
+
+# Global replay LLM server
+replay_llm_server = ReplayLLMServer()
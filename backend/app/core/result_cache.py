@@ -0,0 +1,250 @@
+"""
+Pipeline Result Cache
+TTL + LRU cache of whole pipeline responses, with an optional SQLite tier
+"""
+
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import importlib.util
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+
+# Modules whose source holds the agent and task prompts
+PROMPT_MODULES = (
+    "app.agents.entity_structuring_agent",
+    "app.agents.icd_coding_agent",
+    "app.agents.cpt_coding_agent",
+    "app.agents.hcpcs_coding_agent",
+)
+
+_fingerprint: Optional[str] = None
+_fingerprint_lock = threading.Lock()
+
+
+def _prompt_version() -> str:
+    """Digest of the agent prompt sources and the judge prompt"""
+    from app.services.judge_service import JUDGE_SYSTEM_PROMPT
+
+    digest = hashlib.sha256(JUDGE_SYSTEM_PROMPT.encode("utf-8"))
+    for module in PROMPT_MODULES:
+        # Read the source without importing it (agent modules import CrewAI)
+        with open(importlib.util.find_spec(module).origin, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def pipeline_fingerprint() -> str:
+    """
+    Hash of everything besides the note that determines a pipeline result.
+
+    Covers the stage and judge models, the prompt sources, the index names
+    and versions, and the embedding/retrieval configuration, so changing any
+    of them makes earlier results unreachable. Index versions come from the
+    active stores (a local index's manifest, or the configured Pinecone
+    version), so rebuilding a local index also retires its cached results.
+    """
+    global _fingerprint
+    with _fingerprint_lock:
+        if _fingerprint is None:
+            from app.core.llm_config import STAGE_MODELS, STAGE_FALLBACK_MODELS
+            from app.core.embedding_runtime import embedding_model_id
+            from app.core.vector_db import vector_db
+            from app.services.judge_service import JUDGE_MODEL
+
+            config = {
+                "app_version": settings.APP_VERSION,
+                "models": STAGE_MODELS,
+                "fallback_models": STAGE_FALLBACK_MODELS,
+                "judge_model": JUDGE_MODEL,
+                "prompts": _prompt_version(),
+                "indexes": [vector_db.index_namespace(code_system) for code_system in ("ICD", "CPT", "HCPCS")],
+                "vector_store": settings.VECTOR_STORE_BACKEND,
+                "embedding_model": embedding_model_id(),
+                "embedding_dimension": settings.EMBEDDING_DIMENSION,
+                "lexical": [settings.LEXICAL_SEARCH_ENABLED, settings.LEXICAL_SHORT_CIRCUIT,
+                            settings.LEXICAL_RRF_K, settings.LEXICAL_FUSION_DEPTH],
+            }
+            _fingerprint = hashlib.sha256(
+                json.dumps(config, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+        return _fingerprint
+
+
+def result_cache_key(text: str) -> str:
+    """
+    Cache key for a preprocessed note.
+
+    The judge evaluation is not part of the cached result (it is sampled and
+    run per request), so the key does not depend on ``include_evaluation``.
+
+    Args:
+        text: Output of ``preprocess_medical_text``
+
+    Returns:
+        Hex SHA-256 of the note and the pipeline fingerprint
+    """
+    digest = hashlib.sha256()
+    digest.update(pipeline_fingerprint().encode("ascii"))
+    digest.update(b"\x00")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SQLiteResultStore:
+    """
+    Result store in a SQLite file, shared by the workers on a host and kept
+    across restarts. WAL mode lets readers proceed while one worker writes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS results_expires ON results (expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._connection().execute(
+            "SELECT value FROM results WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, value: str, ttl_seconds: float) -> None:
+        with self._connection() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl_seconds)
+            )
+            db.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+
+    def clear(self) -> int:
+        with self._connection() as db:
+            return db.execute("DELETE FROM results").rowcount
+
+    def __len__(self) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM results WHERE expires_at > ?", (time.time(),)
+        ).fetchone()[0]
+
+
+class ResultCache:
+    """
+    Caches serialized PipelineResponse JSON by ``result_cache_key``.
+
+    Lookups check the in-memory LRU first, then the SQLite store when
+    RESULT_CACHE_DB is set; SQLite hits are promoted into memory.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        db_path: Optional[str] = None
+    ):
+        self.max_entries = max_entries or settings.RESULT_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.RESULT_CACHE_TTL_SECONDS
+        self.db_path = db_path if db_path is not None else settings.RESULT_CACHE_DB
+        self._store: Optional[SQLiteResultStore] = None
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def store(self) -> Optional[SQLiteResultStore]:
+        """SQLite tier, opened on first use (None when not configured)"""
+        if self._store is None and self.db_path:
+            self._store = SQLiteResultStore(self.db_path)
+        return self._store
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response JSON, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        value = self.store.get(key) if self.store is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._put_memory(key, value)
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        """Store a response in memory and, if configured, in SQLite"""
+        with self._lock:
+            self._put_memory(key, value)
+        if self.store is not None:
+            self.store.put(key, value, self.ttl_seconds)
+
+    def _put_memory(self, key: str, value: str):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def record_bypass(self):
+        with self._lock:
+            self.bypasses += 1
+
+    def invalidate(self) -> int:
+        """Drop every cached response; returns the number removed"""
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+        if self.store is not None:
+            removed = max(removed, self.store.clear())
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and entry counts"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "enabled": settings.RESULT_CACHE_ENABLED,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+            }
+        if self._store is not None:
+            stats["disk_entries"] = len(self._store)
+        return stats
+
+
+# Global result cache instance
+result_cache = ResultCache()
@@ -0,0 +1,106 @@
+"""
+Retrieval Result Cache
+TTL + LRU cache of compressed top-k matches per (index, version, term, top_k)
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+
+
+class RetrievalCache:
+    """
+    Caches the encoded top-k matches a search tool produces for a term.
+
+    Entries are namespaced by ``"<index name>@<index version>|<mode>"``,
+    where the mode records dense-only or hybrid retrieval and its fusion
+    settings, so a version bump or a retrieval settings change makes old
+    entries unreachable; ``invalidate`` drops them explicitly when an index
+    is rebuilt in place.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries or settings.RETRIEVAL_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.RETRIEVAL_CACHE_TTL_SECONDS
+        self._entries: "OrderedDict[Tuple[str, str, int], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, namespace: str, term: str, top_k: int) -> Optional[Any]:
+        """Return the cached result for a term, or None on miss/expiry"""
+        key = (namespace, term, top_k)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, namespace: str, term: str, top_k: int, value: Any) -> None:
+        """Store a result, evicting the least recently used entries if full"""
+        key = (namespace, term, top_k)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, index_name: Optional[str] = None) -> int:
+        """
+        Drop cached results.
+
+        Args:
+            index_name: Index whose entries (any version) to drop; all if None
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if index_name is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                keys = [
+                    key for key in self._entries
+                    if key[0].split("@", 1)[0] == index_name
+                ]
+                for key in keys:
+                    del self._entries[key]
+                removed = len(keys)
+            self.invalidations += removed
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and entry counts per namespace"""
+        with self._lock:
+            namespaces: Dict[str, int] = {}
+            for namespace, _, _ in self._entries:
+                namespaces[namespace] = namespaces.get(namespace, 0) + 1
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "namespaces": namespaces,
+            }
+
+
+# Global retrieval cache instance
+retrieval_cache = RetrievalCache()
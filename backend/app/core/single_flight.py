@@ -0,0 +1,173 @@
+"""
+Single-Flight Request Coalescing
+Concurrent calls with the same key share one in-flight execution
+"""
+
+import time
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.llm_retry import is_transient
+
+# Progress callback signature: callback(stage_name, status, output)
+ProgressCallback = Callable[[str, str, Any], None]
+
+
+class _Flight:
+    """One in-flight execution and the callers attached to it"""
+
+    def __init__(self):
+        self.future: Future = Future()
+        self.listeners: List[ProgressCallback] = []
+        self.progress: Dict[str, Tuple[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def attach(self, listener: Optional[ProgressCallback], replay_progress: bool = True):
+        """Add a progress listener and, unless told not to, replay the progress reported so far"""
+        if listener is None:
+            return
+        with self.lock:
+            self.listeners.append(listener)
+            replay = list(self.progress.items()) if replay_progress else []
+        for stage, (status, output) in replay:
+            listener(stage, status, output)
+
+    def detach(self, listener: Optional[ProgressCallback]):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def publish(self, stage: str, status: str, output: Any = None):
+        """Progress callback handed to the leader; fans out to every caller"""
+        with self.lock:
+            self.progress[stage] = (status, output)
+            listeners = list(self.listeners)
+        for listener in listeners:
+            try:
+                listener(stage, status, output)
+            except Exception:
+                pass  # a caller's callback must not break the shared run
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running (followers) wait for its result instead of
+    starting their own run, and receive its progress events.
+
+    Followers share the leader's outcome, failures included, so a request
+    that fails deterministically runs once however many callers wait on it.
+    Only a transient failure (a transient exception, or a result marked by
+    ``is_transient_failure``) sends followers to retry, once: one of them
+    becomes the new leader. A follower that joins another run on retry gets
+    only that run's new events, not its history, so stages it has already
+    seen are not reported twice. A follower that waits longer than
+    ``wait_timeout`` detaches and runs the function itself.
+    """
+
+    def __init__(self, wait_timeout: Optional[float] = None):
+        self.wait_timeout = wait_timeout if wait_timeout is not None else settings.SINGLE_FLIGHT_WAIT_SECONDS
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.follower_retries = 0
+        self.shared_failures = 0
+        self.timeouts = 0
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[[ProgressCallback], Any],
+        progress_callback: Optional[ProgressCallback] = None,
+        is_transient_failure: Callable[[Any], bool] = lambda result: False
+    ) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Content key identifying identical requests
+            fn: Callable taking a progress callback and returning the result
+            progress_callback: This caller's progress callback
+            is_transient_failure: Predicate marking failed results worth one retry
+
+        Returns:
+            Tuple of (result, True if the result came from another caller's run)
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        retrying = False
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _Flight()
+                    self._flights[key] = flight
+                    self.leaders += 1
+
+            flight.attach(progress_callback, replay_progress=not retrying)
+            if leader:
+                return self._lead(key, flight, fn), False
+
+            remaining = deadline - time.monotonic()
+            try:
+                result = flight.future.result(timeout=max(remaining, 0))
+            except FutureTimeoutError:
+                flight.detach(progress_callback)
+                with self._lock:
+                    self.timeouts += 1
+                return fn(progress_callback), False
+            except Exception as e:
+                if retrying or not is_transient(e):
+                    with self._lock:
+                        self.shared_failures += 1
+                    raise
+            else:
+                if retrying or not is_transient_failure(result):
+                    with self._lock:
+                        self.coalesced += 1
+                    return result, True
+
+            # Transient failure: retry once, electing a new leader among the waiters
+            flight.detach(progress_callback)
+            retrying = True
+            with self._lock:
+                self.follower_retries += 1
+
+    def _lead(self, key: str, flight: _Flight, fn: Callable[[ProgressCallback], Any]) -> Any:
+        try:
+            result = fn(flight.publish)
+        except BaseException as e:
+            self._land(key, flight)
+            flight.future.set_exception(e)
+            raise
+        self._land(key, flight)
+        flight.future.set_result(result)
+        return result
+
+    def _land(self, key: str, flight: _Flight):
+        # Callers arriving from now on start a new flight (and can hit the
+        # result cache populated by this one)
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """In-flight count and coalescing counters"""
+        with self._lock:
+            return {
+                "enabled": settings.SINGLE_FLIGHT_ENABLED,
+                "in_flight": len(self._flights),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "follower_retries": self.follower_retries,
+                "shared_failures": self.shared_failures,
+                "timeouts": self.timeouts,
+            }
+
+
+# Global single-flight group for pipeline runs
+pipeline_flights = SingleFlight()
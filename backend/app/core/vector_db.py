@@ -1,17 +1,32 @@
 """
 Vector Database Configuration
-Pinecone connection and index management
+Embedding model and vector index management
 """
 
 import os
-from pinecone import Pinecone
-from sentence_transformers import SentenceTransformer
+import threading
+from typing import Dict, List, Optional
+import numpy as np
 from app.core.config import settings
+from app.core.embedding_runtime import (
+    embedding_model_id,
+    load_embedding_model,
+    output_dimension,
+    truncate_embeddings,
+)
+from app.core.embedding_cache import EmbeddingCache
+from app.core.embedding_batcher import EmbeddingBatcher
+from app.core.embedding_server import EmbeddingClient
+from app.core.lexical_index import LexicalIndex
+from app.core.vector_store import VectorStore, create_vector_store
+from app.core.replay import replay, ReplayEmbedder
+from app.utils.exceptions import VectorSearchError
 
 
 class VectorDBManager:
-    """Manages Pinecone vector database connections"""
+    """Manages the embedding model and vector index connections"""
     _instance = None
+    _init_lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
@@ -20,55 +35,239 @@ class VectorDBManager:
         return cls._instance
     
     def initialize(self):
-        """Initialize Pinecone connection and embedding model"""
-        if not self._initialized:
-            # Set Pinecone API key
-            os.environ["PINECONE_API_KEY"] = settings.PINECONE_API_KEY
+        """Initialize the embedding model and index registry"""
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
             
-            # Initialize Pinecone client
-            self.pc = Pinecone()
+            self.embedding_model = None
+            self.embedding_client = None
+            self.embedding_batcher = None
+            if replay.replaying:
+                # Model-free vectors the fake index maps back to recorded terms
+                replay.load()
+                self.embedding_model = ReplayEmbedder(
+                    replay.dimension or settings.EMBEDDING_DIMENSION or 1024
+                )
+                model_id = "replay"
+                self.dimension = self.embedding_model.dimension
+            elif settings.EMBEDDING_SERVER_ADDRESS:
+                # Model lives in the shared host-local embedding server
+                self.embedding_client = EmbeddingClient()
+                info = self.embedding_client.info()
+                model_id = info["model"]
+                self.dimension = info["dimension"]
+            else:
+                # Initialize embedding model with the configured CPU runtime
+                self.embedding_model = load_embedding_model()
+                model_id = embedding_model_id()
+                self.dimension = output_dimension(self.embedding_model)
+                if settings.EMBEDDING_BATCHER_ENABLED:
+                    self.embedding_batcher = EmbeddingBatcher(self._encode_batch)
+            self.model_id = model_id
             
-            # Initialize embedding model
-            self.embedding_model = SentenceTransformer("Qwen/Qwen3-Embedding-0.6B")
+            # Two-tier embedding cache keyed by model, runtime and dimension
+            self.embedding_cache = None
+            if settings.EMBEDDING_CACHE_ENABLED:
+                self.embedding_cache = EmbeddingCache(
+                    model_name=model_id,
+                    dimension=self.dimension,
+                    memory_bytes=settings.EMBEDDING_CACHE_MEMORY_MB * 1024 * 1024,
+                    disk_dir=settings.EMBEDDING_CACHE_DIR or None,
+                    disk_dtype=settings.EMBEDDING_CACHE_DTYPE
+                )
             
-            # Connect to indexes
-            self._icd_index = None
-            self._hcpcs_index = None
-            self._cpt_index = None
+            # Index handles are created per code system on first use
+            self._stores: Dict[str, VectorStore] = {}
+            self._stores_lock = threading.Lock()
+            self._lexical: Dict[str, Optional[LexicalIndex]] = {}
             
             self._initialized = True
     
-    @property
-    def icd_index(self):
-        """Get ICD-10 Pinecone index"""
+    def get_index(self, code_system: str) -> VectorStore:
+        """
+        Get the vector index for a code system from the configured backend.
+        
+        Args:
+            code_system: "ICD", "CPT" or "HCPCS"
+            
+        Returns:
+            VectorStore (Pinecone or local, per VECTOR_STORE_BACKEND)
+        """
         self.initialize()
-        if self._icd_index is None:
-            self._icd_index = self.pc.Index(settings.PINECONE_INDEX_ICD)
-        return self._icd_index
+        with self._stores_lock:
+            store = self._stores.get(code_system)
+            if store is None:
+                name, version = self._index_config(code_system)
+                store = create_vector_store(name, version)
+                self._check_compatible(store)
+                self._stores[code_system] = store
+            return store
     
-    @property
-    def hcpcs_index(self):
-        """Get HCPCS Pinecone index"""
+    def _check_compatible(self, store: VectorStore):
+        """Refuse an index built with another embedding model, runtime or dimension"""
+        description = store.describe()
+        index_model = description.get("model")
+        if index_model is not None and index_model != self.model_id:
+            raise VectorSearchError(
+                f"Index '{store.name}' was built with embedding model '{index_model}' but "
+                f"queries use '{self.model_id}'; rebuild it or set EMBEDDING_MODEL_NAME "
+                f"and EMBEDDING_RUNTIME to match",
+                {"index": store.name, "index_model": index_model, "model": self.model_id}
+            )
+        index_dimension = description.get("dimension")
+        if index_dimension is not None and int(index_dimension) != self.dimension:
+            raise VectorSearchError(
+                f"Index '{store.name}' holds {index_dimension}-dimension vectors but "
+                f"embeddings are {self.dimension}-dimension; rebuild it or set "
+                f"EMBEDDING_DIMENSION={index_dimension}",
+                {"index": store.name, "index_dimension": index_dimension, "dimension": self.dimension}
+            )
+    
+    def get_lexical_index(self, code_system: str) -> Optional[LexicalIndex]:
+        """
+        Get the BM25 index built alongside a code system's vector index.
+        
+        Args:
+            code_system: "ICD", "CPT" or "HCPCS"
+            
+        Returns:
+            LexicalIndex from LOCAL_INDEX_DIR/<index name>/, or None if not built
+        """
         self.initialize()
-        if self._hcpcs_index is None:
-            self._hcpcs_index = self.pc.Index(settings.PINECONE_INDEX_HCPCS)
-        return self._hcpcs_index
+        with self._stores_lock:
+            if code_system not in self._lexical:
+                name, _ = self._index_config(code_system)
+                self._lexical[code_system] = LexicalIndex.load(
+                    os.path.join(settings.LOCAL_INDEX_DIR, name)
+                )
+            return self._lexical[code_system]
     
-    @property
-    def cpt_index(self):
-        """Get CPT Pinecone index"""
+    def open_indexes(self):
+        """Create the index handles (and BM25 indexes) for every code system"""
+        for code_system in ("ICD", "CPT", "HCPCS"):
+            self.get_index(code_system)
+            if settings.LEXICAL_SEARCH_ENABLED:
+                self.get_lexical_index(code_system)
+    
+    def warmup(self):
+        """Load the embedding model and run one forward pass outside the cache"""
         self.initialize()
-        if self._cpt_index is None:
-            self._cpt_index = self.pc.Index(settings.PINECONE_INDEX_CPT)
-        return self._cpt_index
+        self._encode(["warmup"])
+    
+    @property
+    def icd_index(self) -> VectorStore:
+        """Get ICD-10 vector index"""
+        return self.get_index("ICD")
+    
+    @property
+    def hcpcs_index(self) -> VectorStore:
+        """Get HCPCS vector index"""
+        return self.get_index("HCPCS")
+    
+    @property
+    def cpt_index(self) -> VectorStore:
+        """Get CPT vector index"""
+        return self.get_index("CPT")
+    
+    @staticmethod
+    def _index_config(code_system: str):
+        """Configured (index name, index version) for a code system"""
+        return {
+            "ICD": (settings.PINECONE_INDEX_ICD, settings.PINECONE_INDEX_ICD_VERSION),
+            "CPT": (settings.PINECONE_INDEX_CPT, settings.PINECONE_INDEX_CPT_VERSION),
+            "HCPCS": (settings.PINECONE_INDEX_HCPCS, settings.PINECONE_INDEX_HCPCS_VERSION),
+        }[code_system]
+    
+    def index_namespace(self, code_system: str) -> str:
+        """
+        Cache namespace for a code system's index.
+        
+        Args:
+            code_system: "ICD", "CPT" or "HCPCS"
+            
+        Returns:
+            "<index name>@<index version>"
+        """
+        store = self.get_index(code_system)
+        return f"{store.name}@{store.version}"
     
     def get_embedding(self, text: str) -> list:
         """Generate embedding for given text"""
+        return self.get_embeddings([text])[0]
+    
+    def get_embeddings(self, texts: List[str], batch_size: Optional[int] = None) -> List[list]:
+        """
+        Generate embeddings for many texts in batched forward passes.
+        
+        Cached embeddings are served from the embedding cache; only the
+        misses are encoded, in a single batched call.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Encode batch size (defaults to EMBEDDING_BATCH_SIZE)
+            
+        Returns:
+            Embedding vectors in the same order as ``texts``
+        """
+        if not texts:
+            return []
         self.initialize()
-        embedding = self.embedding_model.encode(text)
-        if hasattr(embedding, "tolist"):
-            return embedding.tolist()
-        return embedding
+        
+        if self.embedding_cache is None:
+            vectors = self._encode(list(texts), batch_size).tolist()
+        else:
+            found, missing = self.embedding_cache.get_many(list(texts))
+            if missing:
+                computed = self._encode(missing, batch_size)
+                # Rounded as cached, so later hits return identical vectors
+                found.update(self.embedding_cache.put_many(list(zip(missing, computed))))
+            vectors = [np.asarray(found[text], dtype=np.float32).tolist() for text in texts]
+        
+        if replay.recording or replay.replaying:
+            # Index queries only see vectors; remember the term behind each
+            replay.register_vectors(texts, vectors)
+        return vectors
+    
+    def _encode(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Embed cache misses through the embedding server, the micro-batcher
+        shared by concurrent callers, or a direct forward pass.
+        """
+        if self.embedding_client is not None:
+            return self.embedding_client.encode(texts)
+        if self.embedding_batcher is not None and batch_size is None:
+            return self.embedding_batcher.encode(texts)
+        return self._encode_batch(texts, batch_size)
+    
+    def _encode_batch(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """Run one batched forward pass and return a float32 matrix at ``self.dimension``"""
+        embeddings = self.embedding_model.encode(
+            texts,
+            batch_size=batch_size or settings.EMBEDDING_BATCH_SIZE
+        )
+        return truncate_embeddings(embeddings, self.dimension)
+    
+    def cache_stats(self) -> dict:
+        """Embedding cache statistics (empty if not initialized or disabled)"""
+        if not self._initialized or self.embedding_cache is None:
+            return {}
+        return self.embedding_cache.stats()
+    
+    def batcher_stats(self) -> dict:
+        """Micro-batcher statistics, local or from the embedding server"""
+        if not self._initialized:
+            return {}
+        if self.embedding_client is not None:
+            try:
+                return {"server": settings.EMBEDDING_SERVER_ADDRESS, **self.embedding_client.stats()}
+            except Exception as e:
+                return {"server": settings.EMBEDDING_SERVER_ADDRESS, "error": str(e)}
+        if self.embedding_batcher is None:
+            return {}
+        return self.embedding_batcher.stats()
 
 
 # Global vector DB manager instance
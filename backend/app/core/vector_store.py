@@ -0,0 +1,288 @@
+"""
+Vector Store Backends
+Pluggable index backends behind VectorDBManager: Pinecone and local files
+"""
+
+import os
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.core.config import settings
+from app.core.embedding_runtime import embedding_model_id
+
+try:
+    import hnswlib
+except ImportError:  # ANN graph is optional; exact search is used without it
+    hnswlib = None
+
+
+class QueryResult:
+    """Pinecone-compatible query response (``resp.matches[i]["id"]``)"""
+
+    def __init__(self, matches: List[Dict[str, Any]]):
+        self.matches = matches
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"matches": self.matches}
+
+
+class VectorStore(ABC):
+    """Interface shared by all index backends"""
+
+    name: str = ""
+    version: str = ""
+
+    @abstractmethod
+    def query(self, vector, top_k: int = 5, include_metadata: bool = True, **kwargs) -> QueryResult:
+        """Return the ``top_k`` nearest entries to ``vector``"""
+
+    @abstractmethod
+    def describe(self) -> Dict[str, Any]:
+        """Backend, dimension and size information"""
+
+
+_pinecone_client = None
+_pinecone_lock = threading.Lock()
+
+
+def get_pinecone_client():
+    """Shared Pinecone client, created on first use"""
+    global _pinecone_client
+    with _pinecone_lock:
+        if _pinecone_client is None:
+            from pinecone import Pinecone
+            os.environ["PINECONE_API_KEY"] = settings.PINECONE_API_KEY
+            _pinecone_client = Pinecone()
+        return _pinecone_client
+
+
+def reset_pinecone_client():
+    """Drop the shared client so a forked worker opens its own connections"""
+    global _pinecone_client
+    with _pinecone_lock:
+        _pinecone_client = None
+
+
+class PineconeVectorStore(VectorStore):
+    """Remote Pinecone index"""
+
+    def __init__(self, name: str, version: str):
+        self.name = name
+        self.version = version
+        self.index = get_pinecone_client().Index(name)
+
+    def query(self, vector, top_k: int = 5, include_metadata: bool = True, **kwargs):
+        return self.index.query(
+            vector=vector,
+            top_k=top_k,
+            include_metadata=include_metadata,
+            **kwargs
+        )
+
+    def describe(self) -> Dict[str, Any]:
+        stats = self.index.describe_index_stats()
+        return {
+            "backend": "pinecone",
+            "name": self.name,
+            "version": self.version,
+            "dimension": stats.dimension,
+            "count": stats.total_vector_count,
+        }
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process index loaded from a directory of files.
+
+    Layout:
+        manifest.json    name, version, model, dimension, count
+        embeddings.npy   L2-normalized float16 matrix, memory-mapped on load
+        metadata.jsonl   one {"id": ..., "metadata": {...}} per row
+        ann.hnsw         optional hnswlib inner-product graph
+
+    Queries use an exact NumPy dot product, or the ANN graph when the index
+    holds at least LOCAL_INDEX_ANN_THRESHOLD rows and hnswlib is installed.
+    """
+
+    MANIFEST = "manifest.json"
+    EMBEDDINGS = "embeddings.npy"
+    METADATA = "metadata.jsonl"
+    ANN_GRAPH = "ann.hnsw"
+
+    # Rows scored per block so the float32 upcast stays small
+    BLOCK_ROWS = 16384
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        manifest_path = os.path.join(directory, self.MANIFEST)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"Local index not found: {directory}")
+
+        with open(manifest_path, encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.name = self.manifest["name"]
+        self.version = str(self.manifest.get("version", "1"))
+
+        self.embeddings = np.load(os.path.join(directory, self.EMBEDDINGS), mmap_mode="r")
+        self.dimension = self.embeddings.shape[1]
+        manifest_dimension = self.manifest.get("dimension")
+        if manifest_dimension is not None and int(manifest_dimension) != self.dimension:
+            raise ValueError(
+                f"Local index '{self.name}' manifest declares {manifest_dimension} dimensions "
+                f"but {self.EMBEDDINGS} has {self.dimension}; rebuild it"
+            )
+
+        self.ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        with open(os.path.join(directory, self.METADATA), encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                self.ids.append(row["id"])
+                self.metadata.append(row.get("metadata", {}))
+
+        self.ann = None
+        ann_path = os.path.join(directory, self.ANN_GRAPH)
+        if (
+            hnswlib is not None
+            and len(self.ids) >= settings.LOCAL_INDEX_ANN_THRESHOLD
+            and os.path.exists(ann_path)
+        ):
+            self.ann = hnswlib.Index(space="ip", dim=self.dimension)
+            self.ann.load_index(ann_path, max_elements=len(self.ids))
+            self.ann.set_ef(settings.LOCAL_INDEX_ANN_EF)
+
+    def query(self, vector, top_k: int = 5, include_metadata: bool = True, **kwargs) -> QueryResult:
+        query = np.asarray(vector, dtype=np.float32)
+        if query.shape[-1] != self.dimension:
+            raise ValueError(
+                f"Query has {query.shape[-1]} dimensions, index '{self.name}' has {self.dimension}"
+            )
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        top_k = min(top_k, len(self.ids))
+
+        if self.ann is not None:
+            labels, distances = self.ann.knn_query(query, k=top_k)
+            rows = labels[0].tolist()
+            scores = (1.0 - distances[0]).tolist()
+        else:
+            rows, scores = self._exact_top_k(query, top_k)
+
+        matches = []
+        for row, score in zip(rows, scores):
+            match = {"id": self.ids[row], "score": float(score)}
+            if include_metadata:
+                match["metadata"] = self.metadata[row]
+            matches.append(match)
+        return QueryResult(matches)
+
+    def _exact_top_k(self, query: np.ndarray, top_k: int):
+        """Blocked dot product over the memory-mapped matrix"""
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, len(self.ids), self.BLOCK_ROWS):
+            block = np.asarray(self.embeddings[start:start + self.BLOCK_ROWS], dtype=np.float32)
+            scores = block @ query
+            k = min(top_k, len(scores))
+            part = np.argpartition(-scores, k - 1)[:k]
+            best_rows = np.concatenate([best_rows, part + start])
+            best_scores = np.concatenate([best_scores, scores[part]])
+        order = np.argsort(-best_scores)[:top_k]
+        return best_rows[order].tolist(), best_scores[order].tolist()
+
+    @property
+    def model_id(self) -> Optional[str]:
+        """Embedding model and runtime the index was built with (as embedding_model_id)"""
+        model = self.manifest.get("model")
+        if not model:
+            return None
+        return embedding_model_id(runtime=self.manifest.get("runtime") or "fp32", model_name=model)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "backend": "local",
+            "name": self.name,
+            "version": self.version,
+            "model": self.model_id,
+            "dimension": self.dimension,
+            "count": len(self.ids),
+            "ann": self.ann is not None,
+        }
+
+    @classmethod
+    def write(
+        cls,
+        directory: str,
+        ids: List[str],
+        embeddings: np.ndarray,
+        metadata: List[Dict[str, Any]],
+        manifest: Dict[str, Any]
+    ) -> None:
+        """
+        Write an index directory in the layout this backend loads.
+
+        Args:
+            directory: Output directory (created if missing)
+            ids: Row ids (codes)
+            embeddings: Row embeddings; normalized and stored as float16
+            metadata: Per-row metadata dictionaries
+            manifest: Manifest fields (name, version, model, ...)
+        """
+        os.makedirs(directory, exist_ok=True)
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = (matrix / np.maximum(norms, 1e-12)).astype(np.float16)
+
+        np.save(os.path.join(directory, cls.EMBEDDINGS), matrix)
+        with open(os.path.join(directory, cls.METADATA), "w", encoding="utf-8") as f:
+            for row_id, row_metadata in zip(ids, metadata):
+                f.write(json.dumps({"id": row_id, "metadata": row_metadata}) + "\n")
+
+        ann_path = os.path.join(directory, cls.ANN_GRAPH)
+        if hnswlib is not None and len(ids) >= settings.LOCAL_INDEX_ANN_THRESHOLD:
+            graph = hnswlib.Index(space="ip", dim=matrix.shape[1])
+            graph.init_index(max_elements=len(ids), ef_construction=200, M=16)
+            graph.add_items(matrix.astype(np.float32), np.arange(len(ids)))
+            graph.save_index(ann_path)
+        elif os.path.exists(ann_path):
+            os.remove(ann_path)
+
+        manifest = dict(manifest)
+        manifest.update({
+            "dimension": int(matrix.shape[1]),
+            "count": len(ids),
+            "dtype": "float16",
+            "normalized": True,
+        })
+        with open(os.path.join(directory, cls.MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+
+def create_vector_store(name: str, version: str) -> VectorStore:
+    """
+    Build the configured backend for an index.
+
+    Args:
+        name: Index name (Pinecone index or local directory under LOCAL_INDEX_DIR)
+        version: Configured index version (local indexes use their manifest)
+
+    Returns:
+        VectorStore for VECTOR_STORE_BACKEND (the replay fake in
+        REPLAY_MODE=replay, wrapped for recording in REPLAY_MODE=record)
+    """
+    from app.core.replay import replay, RecordingVectorStore, ReplayVectorStore
+
+    if replay.replaying:
+        return ReplayVectorStore(name, version)
+
+    backend = settings.VECTOR_STORE_BACKEND.lower()
+    if backend == "pinecone":
+        store = PineconeVectorStore(name, version)
+    elif backend == "local":
+        store = LocalVectorStore(os.path.join(settings.LOCAL_INDEX_DIR, name))
+    else:
+        raise ValueError(f"Unknown VECTOR_STORE_BACKEND: {settings.VECTOR_STORE_BACKEND}")
+    return RecordingVectorStore(store) if replay.recording else store
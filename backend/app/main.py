@@ -3,12 +3,17 @@ FastAPI Application Entry Point
 Medical Coding Pipeline API
 """
 
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.api.v1.router import api_router
+from app.services.job_service import job_service
+from app.services.admission_control import admission_controller
+from app.services.evaluation_service import evaluation_service
+from app.services.warmup_service import warmup_service
 
 
 @asynccontextmanager
@@ -22,10 +27,18 @@ async def lifespan(app: FastAPI):
     print(f"📍 Environment: {settings.ENVIRONMENT}")
     print(f"🔗 API Docs: http://127.0.0.1:{settings.PORT}/docs")
     
+    # Warm models, clients and index handles; /api/v1/ready reports progress
+    warmup_service.start()
+    if settings.WARMUP_BLOCKING:
+        await asyncio.to_thread(warmup_service.wait)
+    
     yield
     
     # Shutdown
     print(f"👋 Shutting down {settings.APP_NAME}")
+    job_service.shutdown()
+    admission_controller.shutdown()
+    evaluation_service.shutdown()
 
 
 # Create FastAPI application
@@ -45,9 +58,14 @@ using CrewAI multi-agent architecture with RAG.
 
 ### Endpoints:
 - `/api/v1/health` - Health check
+- `/api/v1/ready` - Readiness (200 once startup warmup has completed)
 - `/api/v1/coding/process` - Process medical text
 - `/api/v1/coding/process-pdf` - Upload and process PDF
+- `/api/v1/coding/process/stream`, `/api/v1/coding/process-pdf/stream` - Stream per-stage results (SSE)
 - `/api/v1/coding/process-test-pdf` - Process test PDF from backend folder
+- `/api/v1/metrics` - Queue depth and wait-time metrics
+- `/api/v1/coding/evaluations/{trace_id}` - Deferred LLM judge evaluation
+- `/api/v1/coding/jobs` - Submit an asynchronous coding job and poll `/api/v1/coding/jobs/{job_id}`
     """,
     version=settings.APP_VERSION,
     docs_url="/docs",
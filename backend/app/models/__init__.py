@@ -12,6 +12,7 @@ from app.models.judge_models import (
 )
 from app.models.requests import ProcessTextRequest, ProcessPDFRequest
 from app.models.responses import CodingResult, PipelineResponse, HealthResponse
+from app.models.jobs import JobStatus, StageStatus, JobSubmitResponse, JobStatusResponse
 
 __all__ = [
     # Entities
@@ -28,5 +29,7 @@ __all__ = [
     # Requests
     "ProcessTextRequest", "ProcessPDFRequest",
     # Responses
-    "CodingResult", "PipelineResponse", "HealthResponse"
+    "CodingResult", "PipelineResponse", "HealthResponse",
+    # Jobs
+    "JobStatus", "StageStatus", "JobSubmitResponse", "JobStatusResponse"
 ]
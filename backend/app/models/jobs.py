@@ -0,0 +1,68 @@
+"""
+Coding Job Schemas
+Request/response models for asynchronous pipeline jobs
+"""
+
+from enum import Enum
+from typing import Dict, Optional
+from pydantic import BaseModel, Field
+from app.models.responses import PipelineResponse
+
+
+class JobStatus(str, Enum):
+    """Lifecycle status of a coding job"""
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class StageStatus(str, Enum):
+    """Progress status of a single pipeline stage"""
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+    skipped = "skipped"
+
+
+class JobSubmitResponse(BaseModel):
+    """Response returned when a job is accepted"""
+
+    job_id: str = Field(..., description="Identifier used to poll the job")
+    status: JobStatus = Field(..., description="Initial job status")
+
+
+class JobStatusResponse(BaseModel):
+    """Current state of a coding job"""
+
+    job_id: str = Field(..., description="Job identifier")
+
+    status: JobStatus = Field(..., description="Current job status")
+
+    stages: Dict[str, StageStatus] = Field(
+        default_factory=dict,
+        description="Per-stage progress of the coding pipeline"
+    )
+
+    created_at: float = Field(..., description="Submission time (unix seconds)")
+
+    started_at: Optional[float] = Field(
+        None, description="Time a worker picked up the job (unix seconds)"
+    )
+
+    finished_at: Optional[float] = Field(
+        None, description="Completion time (unix seconds)"
+    )
+
+    expires_at: Optional[float] = Field(
+        None, description="Time after which the job record is discarded (unix seconds)"
+    )
+
+    result: Optional[PipelineResponse] = Field(
+        None, description="Final pipeline response once the job has finished"
+    )
+
+    error: Optional[str] = Field(
+        None, description="Error message if the job failed"
+    )
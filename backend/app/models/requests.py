@@ -21,6 +21,11 @@ class ProcessTextRequest(BaseModel):
         description="Whether to include LLM judge evaluation"
     )
 
+    bypass_cache: bool = Field(
+        default=False,
+        description="Recompute even if a cached result exists (the fresh result is cached)"
+    )
+
 
 class ProcessPDFRequest(BaseModel):
     """Request model for PDF processing options"""
@@ -29,3 +34,8 @@ class ProcessPDFRequest(BaseModel):
         default=True,
         description="Whether to include LLM judge evaluation"
     )
+
+    bypass_cache: bool = Field(
+        default=False,
+        description="Recompute even if a cached result exists (the fresh result is cached)"
+    )
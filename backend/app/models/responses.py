@@ -4,7 +4,7 @@ Response models for API endpoints
 """
 
 from typing import List, Optional, Any, Dict
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from app.models.entities import StructuredMedicalEntities
 from app.models.icd_models import ICDCodingOutput
 from app.models.cpt_models import CPTCodingOutput
@@ -32,6 +32,27 @@ class CodingResult(BaseModel):
     )
 
 
+class StageAttempt(BaseModel):
+    """One attempt at running a pipeline stage"""
+    
+    model: str = Field(..., description="LLM model id used for the attempt")
+    attempt: int = Field(..., description="Attempt number on this model (1-based)")
+    status: str = Field(..., description="succeeded or failed")
+    error: Optional[str] = Field(None, description="Error of a failed attempt")
+    backoff_seconds: Optional[float] = Field(
+        None, description="Wait before the next attempt on the same model"
+    )
+    hedge_model: Optional[str] = Field(
+        None, description="Secondary model started because the attempt was slow"
+    )
+    hedge_after_seconds: Optional[float] = Field(
+        None, description="Delay after which the hedge was started"
+    )
+    served_by: Optional[str] = Field(
+        None, description="Which hedged attempt supplied the output: primary or hedge"
+    )
+
+
 class PipelineResponse(BaseModel):
     """Complete pipeline response"""
     
@@ -49,13 +70,49 @@ class PipelineResponse(BaseModel):
         None, description="LLM judge evaluation results"
     )
     
+    evaluation_status: Optional[str] = Field(
+        None,
+        description="completed, pending/running (deferred; poll /coding/evaluations/{trace_id}), "
+                    "skipped (not sampled), dropped (judge backlog full) or null when not requested"
+    )
+    
     token_usage: Optional[Dict[str, Any]] = Field(
         None, description="Token usage statistics"
     )
     
+    stage_attempts: Optional[Dict[str, List[StageAttempt]]] = Field(
+        None, description="Attempts per stage, showing retries and model failovers"
+    )
+    
+    cache_status: Optional[str] = Field(
+        None, description="Result cache outcome: hit, miss or bypass (null when disabled)"
+    )
+    
+    coalesced: bool = Field(
+        False, description="Whether this result was shared from an identical in-flight request"
+    )
+    
     error: Optional[str] = Field(
         None, description="Error message if pipeline failed"
     )
+    
+    # Failure caused by a transient provider error (not serialized); lets
+    # coalesced callers retry it once instead of sharing it
+    _transient_failure: bool = PrivateAttr(False)
+
+
+class EvaluationStatusResponse(BaseModel):
+    """State of a deferred LLM judge evaluation"""
+    
+    trace_id: str = Field(..., description="Trace ID of the coding run")
+    status: str = Field(..., description="pending, running, completed or failed")
+    evaluation: Optional[MedicalCodingJudgeOutput] = Field(
+        None, description="LLM judge evaluation results once completed"
+    )
+    error: Optional[str] = Field(None, description="Error message if the judge failed")
+    created_at: float = Field(..., description="Submission time (unix seconds)")
+    started_at: Optional[float] = Field(None, description="Time the judge started (unix seconds)")
+    finished_at: Optional[float] = Field(None, description="Completion time (unix seconds)")
 
 
 class HealthResponse(BaseModel):
@@ -64,3 +121,18 @@ class HealthResponse(BaseModel):
     status: str = Field(..., description="Service status")
     version: str = Field(..., description="API version")
     environment: str = Field(..., description="Environment name")
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness check response"""
+    
+    ready: bool = Field(..., description="Whether every required warmup component is up")
+    status: str = Field(..., description="Warmup state")
+    attempts: int = Field(0, description="Warmup passes run so far")
+    total_seconds: Optional[float] = Field(None, description="Warmup wall time so far")
+    components: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict, description="Status, seconds and error per warmup component"
+    )
+    degraded: List[str] = Field(
+        default_factory=list, description="Optional components that failed to warm up"
+    )
@@ -7,10 +7,21 @@ from app.services.embedding_service import embedding_service, EmbeddingService
 from app.services.tracing_service import tracing_service, TracingService
 from app.services.judge_service import judge_service, JudgeService
 from app.services.coding_pipeline import (
-    coding_pipeline_service,
     get_coding_pipeline_service,
+    get_shared_pipeline_service,
     CodingPipelineService
 )
+from app.services.admission_control import admission_controller, AdmissionController
+from app.services.job_service import job_service, JobService, JobQueue, InProcessJobQueue
+from app.services.warmup_service import warmup_service, WarmupService
+
+
+def __getattr__(name: str):
+    # The shared pipeline service is created on first access, not at import
+    if name == "coding_pipeline_service":
+        return get_shared_pipeline_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     # PDF Extractor
@@ -22,5 +33,12 @@ __all__ = [
     # Judge Service
     "judge_service", "JudgeService",
     # Coding Pipeline
-    "coding_pipeline_service", "get_coding_pipeline_service", "CodingPipelineService"
+    "coding_pipeline_service", "get_coding_pipeline_service",
+    "get_shared_pipeline_service", "CodingPipelineService",
+    # Admission Control
+    "admission_controller", "AdmissionController",
+    # Jobs
+    "job_service", "JobService", "JobQueue", "InProcessJobQueue",
+    # Warmup
+    "warmup_service", "WarmupService"
 ]
@@ -0,0 +1,180 @@
+"""
+Admission Control Service
+Concurrency limiting and backpressure for synchronous pipeline calls
+"""
+
+import math
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.core.config import settings
+from app.utils.exceptions import AdmissionRejectedError
+
+
+class AdmissionController:
+    """
+    Runs blocking pipeline work on a dedicated bounded executor.
+
+    At most ``max_concurrency`` calls execute at once and at most
+    ``max_queue`` more may wait for a slot. Callers beyond that are
+    rejected immediately (429); callers that wait longer than
+    ``queue_timeout`` for a slot are dropped (503). Both carry a
+    Retry-After hint. Background job runs (``run_blocking``) take slots
+    from the same executor, so they count against the same limit.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        retry_after: Optional[int] = None
+    ):
+        self.max_concurrency = max_concurrency or settings.PIPELINE_MAX_CONCURRENCY
+        self.max_queue = max_queue if max_queue is not None else settings.PIPELINE_MAX_QUEUE
+        self.queue_timeout = (
+            queue_timeout if queue_timeout is not None
+            else settings.PIPELINE_QUEUE_TIMEOUT_SECONDS
+        )
+        self.retry_after = retry_after or settings.PIPELINE_RETRY_AFTER_SECONDS
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="pipeline-worker"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._in_flight = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._wait_times = deque(maxlen=1000)
+        self._run_times = deque(maxlen=1000)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Execute a blocking callable under admission control.
+
+        Args:
+            fn: Blocking callable (e.g. CodingPipelineService.process_text)
+            *args, **kwargs: Arguments forwarded to ``fn``
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            AdmissionRejectedError: If the queue is full or the wait timed out
+        """
+        with self._lock:
+            at_capacity = self._pending >= self.max_concurrency + self.max_queue
+            if at_capacity:
+                self._rejected += 1
+            else:
+                self._pending += 1
+                self._admitted += 1
+        if at_capacity:
+            raise AdmissionRejectedError(
+                "Pipeline is at capacity, retry later",
+                status_code=429,
+                retry_after=self._estimate_retry_after()
+            )
+
+        future = self._submit(fn, *args, **kwargs)
+        wrapped = asyncio.wrap_future(future)
+
+        try:
+            done, _ = await asyncio.wait({wrapped}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # Caller went away while queued: give up the slot if not yet started
+            future.cancel()
+            raise
+        if not done and future.cancel():
+            with self._lock:
+                self._timed_out += 1
+            raise AdmissionRejectedError(
+                "Timed out waiting for a pipeline slot, retry later",
+                status_code=503,
+                retry_after=self._estimate_retry_after()
+            )
+
+        return await wrapped
+
+    def run_blocking(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Execute a blocking callable on the pipeline executor from a worker thread.
+
+        Used by the job workers: their callers already waited in the job
+        queue, so the call is neither rejected nor timed out, only held
+        until a pipeline slot is free.
+
+        Returns:
+            The callable's return value
+        """
+        with self._lock:
+            self._pending += 1
+            self._admitted += 1
+        return self._submit(fn, *args, **kwargs).result()
+
+    def _submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue an admitted call on the executor (the caller counted it as pending)"""
+        submitted_at = time.monotonic()
+
+        def task():
+            started_at = time.monotonic()
+            with self._lock:
+                self._in_flight += 1
+                self._wait_times.append(started_at - submitted_at)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                    self._run_times.append(time.monotonic() - started_at)
+
+        future = self._executor.submit(task)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, concurrency and wait-time statistics"""
+        with self._lock:
+            waits = sorted(self._wait_times)
+            runs = list(self._run_times)
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queue_depth": self._pending - self._in_flight,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "wait_ms_avg": round(1000 * sum(waits) / len(waits), 1) if waits else 0.0,
+                "wait_ms_p95": round(1000 * waits[int(0.95 * (len(waits) - 1))], 1) if waits else 0.0,
+                "wait_ms_max": round(1000 * waits[-1], 1) if waits else 0.0,
+                "run_ms_avg": round(1000 * sum(runs) / len(runs), 1) if runs else 0.0,
+            }
+
+    def shutdown(self):
+        """Stop accepting work and release idle executor threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_done(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def _estimate_retry_after(self) -> int:
+        """Rough seconds until a slot frees up, from recent run times"""
+        with self._lock:
+            runs = list(self._run_times)
+            waiting = max(self._pending - self._in_flight, 0) + 1
+        if not runs:
+            return self.retry_after
+        avg_run = sum(runs) / len(runs)
+        return max(1, math.ceil(avg_run * waiting / self.max_concurrency))
+
+
+# Singleton instance
+admission_controller = AdmissionController()
@@ -3,40 +3,78 @@ Medical Coding Pipeline Service
 Main orchestration service for the entire coding pipeline
 """
 
-from typing import Optional, Dict, Any, List
-from langfuse import propagate_attributes
+import hashlib
+import threading
+from typing import Optional, Dict, Any, List, Callable, Tuple
+from app.core.config import settings
 from app.core.observability import observability
-from app.agents.crew import get_medical_coding_crew
+from app.core.llm_retry import is_transient
+from app.core.result_cache import result_cache, result_cache_key
+from app.core.single_flight import pipeline_flights
+from app.agents.stages import CREW_STAGES
 from app.services.pdf_extractor import pdf_extractor
 from app.services.judge_service import judge_service
 from app.services.tracing_service import tracing_service
+from app.services.evaluation_service import evaluation_service
 from app.utils.text_utils import preprocess_medical_text
 from app.utils.exceptions import MedicalCodingException
 from app.models.responses import CodingResult, PipelineResponse
+from app.models.judge_models import MedicalCodingJudgeOutput
 from app.models.entities import StructuredMedicalEntities
 from app.models.icd_models import ICDCodingOutput
 from app.models.cpt_models import CPTCodingOutput
 from app.models.hcpcs_models import HCPCSCodingOutput
 
 
+# Progress callback signature: callback(stage_name, status, output), where
+# output is the stage's pydantic result once it has completed (else None)
+ProgressCallback = Callable[[str, str, Any], None]
+
+
 class CodingPipelineService:
     """Main service for orchestrating the medical coding pipeline"""
     
     def __init__(self, verbose: bool = False):
         self.verbose = verbose
-        self.crew = get_medical_coding_crew(verbose=verbose)
+        self._crew = None
+    
+    @property
+    def crew(self):
+        """Medical coding crew, built on first use (this imports CrewAI)"""
+        if self._crew is None:
+            from app.agents.crew import get_medical_coding_crew
+            self._crew = get_medical_coding_crew(verbose=self.verbose)
+        return self._crew
+    
+    @staticmethod
+    def get_stages(include_evaluation: bool = True) -> List[str]:
+        """Names of the stages reported through progress callbacks"""
+        stages = list(CREW_STAGES)
+        if include_evaluation:
+            stages.append("evaluation")
+        return stages
     
     def process_text(
         self,
         medical_report_text: str,
-        include_evaluation: bool = True
+        include_evaluation: bool = True,
+        progress_callback: Optional[ProgressCallback] = None,
+        bypass_cache: bool = False
     ) -> PipelineResponse:
         """
         Process medical text through the coding pipeline.
         
+        Identical notes (after preprocessing) processed with the same
+        pipeline configuration are served from the result cache, and
+        identical requests arriving while one is running share that run.
+        
         Args:
             medical_report_text: Clinical text to process
             include_evaluation: Whether to run LLM judge evaluation
+            progress_callback: Optional callable notified as each stage
+                starts and finishes
+            bypass_cache: Skip the cache lookup (the fresh result is still
+                stored)
             
         Returns:
             PipelineResponse with all results
@@ -44,6 +82,91 @@ class CodingPipelineService:
         try:
             # Preprocess the text
             text = preprocess_medical_text(medical_report_text)
+            cache_key = result_cache_key(text)
+        except Exception as e:
+            return PipelineResponse(
+                success=False,
+                error=str(e)
+            )
+        
+        def run(callback: Optional[ProgressCallback]) -> PipelineResponse:
+            return self._run_text(text, cache_key, include_evaluation, callback, bypass_cache)
+        
+        # Bypassing requests only coalesce with each other, never with a cache hit
+        flight_key = f"text:{'fresh' if bypass_cache else 'cached'}:{int(include_evaluation)}:{cache_key}"
+        return self._coalesce(flight_key, run, progress_callback)
+    
+    @staticmethod
+    def _coalesce(
+        key: str,
+        run: Callable[[Optional[ProgressCallback]], PipelineResponse],
+        progress_callback: Optional[ProgressCallback]
+    ) -> PipelineResponse:
+        """Run through the single-flight group; shared responses are marked ``coalesced``"""
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return run(progress_callback)
+        response, shared = pipeline_flights.do(
+            key,
+            run,
+            progress_callback,
+            is_transient_failure=lambda response: response._transient_failure
+        )
+        if shared:
+            response = response.model_copy(update={"coalesced": True})
+        return response
+    
+    def _run_text(
+        self,
+        text: str,
+        cache_key: str,
+        include_evaluation: bool,
+        progress_callback: Optional[ProgressCallback],
+        bypass_cache: bool
+    ) -> PipelineResponse:
+        """Run the crew and judge on preprocessed text, through the result cache"""
+        def report(stage: str, status: str, output: Any = None):
+            if progress_callback is not None:
+                progress_callback(stage, status, output)
+        
+        def on_stage_start(stage: str):
+            report(stage, "running")
+        
+        def on_stage_complete(stage: str, task_output):
+            report(stage, "completed", getattr(task_output, "pydantic", None))
+        
+        
+        try:
+            cache_status = None
+            if settings.RESULT_CACHE_ENABLED:
+                if bypass_cache:
+                    result_cache.record_bypass()
+                    cache_status = "bypass"
+                else:
+                    cached = result_cache.get(cache_key)
+                    if cached is not None:
+                        response = PipelineResponse.model_validate_json(cached)
+                        for stage in CREW_STAGES:
+                            report(stage, "completed", getattr(response.coding_result, stage, None))
+                        # Only the coding result is cached: sample and judge this request afresh
+                        json_data = [
+                            output.model_dump()
+                            for output in (getattr(response.coding_result, stage, None) for stage in CREW_STAGES)
+                            if output is not None
+                        ]
+                        trace_id = tracing_service.create_trace_id()
+                        evaluation, evaluation_status = self._apply_evaluation(
+                            text, json_data, include_evaluation, trace_id, tracing_service.get_timestamp(), report
+                        )
+                        # No LLM tokens or stage attempts were spent on this request
+                        return response.model_copy(update={
+                            "trace_id": trace_id,
+                            "evaluation": evaluation,
+                            "evaluation_status": evaluation_status,
+                            "token_usage": None,
+                            "stage_attempts": None,
+                            "cache_status": "hit"
+                        })
+                    cache_status = "miss"
             
             # Create trace ID
             trace_id = tracing_service.create_trace_id()
@@ -57,7 +180,7 @@ class CodingPipelineService:
                 as_type="span",
                 trace_context={"trace_id": trace_id}
             ) as rag_span:
-                with propagate_attributes(
+                with observability.propagate_attributes(
                     trace_name="MEDICAL CODING PIPELINE",
                     user_id="api-user",
                     tags=["production", "crewai"],
@@ -67,26 +190,21 @@ class CodingPipelineService:
                     }
                 ):
                     # Execute the crew
-                    crew_output = self.crew.kickoff(text)
+                    crew_output = self.crew.kickoff(
+                        text,
+                        on_stage_start=on_stage_start,
+                        on_stage_complete=on_stage_complete
+                    )
                     
-                    # Parse task outputs
+                    # Parse task outputs (stages may finish in any order)
                     json_data = []
                     coding_result = CodingResult()
                     
-                    for i, task_out in enumerate(crew_output.tasks_output):
-                        if task_out.pydantic:
-                            data = task_out.pydantic.model_dump()
-                            json_data.append(data)
-                            
-                            # Map to coding result based on task order
-                            if i == 0:  # Entity structuring
-                                coding_result.entities = task_out.pydantic
-                            elif i == 1:  # ICD coding
-                                coding_result.icd_codes = task_out.pydantic
-                            elif i == 2:  # HCPCS coding
-                                coding_result.hcpcs_codes = task_out.pydantic
-                            elif i == 3:  # CPT coding
-                                coding_result.cpt_codes = task_out.pydantic
+                    for stage in CREW_STAGES:
+                        task_out = crew_output.stage_outputs.get(stage)
+                        if task_out is not None and task_out.pydantic:
+                            json_data.append(task_out.pydantic.model_dump())
+                            setattr(coding_result, stage, task_out.pydantic)
                     
                     # Update trace span
                     rag_span.update(
@@ -95,65 +213,117 @@ class CodingPipelineService:
                         metadata={"token_usage": str(crew_output.token_usage)}
                     )
             
-            # Run evaluation if requested 
-            evaluation = None
-            if include_evaluation and json_data:
-                with langfuse.start_as_current_observation(
-                    name='MEDICAL CODING JUDGE',
-                    as_type="evaluator",
-                    trace_context={"trace_id": trace_id}
-                ) as judge_span:
-                    with propagate_attributes(
-                        trace_name="MEDICAL CODING PIPELINE",
-                        user_id="api-user",
-                        tags=["production", "judge"],
-                        metadata={
-                            "timestamp": timestamp,
-                            "environment": "production"
-                        }
-                    ):
-                        evaluation = judge_service.evaluate(
-                            clinical_note=text,
-                            coding_output=json_data
-                        )
-                        
-                        # Add evaluation scores to trace
-                        tracing_service.add_evaluation_scores(
-                            evaluation.model_dump(),
-                            trace_id
-                        )
-            
-            # Convert token_usage to dict if it exists (CrewAI returns UsageMetrics object)
-            token_usage_dict = None
-            if hasattr(crew_output, 'token_usage') and crew_output.token_usage is not None:
-                try:
-                    # Try model_dump() for Pydantic models
-                    token_usage_dict = crew_output.token_usage.model_dump()
-                except AttributeError:
-                    # Fallback to __dict__ or dict conversion
-                    try:
-                        token_usage_dict = dict(crew_output.token_usage.__dict__)
-                    except:
-                        token_usage_dict = {"raw": str(crew_output.token_usage)}
+            evaluation, evaluation_status = self._apply_evaluation(
+                text, json_data, include_evaluation, trace_id, timestamp, report
+            )
             
-            return PipelineResponse(
+            response = PipelineResponse(
                 success=True,
                 trace_id=trace_id,
                 coding_result=coding_result,
                 evaluation=evaluation,
-                token_usage=token_usage_dict
+                evaluation_status=evaluation_status,
+                token_usage=crew_output.token_usage or None,
+                stage_attempts=crew_output.stage_attempts or None,
+                cache_status=cache_status
             )
+            if settings.RESULT_CACHE_ENABLED:
+                # Evaluation, token usage and attempts are per request: only the coding outcome is cached
+                result_cache.put(cache_key, response.model_dump_json(include={"success", "coding_result"}))
+            return response
             
         except Exception as e:
-            return PipelineResponse(
+            response = PipelineResponse(
                 success=False,
                 error=str(e)
             )
+            response._transient_failure = is_transient(e)
+            return response
+    
+    def _apply_evaluation(
+        self,
+        text: str,
+        json_data: List[Dict[str, Any]],
+        include_evaluation: bool,
+        trace_id: str,
+        timestamp: str,
+        report: Callable[..., None]
+    ) -> Tuple[Optional[MedicalCodingJudgeOutput], Optional[str]]:
+        """
+        Run the judge if requested and sampled, inline or deferred.
+        
+        Returns:
+            Tuple of (evaluation or None, evaluation status or None)
+        """
+        if not include_evaluation or not json_data:
+            return None, None
+        evaluation = None
+        if not evaluation_service.sample():
+            evaluation_status = "skipped"
+        elif settings.EVALUATION_MODE == "deferred":
+            evaluation_status = evaluation_service.submit(
+                trace_id,
+                lambda: self._evaluate(text, json_data, trace_id, timestamp)
+            )
+        else:
+            report("evaluation", "running")
+            evaluation = self._evaluate(text, json_data, trace_id, timestamp)
+            evaluation_status = "completed"
+        report("evaluation", self._stage_status(evaluation_status), evaluation)
+        return evaluation, evaluation_status
+    
+    @staticmethod
+    def _evaluate(
+        text: str,
+        json_data: List[Dict[str, Any]],
+        trace_id: str,
+        timestamp: str
+    ) -> MedicalCodingJudgeOutput:
+        """Run the LLM judge on a coding result and record its scores on the trace"""
+        
+        langfuse = observability.get_langfuse()
+        with langfuse.start_as_current_observation(
+            name='MEDICAL CODING JUDGE',
+            as_type="evaluator",
+            trace_context={"trace_id": trace_id}
+        ) as judge_span:
+            with observability.propagate_attributes(
+                trace_name="MEDICAL CODING PIPELINE",
+                user_id="api-user",
+                tags=["production", "judge"],
+                metadata={
+                    "timestamp": timestamp,
+                    "environment": "production"
+                }
+            ):
+                evaluation = judge_service.evaluate(
+                    clinical_note=text,
+                    coding_output=json_data
+                )
+                
+                # Add evaluation scores to trace
+                tracing_service.add_evaluation_scores(
+                    evaluation.model_dump(),
+                    trace_id
+                )
+        return evaluation
+    
+    @staticmethod
+    def _stage_status(evaluation_status: str) -> str:
+        """Progress status reported for the evaluation stage"""
+        return {
+            "pending": "pending",
+            "running": "running",
+            "completed": "completed",
+            "failed": "failed",
+        }.get(evaluation_status, "skipped")
     
     def process_pdf(
         self,
         pdf_path: str,
-        include_evaluation: bool = True
+        include_evaluation: bool = True,
+        progress_callback: Optional[ProgressCallback] = None,
+        bypass_cache: bool = False
     ) -> PipelineResponse:
         """
         Process a PDF file through the coding pipeline.
@@ -161,6 +331,8 @@ class CodingPipelineService:
         Args:
             pdf_path: Path to the PDF file
             include_evaluation: Whether to run LLM judge evaluation
+            progress_callback: Optional stage progress callable
+            bypass_cache: Skip the result cache lookup
             
         Returns:
             PipelineResponse with all results
@@ -170,7 +342,7 @@ class CodingPipelineService:
             text = pdf_extractor.extract_text_from_pdf(pdf_path)
             
             # Process through pipeline
-            return self.process_text(text, include_evaluation)
+            return self.process_text(text, include_evaluation, progress_callback, bypass_cache)
             
         except Exception as e:
             return PipelineResponse(
@@ -181,7 +353,9 @@ class CodingPipelineService:
     def process_pdf_bytes(
         self,
         pdf_bytes: bytes,
-        include_evaluation: bool = True
+        include_evaluation: bool = True,
+        progress_callback: Optional[ProgressCallback] = None,
+        bypass_cache: bool = False
     ) -> PipelineResponse:
         """
         Process PDF bytes (from file upload) through the coding pipeline.
@@ -189,22 +363,32 @@ class CodingPipelineService:
         Args:
             pdf_bytes: PDF file content as bytes
             include_evaluation: Whether to run LLM judge evaluation
+            progress_callback: Optional stage progress callable
+            bypass_cache: Skip the result cache lookup
             
         Returns:
             PipelineResponse with all results
         """
-        try:
-            # Extract text from PDF bytes
-            text = pdf_extractor.extract_text_from_bytes(pdf_bytes)
-            
-            # Process through pipeline
-            return self.process_text(text, include_evaluation)
-            
-        except Exception as e:
-            return PipelineResponse(
-                success=False,
-                error=str(e)
-            )
+        def run(callback: Optional[ProgressCallback]) -> PipelineResponse:
+            try:
+                # Extract text from PDF bytes
+                text = pdf_extractor.extract_text_from_bytes(pdf_bytes)
+                
+                # Process through pipeline
+                return self.process_text(text, include_evaluation, callback, bypass_cache)
+                
+            except Exception as e:
+                return PipelineResponse(
+                    success=False,
+                    error=str(e)
+                )
+        
+        # The same upload arriving twice shares one extraction and crew run
+        flight_key = (
+            f"pdf:{'fresh' if bypass_cache else 'cached'}:{int(include_evaluation)}:"
+            f"{hashlib.sha256(pdf_bytes).hexdigest()}"
+        )
+        return self._coalesce(flight_key, run, progress_callback)
 
 
 # Factory function
@@ -213,5 +397,21 @@ def get_coding_pipeline_service(verbose: bool = False) -> CodingPipelineService:
     return CodingPipelineService(verbose=verbose)
 
 
-# Singleton instance for dependency injection
-coding_pipeline_service = CodingPipelineService(verbose=False)
+_shared_service: Optional[CodingPipelineService] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_pipeline_service() -> CodingPipelineService:
+    """Shared pipeline service used by the API, created on first use"""
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = CodingPipelineService(verbose=False)
+        return _shared_service
+
+
+def __getattr__(name: str):
+    # ``coding_pipeline_service`` is created on first access, not at import
+    if name == "coding_pipeline_service":
+        return get_shared_pipeline_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -26,7 +26,8 @@ class EmbeddingService:
     @staticmethod
     def get_embeddings(texts: List[str]) -> List[List[float]]:
         """
-        Generate embeddings for multiple texts.
+        Generate embeddings for multiple texts in batched forward passes,
+        shared with concurrent callers through the embedding micro-batcher.
         
         Args:
             texts: List of texts to embed
@@ -34,7 +35,7 @@ class EmbeddingService:
         Returns:
             List of embedding vectors
         """
-        return [vector_db.get_embedding(text) for text in texts]
+        return vector_db.get_embeddings(texts)
 
 
 # Singleton instance
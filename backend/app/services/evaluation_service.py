@@ -0,0 +1,198 @@
+"""
+Deferred Evaluation Service
+Runs the LLM judge off the request path on a bounded background pool
+"""
+
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.core.config import settings
+from app.models.judge_models import MedicalCodingJudgeOutput
+from app.models.responses import EvaluationStatusResponse, PipelineResponse
+
+
+class EvaluationRecord:
+    """In-memory record of one judge evaluation, keyed by trace id"""
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.status = "pending"
+        self.evaluation: Optional[MedicalCodingJudgeOutput] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def to_response(self) -> EvaluationStatusResponse:
+        """Convert the record into its API representation"""
+        return EvaluationStatusResponse(
+            trace_id=self.trace_id,
+            status=self.status,
+            evaluation=self.evaluation,
+            error=self.error,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at
+        )
+
+
+class EvaluationService:
+    """
+    Samples requests for judging and, in deferred mode, runs the judge on
+    a background pool so coding results return without waiting for it.
+
+    At most ``max_workers`` evaluations run at once and ``max_queue`` more
+    may wait; beyond that new evaluations are dropped rather than building
+    an unbounded backlog. Finished records are kept for ``ttl_seconds``.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        sample_rate: Optional[float] = None,
+        ttl_seconds: Optional[float] = None,
+        max_retained: Optional[int] = None
+    ):
+        self.max_workers = max_workers or settings.EVALUATION_WORKERS
+        self.max_queue = max_queue if max_queue is not None else settings.EVALUATION_QUEUE_MAX_SIZE
+        self.sample_rate = sample_rate if sample_rate is not None else settings.EVALUATION_SAMPLE_RATE
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.EVALUATION_TTL_SECONDS
+        self.max_retained = max_retained if max_retained is not None else settings.EVALUATION_MAX_RETAINED
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._records: Dict[str, EvaluationRecord] = {}
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.sampled = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.completed = 0
+        self.failed = 0
+        self._run_times = deque(maxlen=1000)
+
+    def sample(self) -> bool:
+        """Decide whether this request is judged (EVALUATION_SAMPLE_RATE)"""
+        selected = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+        with self._lock:
+            if selected:
+                self.sampled += 1
+            else:
+                self.skipped += 1
+        return selected
+
+    def submit(self, trace_id: str, evaluate: Callable[[], MedicalCodingJudgeOutput]) -> str:
+        """
+        Queue a judge evaluation for background execution.
+
+        Args:
+            trace_id: Trace id of the coding run (the lookup key)
+            evaluate: Callable running the judge and recording its scores
+
+        Returns:
+            "pending" if queued, "dropped" if the backlog is full
+        """
+        self._purge()
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.dropped += 1
+                return "dropped"
+            self._pending += 1
+            record = EvaluationRecord(trace_id)
+            self._records[trace_id] = record
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="evaluation-worker"
+                )
+        self._executor.submit(self._run, record, evaluate)
+        return "pending"
+
+    def _run(self, record: EvaluationRecord, evaluate: Callable[[], MedicalCodingJudgeOutput]):
+        record.status = "running"
+        record.started_at = time.time()
+        try:
+            record.evaluation = evaluate()
+            status = "completed"
+        except Exception as e:
+            record.error = str(e)
+            status = "failed"
+        # finished_at must be set before the status marks the record finished
+        record.finished_at = time.time()
+        record.status = status
+        with self._lock:
+            self._pending -= 1
+            if record.status == "completed":
+                self.completed += 1
+            else:
+                self.failed += 1
+            self._run_times.append(record.finished_at - record.started_at)
+
+    def get(self, trace_id: str) -> Optional[EvaluationRecord]:
+        """Look up an evaluation, returning None if unknown or expired"""
+        self._purge()
+        with self._lock:
+            return self._records.get(trace_id)
+
+    def attach(self, response: PipelineResponse) -> PipelineResponse:
+        """Fill in a deferred evaluation on a response once it is available"""
+        if response.evaluation is not None or response.evaluation_status not in ("pending", "running"):
+            return response
+        record = self.get(response.trace_id) if response.trace_id else None
+        if record is None:
+            return response
+        return response.model_copy(update={
+            "evaluation": record.evaluation,
+            "evaluation_status": record.status
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        """Sampling, backlog and outcome counters"""
+        with self._lock:
+            runs = list(self._run_times)
+            return {
+                "mode": settings.EVALUATION_MODE,
+                "sample_rate": self.sample_rate,
+                "workers": self.max_workers,
+                "pending": self._pending,
+                "sampled": self.sampled,
+                "skipped": self.skipped,
+                "dropped": self.dropped,
+                "completed": self.completed,
+                "failed": self.failed,
+                "run_ms_avg": round(1000 * sum(runs) / len(runs), 1) if runs else 0.0,
+            }
+
+    def shutdown(self):
+        """Stop the background pool without waiting for queued evaluations"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _purge(self):
+        """Drop expired records and enforce the finished-record retention limit"""
+        now = time.time()
+        with self._lock:
+            finished = [record for record in self._records.values() if record.finished]
+            expired = [r.trace_id for r in finished if r.finished_at + self.ttl_seconds <= now]
+            for trace_id in expired:
+                del self._records[trace_id]
+
+            overflow = len(finished) - len(expired) - self.max_retained
+            if overflow > 0:
+                remaining = sorted(
+                    (r for r in finished if r.trace_id in self._records),
+                    key=lambda r: r.finished_at
+                )
+                for record in remaining[:overflow]:
+                    del self._records[record.trace_id]
+
+
+# Singleton instance
+evaluation_service = EvaluationService()
@@ -0,0 +1,310 @@
+"""
+Coding Job Service
+Asynchronous job queue and bounded worker pool for the coding pipeline
+"""
+
+import time
+import uuid
+import queue
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Any
+from app.core.config import settings
+from app.models.jobs import JobStatus, StageStatus, JobStatusResponse
+from app.models.responses import PipelineResponse
+from app.services.coding_pipeline import CodingPipelineService, get_shared_pipeline_service
+from app.services.admission_control import AdmissionController, admission_controller
+from app.services.evaluation_service import evaluation_service
+from app.utils.exceptions import JobQueueFullError
+
+
+class JobQueue(ABC):
+    """
+    Queue interface used to hand job ids to the workers.
+
+    The default implementation is in-process; a different backend
+    (e.g. a local stand-in for tests or a broker) only has to
+    implement ``put``, ``get`` and ``qsize``.
+    """
+
+    @abstractmethod
+    def put(self, job_id: str) -> None:
+        """Enqueue a job id, raising JobQueueFullError when saturated"""
+
+    @abstractmethod
+    def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Dequeue the next job id, or None on timeout"""
+
+    @abstractmethod
+    def qsize(self) -> int:
+        """Number of jobs waiting to be picked up"""
+
+
+class InProcessJobQueue(JobQueue):
+    """Bounded FIFO queue living in the API process"""
+
+    def __init__(self, maxsize: int = 0):
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=maxsize)
+
+    def put(self, job_id: str) -> None:
+        try:
+            self._queue.put_nowait(job_id)
+        except queue.Full:
+            raise JobQueueFullError(
+                "Job queue is full",
+                details={"max_size": self._queue.maxsize}
+            )
+
+    def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+
+class CodingJob:
+    """In-memory record of a single coding job"""
+
+    def __init__(self, kind: str, payload: Any, include_evaluation: bool, stages, bypass_cache: bool = False):
+        self.job_id = str(uuid.uuid4())
+        self.kind = kind
+        self.payload = payload
+        self.include_evaluation = include_evaluation
+        self.bypass_cache = bypass_cache
+        self.status = JobStatus.queued
+        self.stages: Dict[str, StageStatus] = {
+            stage: StageStatus.pending for stage in stages
+        }
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.expires_at: Optional[float] = None
+        self.result: Optional[PipelineResponse] = None
+        self.error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.completed, JobStatus.failed)
+
+    def to_response(self) -> JobStatusResponse:
+        """Convert the job record into its API representation"""
+        return JobStatusResponse(
+            job_id=self.job_id,
+            status=self.status,
+            stages=dict(self.stages),
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            expires_at=self.expires_at,
+            result=self.result,
+            error=self.error
+        )
+
+
+class JobService:
+    """
+    Runs coding pipeline jobs on a bounded pool of worker threads.
+
+    Workers execute each job through the admission controller, so job runs
+    and synchronous requests share the PIPELINE_MAX_CONCURRENCY slots.
+    """
+
+    def __init__(
+        self,
+        job_queue: Optional[JobQueue] = None,
+        pipeline: Optional[CodingPipelineService] = None,
+        max_workers: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        max_retained: Optional[int] = None,
+        admission: Optional[AdmissionController] = None
+    ):
+        self.job_queue = job_queue or InProcessJobQueue(maxsize=settings.JOB_QUEUE_MAX_SIZE)
+        self._pipeline = pipeline
+        self.admission = admission or admission_controller
+        self.max_workers = max_workers or settings.JOB_WORKERS
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.JOB_TTL_SECONDS
+        self.max_retained = max_retained if max_retained is not None else settings.JOB_MAX_RETAINED
+
+        self._jobs: Dict[str, CodingJob] = {}
+        self._lock = threading.Lock()
+        self._workers = []
+        self._stopping = threading.Event()
+
+    @property
+    def pipeline(self) -> CodingPipelineService:
+        """Pipeline used by the workers (the shared service unless injected)"""
+        return self._pipeline or get_shared_pipeline_service()
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._lock:
+            if self._workers:
+                return
+            self._stopping.clear()
+            for i in range(self.max_workers):
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"coding-job-worker-{i}",
+                    daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def shutdown(self, timeout: float = 5.0):
+        """Signal workers to stop and wait briefly for them to exit"""
+        self._stopping.set()
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+        self._workers = []
+
+    def submit_text(
+        self,
+        medical_report_text: str,
+        include_evaluation: bool = True,
+        bypass_cache: bool = False
+    ) -> CodingJob:
+        """Queue a text coding job"""
+        return self._submit("text", medical_report_text, include_evaluation, bypass_cache)
+
+    def submit_pdf_bytes(
+        self,
+        pdf_bytes: bytes,
+        include_evaluation: bool = True,
+        bypass_cache: bool = False
+    ) -> CodingJob:
+        """Queue a PDF coding job"""
+        return self._submit("pdf", pdf_bytes, include_evaluation, bypass_cache)
+
+    def get_job(self, job_id: str) -> Optional[CodingJob]:
+        """Look up a job, returning None if unknown or expired"""
+        self._purge()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def job_status(self, job: CodingJob) -> JobStatusResponse:
+        """
+        API representation of a job, including a deferred evaluation.
+
+        The judge may finish after the job does, so its verdict is merged
+        into the response on each poll; the job record itself is not changed.
+        """
+        response = job.to_response()
+        if response.result is None:
+            return response
+        result = evaluation_service.attach(response.result)
+        if result is response.result:
+            return response
+        stages = dict(response.stages)
+        if "evaluation" in stages:
+            stages["evaluation"] = StageStatus(result.evaluation_status)
+        return response.model_copy(update={"result": result, "stages": stages})
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and job counts by status"""
+        with self._lock:
+            counts = {status.value: 0 for status in JobStatus}
+            for job in self._jobs.values():
+                counts[job.status.value] += 1
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.job_queue.qsize(),
+            "jobs": counts
+        }
+
+    def _submit(self, kind: str, payload: Any, include_evaluation: bool, bypass_cache: bool) -> CodingJob:
+        self.start()
+        self._purge()
+
+        job = CodingJob(
+            kind=kind,
+            payload=payload,
+            include_evaluation=include_evaluation,
+            stages=self.pipeline.get_stages(include_evaluation),
+            bypass_cache=bypass_cache
+        )
+        with self._lock:
+            self._jobs[job.job_id] = job
+
+        try:
+            self.job_queue.put(job.job_id)
+        except JobQueueFullError:
+            with self._lock:
+                self._jobs.pop(job.job_id, None)
+            raise
+
+        return job
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            job_id = self.job_queue.get(timeout=0.5)
+            if job_id is None:
+                continue
+            with self._lock:
+                job = self._jobs.get(job_id)
+            if job is not None:
+                self._run_job(job)
+
+    def _run_job(self, job: CodingJob):
+        job.status = JobStatus.running
+        job.started_at = time.time()
+
+        def on_progress(stage: str, status: str, output: Any = None):
+            if stage in job.stages:
+                job.stages[stage] = StageStatus(status)
+
+        try:
+            if job.kind == "pdf":
+                result = self.admission.run_blocking(
+                    self.pipeline.process_pdf_bytes,
+                    pdf_bytes=job.payload,
+                    include_evaluation=job.include_evaluation,
+                    progress_callback=on_progress,
+                    bypass_cache=job.bypass_cache
+                )
+            else:
+                result = self.admission.run_blocking(
+                    self.pipeline.process_text,
+                    medical_report_text=job.payload,
+                    include_evaluation=job.include_evaluation,
+                    progress_callback=on_progress,
+                    bypass_cache=job.bypass_cache
+                )
+        except Exception as e:
+            result = PipelineResponse(success=False, error=str(e))
+
+        if not result.success:
+            for stage, status in job.stages.items():
+                if status == StageStatus.running:
+                    job.stages[stage] = StageStatus.failed
+
+        job.result = result
+        job.error = result.error
+        job.payload = None
+        job.finished_at = time.time()
+        job.expires_at = job.finished_at + self.ttl_seconds
+        job.status = JobStatus.completed if result.success else JobStatus.failed
+
+    def _purge(self):
+        """Drop expired jobs and enforce the finished-job retention limit"""
+        now = time.time()
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.expires_at is not None and job.expires_at <= now
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+            finished = [job for job in self._jobs.values() if job.finished]
+            overflow = len(finished) - self.max_retained
+            if overflow > 0:
+                finished.sort(key=lambda job: job.finished_at)
+                for job in finished[:overflow]:
+                    del self._jobs[job.job_id]
+
+
+# Singleton instance
+job_service = JobService()
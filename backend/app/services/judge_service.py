@@ -3,13 +3,18 @@ LLM Judge Service
 Medical coding quality evaluation using LLM
 """
 
-from typing import Dict, Any
-from toon_format import encode
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
+import threading
+from typing import Dict, Any, Optional
+from app.core.llm_hooks import LLMCall, run_llm_call
+from app.core.llm_hook_chain import LLM_CALL_HOOKS
+from app.core.replay import replay
 from app.models.judge_models import MedicalCodingJudgeOutput
 
 
+# Judge model (Google Generative AI)
+JUDGE_MODEL = "gemini-2.5-flash"
+JUDGE_PROVIDER_MODEL = f"gemini/{JUDGE_MODEL}"
+
 # Judge system prompt
 JUDGE_SYSTEM_PROMPT = """
 You are a **medical coding quality judge** responsible for evaluating the
@@ -121,10 +126,20 @@ class JudgeService:
     def __init__(self):
         self._chain = None
         self._initialized = False
+        self._init_lock = threading.Lock()
     
     def initialize(self):
-        """Initialize the judge chain"""
-        if not self._initialized:
+        """Initialize the judge chain (not needed when replaying recorded verdicts)"""
+        if self._initialized or replay.replaying:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            
+            # LangChain is imported on first use to keep app startup fast
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            from langchain_core.prompts import ChatPromptTemplate
+            
             # Create prompt template
             self.prompt = ChatPromptTemplate.from_messages([
                 ("system", JUDGE_SYSTEM_PROMPT),
@@ -139,7 +154,7 @@ Medical Coding Output:
             
             # Create LLM with structured output
             llm = ChatGoogleGenerativeAI(
-                model="gemini-2.5-flash",
+                model=JUDGE_MODEL,
                 temperature=0,
                 max_tokens=None,
                 timeout=None,
@@ -165,18 +180,40 @@ Medical Coding Output:
         Returns:
             MedicalCodingJudgeOutput with evaluation results
         """
-        self.initialize()
+        from toon_format import encode
         
         # Encode coding output for compact representation
         encoded_output = encode(coding_output)
+        prompt = [JUDGE_SYSTEM_PROMPT, clinical_note, encoded_output]
         
-        # Invoke the judge chain
-        result = self._chain.invoke({
+        if replay.replaying:
+            verdict = replay.judge_response(JUDGE_PROVIDER_MODEL, prompt)
+            return MedicalCodingJudgeOutput.model_validate(verdict)
+        
+        self.initialize()
+        
+        inputs = {
             "clinical_note": clinical_note,
             "medical_coding_output": encoded_output
-        })
+        }
+        
+        def send() -> Optional[str]:
+            result = self._chain.invoke(inputs)
+            return result.model_dump_json() if result is not None else None
         
-        return result
+        # Same hooks as the agents: cancellation, completion cache, the shared
+        # Gemini budget (with the entity agent) and replay recording
+        call = LLMCall(
+            model=JUDGE_PROVIDER_MODEL,
+            messages=prompt,
+            temperature=0,
+            stage="judge",
+            response_format=MedicalCodingJudgeOutput.model_json_schema()
+        )
+        completion = run_llm_call(LLM_CALL_HOOKS, call, send)
+        if completion is None:
+            return None
+        return MedicalCodingJudgeOutput.model_validate_json(completion)
 
 
 # Singleton instance
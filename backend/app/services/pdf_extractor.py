@@ -6,9 +6,6 @@ Extract text from PDF files with OCR fallback
 import re
 from pathlib import Path
 from typing import List
-import fitz  # PyMuPDF
-from PIL import Image
-import pytesseract
 from app.utils.text_utils import clean_text
 from app.utils.exceptions import PDFExtractionError
 
@@ -30,6 +27,8 @@ class PDFExtractor:
         Raises:
             PDFExtractionError: If extraction fails
         """
+        import fitz  # PyMuPDF, imported on first use
+        
         try:
             path = Path(pdf_path)
             if not path.exists():
@@ -82,6 +81,9 @@ class PDFExtractor:
             OCR extracted text
         """
         try:
+            from PIL import Image
+            import pytesseract
+            
             # Render page as an image (pixmap)
             pix = page.get_pixmap()
             
@@ -112,6 +114,8 @@ class PDFExtractor:
             Extracted and cleaned text from all pages
         """
         try:
+            import fitz  # PyMuPDF, imported on first use
+            
             report_text: List[str] = []
             
             # Open PDF from bytes
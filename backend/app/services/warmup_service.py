@@ -0,0 +1,209 @@
+"""
+Warmup Service
+Load models, clients and index handles at startup and track readiness
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+from app.core.config import settings
+from app.core.llm_config import llm_models
+from app.core.vector_db import vector_db
+from app.core.observability import observability
+from app.services.judge_service import judge_service
+from app.services.coding_pipeline import get_shared_pipeline_service
+
+
+def _build_crew():
+    get_shared_pipeline_service().crew.warmup()
+
+
+# Warmup components: name -> (dependencies, callable). Components whose
+# dependencies are met run in parallel.
+WARMUP_COMPONENTS: Dict[str, Tuple[Tuple[str, ...], Callable[[], Any]]] = {
+    "observability": ((), observability.initialize),
+    "embedding_model": ((), vector_db.warmup),
+    "vector_indexes": (("embedding_model",), vector_db.open_indexes),
+    "llm_clients": ((), llm_models.initialize),
+    "crew": (("llm_clients",), _build_crew),
+    "judge": ((), judge_service.initialize),
+}
+
+# Components the service can run without: they initialize again on first
+# use, so their failure is reported but does not hold readiness
+OPTIONAL_WARMUP_COMPONENTS = frozenset({"observability", "judge"})
+
+
+class WarmupService:
+    """
+    Runs the startup warmup in a background thread.
+
+    Required components that fail (and those depending on them) are retried
+    every WARMUP_RETRY_SECONDS, so a transient outage at deploy time delays
+    readiness instead of leaving the instance permanently unready. Optional
+    components are retried alongside them, but once every required one is
+    up the instance is ready; optional components still failing are left
+    to initialize on first use and reported as ``degraded``.
+    """
+
+    def __init__(
+        self,
+        components: Optional[Dict[str, Tuple[Tuple[str, ...], Callable]]] = None,
+        optional: Optional[FrozenSet[str]] = None
+    ):
+        self.components = components if components is not None else WARMUP_COMPONENTS
+        self.optional = optional if optional is not None else OPTIONAL_WARMUP_COMPONENTS
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self.attempts = 0
+
+    def _selected(self) -> Dict[str, Tuple[Tuple[str, ...], Callable]]:
+        names = [name.strip() for name in settings.WARMUP_COMPONENTS.split(",") if name.strip()]
+        if not names:
+            return dict(self.components)
+        unknown = set(names) - set(self.components)
+        if unknown:
+            raise ValueError(f"Unknown WARMUP_COMPONENTS: {sorted(unknown)}")
+        # Pull in dependencies of the selected components
+        selected = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name not in selected:
+                selected.add(name)
+                stack.extend(self.components[name][0])
+        return {name: spec for name, spec in self.components.items() if name in selected}
+
+    def start(self):
+        """Start warming up in the background (no-op when disabled or started)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            if not settings.WARMUP_ENABLED:
+                self._done.set()
+                return
+            components = self._selected()
+            self._status = {name: {"status": "pending"} for name in components}
+            self._started_at = time.monotonic()
+            self._thread = threading.Thread(
+                target=self._run, args=(components,), name="warmup", daemon=True
+            )
+            self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until warmup has finished; True if it did"""
+        return self._done.wait(timeout)
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def _run(self, components: Dict[str, Tuple[Tuple[str, ...], Callable]]):
+        while True:
+            self.attempts += 1
+            todo = {
+                name: spec for name, spec in components.items()
+                if self._status[name]["status"] != "ok"
+            }
+            self._run_once(todo)
+            failed = [name for name in components if name not in self.optional and not self._ok(name)]
+            if not failed:
+                break
+            print(f"⚠️  Warmup incomplete ({', '.join(failed)}); retrying in {settings.WARMUP_RETRY_SECONDS}s")
+            time.sleep(settings.WARMUP_RETRY_SECONDS)
+
+        self._finished_at = time.monotonic()
+        self._done.set()
+        print(f"✅ Warmup complete in {self._finished_at - self._started_at:.1f}s")
+        degraded = self._degraded()
+        if degraded:
+            print(f"⚠️  Optional warmup failed ({', '.join(degraded)}); initializing on first use")
+
+    def _ok(self, name: str) -> bool:
+        with self._lock:
+            return self._status[name]["status"] == "ok"
+
+    def _degraded(self) -> List[str]:
+        """Optional components that had not warmed up when warmup finished"""
+        if not self.ready:
+            return []
+        with self._lock:
+            return [name for name, state in self._status.items() if state["status"] != "ok"]
+
+    def _run_once(self, todo: Dict[str, Tuple[Tuple[str, ...], Callable]]):
+        """Run one pass over the unfinished components in dependency order"""
+        for name in todo:
+            self._update(name, status="pending")
+        pending = dict(todo)
+        running = {}
+        with ThreadPoolExecutor(max_workers=settings.WARMUP_MAX_WORKERS, thread_name_prefix="warmup") as executor:
+            while pending or running:
+                for name in list(pending):
+                    deps, fn = pending[name]
+                    states = [self._status.get(dep, {"status": "ok"})["status"] for dep in deps]
+                    if any(state in ("failed", "blocked") for state in states):
+                        pending.pop(name)
+                        self._update(name, status="blocked", error=f"waiting for {', '.join(deps)}")
+                    elif all(state == "ok" for state in states):
+                        pending.pop(name)
+                        self._update(name, status="running", error=None)
+                        running[executor.submit(self._timed, fn)] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    seconds, error = future.result()
+                    if error is None:
+                        self._update(name, status="ok", seconds=round(seconds, 3))
+                    else:
+                        self._update(name, status="failed", seconds=round(seconds, 3), error=error)
+
+    @staticmethod
+    def _timed(fn: Callable) -> Tuple[float, Optional[str]]:
+        started = time.perf_counter()
+        try:
+            fn()
+            return time.perf_counter() - started, None
+        except Exception as e:
+            return time.perf_counter() - started, f"{type(e).__name__}: {e}"
+
+    def _update(self, name: str, **fields):
+        with self._lock:
+            self._status[name].update(fields)
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness flag, overall state and per-component timings"""
+        with self._lock:
+            components = {name: dict(state) for name, state in self._status.items()}
+        if not settings.WARMUP_ENABLED:
+            state = "disabled"
+        elif self.ready:
+            state = "degraded" if self._degraded() else "ready"
+        elif self._thread is None:
+            state = "not_started"
+        elif any(item["status"] in ("failed", "blocked") for item in components.values()):
+            state = "retrying"
+        else:
+            state = "warming_up"
+
+        total = None
+        if self._started_at is not None:
+            total = round((self._finished_at or time.monotonic()) - self._started_at, 3)
+        return {
+            "ready": self.ready,
+            "status": state,
+            "attempts": self.attempts,
+            "total_seconds": total,
+            "components": components,
+            "degraded": self._degraded(),
+        }
+
+
+# Singleton instance
+warmup_service = WarmupService()
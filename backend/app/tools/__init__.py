@@ -3,12 +3,23 @@ CrewAI Tools Module
 RAG tools for vector database search
 """
 
-from app.tools.icd_search_tool import ICD_Vector_Search_Tool
-from app.tools.cpt_search_tool import CPT_Vector_Search_Tool
-from app.tools.hcpcs_search_tool import HCPCS_Vector_Search_Tool
-
-__all__ = [
-    "ICD_Vector_Search_Tool",
-    "CPT_Vector_Search_Tool",
-    "HCPCS_Vector_Search_Tool"
-]
+import importlib
+
+
+_EXPORTS = {
+    "ICD_Vector_Search_Tool": "app.tools.icd_search_tool",
+    "CPT_Vector_Search_Tool": "app.tools.cpt_search_tool",
+    "HCPCS_Vector_Search_Tool": "app.tools.hcpcs_search_tool",
+}
+
+
+def __getattr__(name: str):
+    # Submodules are imported on first attribute access so that importing
+    # the package does not pull in CrewAI
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
+
+
+__all__ = list(_EXPORTS)
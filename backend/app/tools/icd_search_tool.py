@@ -5,10 +5,10 @@ RAG tool for retrieving ICD-10-CM codes from Pinecone
 
 from typing import List
 from crewai.tools import tool
-from toon_format import encode
 from app.core.vector_db import vector_db
 from app.core.observability import observability
 from app.utils.compression import compress_icd_vector_db_response
+from app.tools.vector_search import search_vector_index
 
 
 @tool
@@ -27,34 +27,18 @@ def ICD_Vector_Search_Tool(query_texts: List[str]) -> str:
     with langfuse.start_as_current_span(
         name="ICD Vector Search Tool",
     ) as span:
-        queries_results = []
-        
-        for query_text in query_texts:
-            if not isinstance(query_text, str):
-                raise ValueError("ICD vector search accepts a single query string only.")
-            
-            # Generate embedding
-            embedding = vector_db.get_embedding(query_text)
-            
-            # Query Pinecone
-            results = vector_db.icd_index.query(
-                vector=embedding,
-                top_k=5,
-                include_metadata=True
-            )
-            
-            # Compress and encode results
-            results = compress_icd_vector_db_response(results)
-            results = encode(results)
-            
-            queries_results.append(
-                f"Results for diagnostic term '{query_text}':\n{results}"
-            )
+        queries_results, failures = search_vector_index(
+            query_texts,
+            index=vector_db.icd_index,
+            compress=compress_icd_vector_db_response,
+            code_system="ICD",
+            term_label="diagnostic term"
+        )
         
         span.update(
             input=query_texts,
             output=queries_results,
-            metadata={"index": "ICD-10-CM"}
+            metadata={"index": "ICD-10-CM", "failed_queries": failures}
         )
         
         return "\n\n".join(queries_results)
@@ -0,0 +1,187 @@
+"""
+Shared Vector Search Logic
+Batched embedding and retrieval used by the ICD, CPT and HCPCS search tools
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Tuple
+from app.core.config import settings
+from app.core.vector_db import vector_db
+from app.core.retrieval_cache import retrieval_cache
+from app.core.lexical_index import reciprocal_rank_fusion
+from app.utils.text_utils import dedupe_terms
+
+
+# Shared pool bounding concurrent index queries across all tool calls
+_query_executor = ThreadPoolExecutor(
+    max_workers=settings.VECTOR_QUERY_MAX_WORKERS,
+    thread_name_prefix="vector-query"
+)
+
+# Counters for the hybrid retrieval path
+_stats_lock = threading.Lock()
+_stats = {"vector_queries": 0, "fused_queries": 0, "lexical_short_circuits": 0, "lexical_fallbacks": 0}
+
+
+def _count(**increments: int) -> None:
+    with _stats_lock:
+        for name, value in increments.items():
+            _stats[name] += value
+
+
+def retrieval_stats() -> Dict[str, int]:
+    """Vector, fused and lexical-only query counts"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def retrieval_mode(hybrid: bool) -> str:
+    """Retrieval settings that shape a cached result, as a cache namespace suffix"""
+    if not hybrid:
+        return "dense"
+    return (
+        f"hybrid:k={settings.LEXICAL_RRF_K}:depth={settings.LEXICAL_FUSION_DEPTH}"
+        f":short={int(settings.LEXICAL_SHORT_CIRCUIT)}"
+    )
+
+
+def search_vector_index(
+    query_texts: List[str],
+    index,
+    compress: Callable,
+    code_system: str,
+    term_label: str,
+    top_k: int = 5
+) -> Tuple[List[str], List[Dict[str, str]]]:
+    """
+    Retrieve top-k matches for every unique term in one batched pass.
+
+    Terms are normalized and deduplicated, and terms with a cached result
+    for this index version are answered from the retrieval cache. When a
+    BM25 index was built for the code system, a term that exactly matches
+    one code description is answered lexically without an embedding or
+    index query; other terms are embedded with a single batched ``encode``
+    call, queried against the index concurrently, and the dense matches are
+    fused with the BM25 matches by reciprocal rank fusion. Results are
+    reassembled in the original term order; a query that fails or exceeds
+    VECTOR_QUERY_TIMEOUT_SECONDS falls back to its lexical matches, or is
+    reported in place, instead of failing the whole tool call.
+
+    Args:
+        query_texts: Terms passed to the tool by the agent
+        index: Vector index to query
+        compress: Response compression function for this code system
+        code_system: "ICD", "CPT" or "HCPCS"
+        term_label: Label used in the formatted output (e.g. "procedure term")
+        top_k: Number of matches per term
+
+    Returns:
+        Tuple of (formatted result block per unique term, failed queries)
+    """
+    from toon_format import encode
+    
+    for query_text in query_texts:
+        if not isinstance(query_text, str):
+            raise ValueError(f"{code_system} vector search accepts a single query string only.")
+
+    terms = dedupe_terms(query_texts)
+    use_cache = settings.RETRIEVAL_CACHE_ENABLED
+    lexical = vector_db.get_lexical_index(code_system) if settings.LEXICAL_SEARCH_ENABLED else None
+    # Hybrid and dense-only results (and different fusion settings) never share entries
+    namespace = f"{vector_db.index_namespace(code_system)}|{retrieval_mode(lexical is not None)}"
+
+    encoded: Dict[str, str] = {}
+    if use_cache:
+        for term in terms:
+            cached = retrieval_cache.get(namespace, term, top_k)
+            if cached is not None:
+                encoded[term] = cached
+
+    missing = [term for term in terms if term not in encoded]
+
+    depth = max(top_k, settings.LEXICAL_FUSION_DEPTH) if lexical is not None else top_k
+    lexical_matches: Dict[str, list] = {}
+    to_query = []
+    for term in missing:
+        if lexical is None:
+            to_query.append(term)
+            continue
+        matches = lexical.search(term, depth)
+        exact = lexical.exact_match(term) if settings.LEXICAL_SHORT_CIRCUIT else None
+        if exact is None:
+            lexical_matches[term] = matches
+            to_query.append(term)
+            continue
+        # Unambiguous description match: skip the embedding and index query
+        ranked = [exact] + [m for m in matches if m["id"] != exact["id"]]
+        encoded[term] = encode(compress(reciprocal_rank_fusion([ranked], top_k, settings.LEXICAL_RRF_K)))
+        _count(lexical_short_circuits=1)
+        if use_cache:
+            retrieval_cache.put(namespace, term, top_k, encoded[term])
+
+    embeddings = vector_db.get_embeddings(to_query)
+
+    futures = {
+        term: _query_executor.submit(
+            index.query,
+            vector=embedding,
+            top_k=depth,
+            include_metadata=True
+        )
+        for term, embedding in zip(to_query, embeddings)
+    }
+    _count(vector_queries=len(futures))
+
+    # Queries run concurrently, so one shared deadline bounds each of them
+    deadline = time.monotonic() + settings.VECTOR_QUERY_TIMEOUT_SECONDS
+
+    failures = []
+    for term, future in futures.items():
+        original = terms[term]
+        try:
+            results = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError:
+            future.cancel()
+            failures.append({"term": original, "error": "timeout"})
+            encoded[term] = (
+                _lexical_fallback(lexical_matches.get(term), compress, top_k)
+                or f"ERROR: {code_system} search timed out, no candidates retrieved"
+            )
+            continue
+        except Exception as e:
+            failures.append({"term": original, "error": str(e)})
+            encoded[term] = (
+                _lexical_fallback(lexical_matches.get(term), compress, top_k)
+                or f"ERROR: {code_system} search failed, no candidates retrieved"
+            )
+            continue
+
+        if lexical is not None:
+            results = reciprocal_rank_fusion(
+                [results.matches, lexical_matches[term]], top_k, settings.LEXICAL_RRF_K, dense=0
+            )
+            _count(fused_queries=1)
+
+        # Compress and encode results
+        encoded[term] = encode(compress(results))
+        if use_cache:
+            retrieval_cache.put(namespace, term, top_k, encoded[term])
+
+    queries_results = [
+        f"Results for {term_label} '{original}':\n{encoded[term]}"
+        for term, original in terms.items()
+    ]
+
+    return queries_results, failures
+
+
+def _lexical_fallback(matches, compress: Callable, top_k: int):
+    """Encoded BM25-only results for a term whose index query failed"""
+    from toon_format import encode
+    
+    if not matches:
+        return None
+    _count(lexical_fallbacks=1)
+    return encode(compress(reciprocal_rank_fusion([matches], top_k, settings.LEXICAL_RRF_K)))
@@ -2,7 +2,13 @@
 Utility Functions Module
 """
 
-from app.utils.text_utils import clean_text, normalize_whitespace, preprocess_medical_text
+from app.utils.text_utils import (
+    clean_text,
+    normalize_whitespace,
+    preprocess_medical_text,
+    normalize_term,
+    dedupe_terms
+)
 from app.utils.compression import compress_vector_db_response, compress_icd_vector_db_response
 from app.utils.exceptions import (
     MedicalCodingException,
@@ -10,15 +16,19 @@ from app.utils.exceptions import (
     EntityExtractionError,
     CodingAgentError,
     VectorSearchError,
-    EvaluationError
+    EvaluationError,
+    JobQueueFullError,
+    AdmissionRejectedError
 )
 
 __all__ = [
     # Text utils
     "clean_text", "normalize_whitespace", "preprocess_medical_text",
+    "normalize_term", "dedupe_terms",
     # Compression
     "compress_vector_db_response", "compress_icd_vector_db_response",
     # Exceptions
     "MedicalCodingException", "PDFExtractionError", "EntityExtractionError",
-    "CodingAgentError", "VectorSearchError", "EvaluationError"
+    "CodingAgentError", "VectorSearchError", "EvaluationError",
+    "JobQueueFullError", "AdmissionRejectedError"
 ]
@@ -6,6 +6,22 @@ Compress vector database responses for efficient token usage
 from typing import Dict, Any, List
 
 
+def match_scores(match) -> Dict[str, float]:
+    """
+    Score fields shown to the agent for one match.
+
+    Dense matches carry their cosine ``score``. Fused hybrid matches carry a
+    labelled ``rrf_score`` (a rank score, not a similarity) plus the dense
+    ``cosine`` when the code was also a dense match.
+    """
+    if isinstance(match, dict) and match.get("score_type") == "rrf":
+        scores = {"rrf_score": round(match["score"], 4)}
+        if match.get("cosine") is not None:
+            scores["cosine"] = round(match["cosine"], 4)
+        return scores
+    return {"score": round(match["score"], 4)}
+
+
 def compress_vector_db_response(resp) -> Dict[str, Any]:
     """
     Compress generic vector database response.
@@ -21,7 +37,7 @@ def compress_vector_db_response(resp) -> Dict[str, Any]:
             {
                 "id": m["id"],
                 "desc": m["metadata"].get("description", ""),
-                "score": round(m["score"], 4)
+                **match_scores(m)
             }
             for m in resp.matches
         ]
@@ -45,7 +61,7 @@ def compress_icd_vector_db_response(resp) -> Dict[str, Any]:
                 "id": m["id"],
                 "category": m["metadata"].get("category", ""),
                 "disease": m["metadata"].get("disease", ""),
-                "score": round(m["score"], 4)
+                **match_scores(m)
             }
             for m in resp.matches
         ]
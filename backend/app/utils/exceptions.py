@@ -40,6 +40,40 @@ class EvaluationError(MedicalCodingException):
     pass
 
 
+class LLMRateLimitError(MedicalCodingException):
+    """LLM call would exceed the configured provider rate limit"""
+    pass
+
+
+class HedgeCancelledError(MedicalCodingException):
+    """Hedged stage attempt stopped because the other attempt won"""
+    pass
+
+
+class RequestCancelledError(MedicalCodingException):
+    """Pipeline run stopped because its client disconnected"""
+    pass
+
+
+class ReplayMissError(MedicalCodingException):
+    """Replay fixture has no recorded exchange for a request"""
+    pass
+
+
+class JobQueueFullError(MedicalCodingException):
+    """Job queue has reached its capacity"""
+    pass
+
+
+class AdmissionRejectedError(MedicalCodingException):
+    """Pipeline request rejected by admission control"""
+    
+    def __init__(self, message: str, status_code: int = 503, retry_after: int = 1):
+        self.status_code = status_code
+        self.retry_after = retry_after
+        super().__init__(message, {"retry_after": retry_after})
+
+
 # HTTP Exception helpers
 def raise_bad_request(message: str):
     """Raise 400 Bad Request"""
@@ -4,6 +4,7 @@ Text normalization and regex cleaning
 """
 
 import re
+from typing import Dict, List
 
 
 def clean_text(text: str) -> str:
@@ -51,3 +52,34 @@ def preprocess_medical_text(text: str) -> str:
     text = clean_text(text)
     text = normalize_whitespace(text)
     return text
+
+
+def normalize_term(term: str) -> str:
+    """
+    Normalize a clinical search term for embedding and deduplication.
+    
+    Args:
+        term: Raw term extracted by an agent
+        
+    Returns:
+        Lower-cased term with collapsed whitespace
+    """
+    return re.sub(r'\s+', ' ', term).strip().lower()
+
+
+def dedupe_terms(terms: List[str]) -> Dict[str, str]:
+    """
+    Normalize and deduplicate search terms, preserving first-seen order.
+    
+    Args:
+        terms: Raw terms extracted by an agent
+        
+    Returns:
+        Ordered mapping of normalized term to its first original spelling
+    """
+    unique: Dict[str, str] = {}
+    for term in terms:
+        normalized = normalize_term(term)
+        if normalized and normalized not in unique:
+            unique[normalized] = term.strip()
+    return unique
@@ -0,0 +1,31 @@
+"""
+Gunicorn Configuration
+Multi-worker deployment with the embedding model shared across workers
+
+Usage:
+    gunicorn -c gunicorn.conf.py app.main:app
+"""
+
+import os
+from app.core.config import settings
+
+bind = f"{settings.HOST}:{settings.PORT}"
+workers = settings.SERVER_WORKERS or os.cpu_count() or 1
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = settings.SERVER_TIMEOUT
+graceful_timeout = 30
+
+# Import the app in the master so preloaded state is inherited by each fork
+preload_app = settings.SERVER_PRELOAD
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported and before workers fork
+    if preload_app:
+        from app.core.prefork import preload
+        preload()
+
+
+def post_fork(server, worker):
+    from app.core.prefork import after_fork
+    after_fork(workers)
@@ -1,2 +1,124 @@
 # Test Configuration
-# TODO: Pytest fixtures and configuration
+# Shared fixtures and helpers: the offline record/replay harness, a private
+# completion cache and an embedding manager without a real model
+
+import json
+import pytest
+
+NOTE = "Patient with type 2 diabetes mellitus presents for follow-up."
+
+ENTITY_MESSAGES = [
+    {"role": "system", "content": "You are a clinical entity extractor."},
+    {"role": "user", "content": NOTE},
+]
+
+
+@pytest.fixture
+def fixture_path(tmp_path):
+    """A small replay fixture: one LLM exchange, one index query, one judge verdict"""
+    from app.core.replay import ReplayEmbedder, ReplayHarness, exchange_key
+
+    vector = ReplayEmbedder(8).encode(["type 2 diabetes mellitus"])[0]
+    records = [
+        {
+            "kind": "llm",
+            "key": exchange_key("groq/llama-3.3-70b-versatile", ENTITY_MESSAGES),
+            "model": "groq/llama-3.3-70b-versatile",
+            "messages": ENTITY_MESSAGES,
+            "response": '{"diagnoses": ["type 2 diabetes mellitus"]}',
+            "latency_ms": 120.0,
+        },
+        {
+            "kind": "query",
+            "index": "icd10",
+            "text": "type 2 diabetes mellitus",
+            "top_k": 5,
+            "dimension": len(vector),
+            "matches": [{"id": "E11.9", "score": 0.91, "metadata": {"code": "E11.9"}}],
+            "latency_ms": 40.0,
+        },
+        {
+            "kind": "judge",
+            "key": ReplayHarness._judge_key("gemini/gemini-2.5-flash", ["system", NOTE, "codes"]),
+            "model": "gemini/gemini-2.5-flash",
+            "response": {"overall_score": 9},
+            "latency_ms": 300.0,
+        },
+    ]
+
+    path = tmp_path / "replay.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in records) + "\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def harness(fixture_path, monkeypatch):
+    """A replaying harness on ``fixture_path``, installed as the global one"""
+    from app.core import replay as replay_module
+    from app.core import replay_server
+
+    harness = replay_module.ReplayHarness()
+    harness.mode = "replay"
+    harness.path = str(fixture_path)
+    monkeypatch.setattr(replay_module, "replay", harness)
+    monkeypatch.setattr(replay_server, "replay", harness)
+    return harness
+
+
+@pytest.fixture
+def offline_observability(monkeypatch):
+    """Langfuse replaced by the no-op client used for offline replays"""
+    from app.core.observability import NoOpLangfuse, observability
+
+    monkeypatch.setattr(observability, "langfuse", NoOpLangfuse(), raising=False)
+    monkeypatch.setattr(observability, "_initialized", True)
+    return observability
+
+
+@pytest.fixture
+def completion_cache(tmp_path, monkeypatch):
+    """An enabled completion cache in ``tmp_path`` for icd_codes and the judge, installed as the global one"""
+    from app.core import completion_cache as cache_module
+    from app.core.config import settings
+
+    cache = cache_module.CompletionCache(path=str(tmp_path / "completions.sqlite3"), max_mb=1)
+    cache.stages = {"icd_codes", "judge"}
+    monkeypatch.setattr(cache_module, "completion_cache", cache)
+    monkeypatch.setattr(settings, "COMPLETION_CACHE_ENABLED", True)
+    return cache
+
+
+class CountingEmbedder:
+    """Deterministic embedder recording the batches it was asked to encode"""
+
+    def __init__(self, dimension: int):
+        from app.core.replay import ReplayEmbedder
+
+        self.model = ReplayEmbedder(dimension)
+        self.batches = []
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        self.batches.append(list(texts))
+        return self.model.encode(texts)
+
+
+def embedding_manager(model=None, dimension=8, **attributes):
+    """VectorDBManager around ``model`` without loading a real model or index"""
+    import threading
+    from app.core.vector_db import VectorDBManager
+
+    manager = object.__new__(VectorDBManager)
+    manager.__dict__.update({
+        "_initialized": True,
+        "embedding_model": model,
+        "embedding_client": None,
+        "embedding_batcher": None,
+        "embedding_cache": None,
+        "model_id": "test-model",
+        "dimension": dimension,
+        "_stores": {},
+        "_stores_lock": threading.Lock(),
+        "_lexical": {},
+    })
+    manager.__dict__.update(attributes)
+    return manager
@@ -1,2 +1,163 @@
 # API Endpoint Tests
-# TODO: Test medical coding API endpoints
+# Streaming disconnects, admission control and the asynchronous job endpoints
+
+import time
+import asyncio
+import threading
+from app.core.cancellation import raise_if_request_cancelled
+from app.models.responses import PipelineResponse
+
+
+class _DisconnectingRequest:
+    """Starlette request stand-in reporting a disconnect after ``after`` checks"""
+
+    def __init__(self, after: int = 0):
+        self.after = after
+        self.checks = 0
+
+    async def is_disconnected(self) -> bool:
+        self.checks += 1
+        return self.checks > self.after
+
+
+def test_stream_cancels_pipeline_when_client_disconnects(monkeypatch):
+    from app.api.v1.endpoints import coding
+
+    monkeypatch.setattr(coding, "SSE_DISCONNECT_POLL_SECONDS", 0.05)
+    started = threading.Event()
+    stopped = threading.Event()
+    llm_calls = []
+
+    def slow_pipeline(progress_callback=None, **kwargs) -> PipelineResponse:
+        started.set()
+        progress_callback("entities", "running", None)
+        try:
+            # Each iteration stands in for one LLM call of a stage
+            for _ in range(200):
+                raise_if_request_cancelled()
+                llm_calls.append(1)
+                time.sleep(0.01)
+        finally:
+            stopped.set()
+        return PipelineResponse(success=True)
+
+    async def consume():
+        response = await coding.stream_pipeline(_DisconnectingRequest(after=1), slow_pipeline)
+        return [chunk async for chunk in response.body_iterator]
+
+    chunks = asyncio.run(consume())
+    assert started.is_set()
+    assert any("entities" in chunk for chunk in chunks)
+    assert not any("event: result" in chunk for chunk in chunks)
+    assert stopped.wait(2.0)
+    assert len(llm_calls) < 200
+
+
+def _client(router, prefix: str):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+    app.include_router(router, prefix=prefix)
+    return TestClient(app)
+
+
+def _wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+class _GatedPipeline:
+    """Pipeline stand-in whose text runs finish when ``gate`` is set"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+
+    def get_stages(self, include_evaluation):
+        return ["entities"]
+
+    def process_text(self, medical_report_text, include_evaluation, bypass_cache, progress_callback=None):
+        progress_callback = progress_callback or (lambda stage, status: None)
+        progress_callback("entities", "running")
+        self.gate.wait(5)
+        progress_callback("entities", "completed")
+        return PipelineResponse(success=True)
+
+
+def test_jobs_share_pipeline_slots_and_report_a_full_queue(monkeypatch):
+    from app.api.v1.endpoints import jobs
+    from app.services.admission_control import AdmissionController
+    from app.services.job_service import InProcessJobQueue, JobService
+
+    admission = AdmissionController(max_concurrency=1, max_queue=4, queue_timeout=5, retry_after=3)
+    pipeline = _GatedPipeline()
+    service = JobService(job_queue=InProcessJobQueue(maxsize=1), pipeline=pipeline,
+                         max_workers=1, admission=admission)
+    monkeypatch.setattr(jobs, "job_service", service)
+    client = _client(jobs.router, "/jobs")
+
+    # A synchronous request holds the only pipeline slot
+    release = threading.Event()
+    holder = threading.Thread(target=admission.run_blocking, args=(release.wait, 5))
+    holder.start()
+    try:
+        submitted = client.post("/jobs", json={"medical_report_text": "Type 2 diabetes."})
+        assert submitted.status_code == 202
+        job_id = submitted.json()["job_id"]
+        _wait_for(lambda: client.get(f"/jobs/{job_id}").json()["status"] == "running")
+        assert client.get(f"/jobs/{job_id}").json()["stages"] == {"entities": "pending"}
+
+        assert client.post("/jobs", json={"medical_report_text": "Essential hypertension."}).status_code == 202
+        full = client.post("/jobs", json={"medical_report_text": "Asthma, mild intermittent."})
+        assert full.status_code == 503
+        assert full.headers["Retry-After"] == str(jobs.settings.PIPELINE_RETRY_AFTER_SECONDS)
+
+        release.set()
+        pipeline.gate.set()
+        _wait_for(lambda: client.get(f"/jobs/{job_id}").json()["status"] == "completed")
+        body = client.get(f"/jobs/{job_id}").json()
+        assert body["stages"] == {"entities": "completed"} and body["result"]["success"] is True
+        assert client.get("/jobs/unknown").status_code == 404
+    finally:
+        release.set()
+        pipeline.gate.set()
+        holder.join(5)
+        service.shutdown()
+        admission.shutdown()
+
+
+def test_process_endpoints_reject_with_retry_after_when_saturated(monkeypatch):
+    from app.api.v1.endpoints import coding
+    from app.services.admission_control import AdmissionController
+
+    admission = AdmissionController(max_concurrency=1, max_queue=0, queue_timeout=5, retry_after=7)
+    pipeline = _GatedPipeline()
+    monkeypatch.setattr(coding, "admission_controller", admission)
+    monkeypatch.setattr(coding, "get_shared_pipeline_service", lambda: pipeline)
+    client = _client(coding.router, "/coding")
+    report = {"medical_report_text": "Essential hypertension."}
+
+    # A job run holds the only pipeline slot and nothing may queue behind it
+    release = threading.Event()
+    holder = threading.Thread(target=admission.run_blocking, args=(release.wait, 5))
+    holder.start()
+    try:
+        _wait_for(lambda: admission.stats()["in_flight"] == 1)
+        for path in ("/coding/process", "/coding/process/stream"):
+            rejected = client.post(path, json=report)
+            assert rejected.status_code == 429
+            assert rejected.headers["Retry-After"] == "7"
+        assert admission.stats()["rejected"] == 2
+
+        release.set()
+        holder.join(5)
+        pipeline.gate.set()
+        admitted = client.post("/coding/process", json=report)
+        assert admitted.status_code == 200 and admitted.json()["success"] is True
+    finally:
+        release.set()
+        pipeline.gate.set()
+        holder.join(5)
+        admission.shutdown()
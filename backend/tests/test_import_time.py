@@ -0,0 +1,66 @@
+# Import-Time Budget Tests
+# Importing the API must stay cheap: heavy SDKs load on first use or during
+# warmup, never at import time.
+
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Seconds allowed for a cold ``import app.main`` (override for slow CI runners)
+IMPORT_TIME_BUDGET = float(os.environ.get("IMPORT_TIME_BUDGET_SECONDS", "2.0"))
+
+# Modules that must only be imported lazily
+HEAVY_MODULES = (
+    "crewai",
+    "litellm",
+    "langfuse",
+    "openlit",
+    "langchain_core",
+    "langchain_google_genai",
+    "sentence_transformers",
+    "torch",
+    "onnxruntime",
+    "pinecone",
+    "fitz",
+    "pytesseract",
+    "PIL",
+    "toon_format",
+)
+
+_PROBE = """
+import sys, json, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def _import_app():
+    """Import app.main in a fresh interpreter and report time and heavy modules"""
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_import_does_not_load_heavy_modules():
+    result = _import_app()
+    assert result["heavy"] == [], f"imported at module load: {result['heavy']}"
+
+
+def test_import_time_within_budget():
+    # Best of three to keep a cold disk cache from failing the check
+    seconds = min(_import_app()["seconds"] for _ in range(3))
+    assert seconds <= IMPORT_TIME_BUDGET, (
+        f"import app.main took {seconds:.2f}s (budget {IMPORT_TIME_BUDGET:.2f}s)"
+    )
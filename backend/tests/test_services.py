@@ -1,2 +1,1023 @@
 # Service Layer Tests
-# TODO: Test coding pipeline service
+# Offline record/replay harness: exchange keys, fixture lookups, injected
+# latency, the fake OpenAI endpoint and the fake index
+
+import time
+import httpx
+import pytest
+from app.core.config import settings
+from app.utils.exceptions import ReplayMissError
+from tests.conftest import ENTITY_MESSAGES, NOTE, CountingEmbedder, embedding_manager
+
+
+def test_exchange_key_ignores_provider_formatting():
+    from app.core.replay import exchange_key
+
+    as_parts = [
+        {"role": m["role"], "content": [{"type": "text", "text": m["content"] + "  "}]}
+        for m in ENTITY_MESSAGES
+    ]
+    assert exchange_key("m", ENTITY_MESSAGES) == exchange_key("m", as_parts)
+    assert exchange_key("m", ENTITY_MESSAGES) != exchange_key("other", ENTITY_MESSAGES)
+    assert exchange_key("m", "hello") == exchange_key("m", [{"role": "user", "content": "hello"}])
+
+
+def test_replay_serves_llm_exchange_and_reports_miss(harness):
+    response = harness.llm_response("groq/llama-3.3-70b-versatile", ENTITY_MESSAGES)
+    assert "diabetes" in response
+
+    with pytest.raises(ReplayMissError):
+        harness.llm_response("groq/llama-3.3-70b-versatile", [{"role": "user", "content": "unseen"}])
+    assert harness.stats()["served"] == 1
+    assert harness.stats()["misses"] == 1
+
+
+def test_replay_serves_judge_verdict(harness):
+    verdict = harness.judge_response("gemini/gemini-2.5-flash", ["system", NOTE, "codes"])
+    assert verdict == {"overall_score": 9}
+
+
+def test_injected_latency(harness, monkeypatch):
+    monkeypatch.setattr(settings, "REPLAY_LLM_LATENCY_MS", 50.0)
+    started = time.perf_counter()
+    harness.llm_response("groq/llama-3.3-70b-versatile", ENTITY_MESSAGES)
+    assert time.perf_counter() - started >= 0.05
+
+    # -1 replays the recorded latency (120 ms)
+    monkeypatch.setattr(settings, "REPLAY_LLM_LATENCY_MS", -1.0)
+    started = time.perf_counter()
+    harness.llm_response("groq/llama-3.3-70b-versatile", ENTITY_MESSAGES)
+    assert time.perf_counter() - started >= 0.12
+
+
+def test_fake_openai_endpoint(harness):
+    from app.core.replay_server import ReplayLLMServer
+
+    server = ReplayLLMServer()
+    base_url = server.start()
+    try:
+        ok = httpx.post(f"{base_url}/chat/completions", json={
+            "model": "groq/llama-3.3-70b-versatile",
+            "messages": ENTITY_MESSAGES,
+        })
+        assert ok.status_code == 200
+        body = ok.json()
+        assert body["object"] == "chat.completion"
+        assert "diabetes" in body["choices"][0]["message"]["content"]
+        assert body["usage"]["total_tokens"] > 0
+
+        miss = httpx.post(f"{base_url}/chat/completions", json={"model": "x", "messages": []})
+        assert miss.status_code == 404
+        assert miss.json()["error"]["type"] == "replay_miss"
+    finally:
+        server.stop()
+
+
+def test_fake_index_answers_recorded_query(harness):
+    from app.core.replay import ReplayEmbedder, ReplayVectorStore
+
+    embedder = ReplayEmbedder(8)
+    vectors = embedder.encode(["type 2 diabetes mellitus"]).tolist()
+    harness.register_vectors(["type 2 diabetes mellitus"], vectors)
+
+    store = ReplayVectorStore("icd10", "replay")
+    result = store.query(vector=vectors[0], top_k=5)
+    assert result.matches[0]["id"] == "E11.9"
+    assert store.describe()["dimension"] == 8
+
+    with pytest.raises(ReplayMissError):
+        store.query(vector=embedder.encode(["unrecorded term"])[0].tolist(), top_k=5)
+
+
+# Shared embedding server (user-013)
+
+def test_embedding_server_requires_authkey(monkeypatch):
+    from app.core.embedding_server import server_authkey
+
+    monkeypatch.setattr(settings, "EMBEDDING_SERVER_AUTHKEY", "")
+    with pytest.raises(ValueError):
+        server_authkey()
+    monkeypatch.setattr(settings, "EMBEDDING_SERVER_AUTHKEY", "test-secret")
+    assert server_authkey() == b"test-secret"
+
+
+def test_embedding_server_round_trip_over_private_socket(tmp_path, monkeypatch):
+    import os
+    import stat
+    import threading
+    from app.core import embedding_server
+    from app.core.replay import ReplayEmbedder
+
+    monkeypatch.setattr(settings, "EMBEDDING_SERVER_AUTHKEY", "test-secret")
+    monkeypatch.setattr(embedding_server, "load_embedding_model", lambda: ReplayEmbedder(8))
+    address = str(tmp_path / "embeddings.sock")
+    server = embedding_server.EmbeddingServer(address)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    for _ in range(100):
+        if os.path.exists(address):
+            break
+        time.sleep(0.02)
+
+    assert stat.S_IMODE(os.stat(address).st_mode) == 0o600
+    client = embedding_server.EmbeddingClient(address)
+    rows = client.encode(["hypertension", "asthma"])
+    assert rows.shape == (2, 8) and rows.dtype.name == "float32"
+    expected = embedding_server.truncate_embeddings(ReplayEmbedder(8).encode(["hypertension"]), 8)
+    assert (rows[0] == expected[0]).all()
+    assert client.info()["dimension"] == 8
+    with pytest.raises(RuntimeError):
+        client._call("shutdown")
+    client.close()
+
+
+# Pipeline result cache (user-017)
+
+class _FakeCrew:
+    """Crew returning a fixed ICD result and counting its runs"""
+
+    def __init__(self):
+        self.runs = 0
+
+    def kickoff(self, text, on_stage_start=None, on_stage_complete=None):
+        from types import SimpleNamespace
+        from app.models.icd_models import ICDCodingOutput
+
+        self.runs += 1
+        output = SimpleNamespace(pydantic=ICDCodingOutput(icd_codes=[]))
+        return SimpleNamespace(
+            stage_outputs={"icd_codes": output},
+            stage_attempts={},
+            token_usage={"total_tokens": 42},
+        )
+
+
+def _fixed_index_versions(monkeypatch, version="1"):
+    from app.core import result_cache
+    from app.core.vector_db import vector_db
+
+    monkeypatch.setattr(result_cache, "_fingerprint", None)
+    monkeypatch.setattr(vector_db, "index_namespace", lambda code_system: f"{code_system.lower()}@{version}")
+
+
+def test_result_cache_hit_is_judged_afresh(offline_observability, monkeypatch):
+    import sys
+    from app.core.result_cache import ResultCache
+    from app.models.judge_models import MedicalCodingJudgeOutput
+    from app.services.evaluation_service import EvaluationService
+
+    pipeline = sys.modules["app.services.coding_pipeline"]
+    evaluations = EvaluationService(max_workers=1, sample_rate=0.0)
+    monkeypatch.setattr(pipeline, "result_cache", ResultCache(db_path=""))
+    monkeypatch.setattr(pipeline, "evaluation_service", evaluations)
+    monkeypatch.setattr(settings, "RESULT_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "SINGLE_FLIGHT_ENABLED", False)
+    monkeypatch.setattr(settings, "EVALUATION_MODE", "sync")
+    _fixed_index_versions(monkeypatch)
+
+    service = pipeline.CodingPipelineService()
+    service._crew = _FakeCrew()
+    judged = []
+    verdict = MedicalCodingJudgeOutput.model_construct()
+    monkeypatch.setattr(service, "_evaluate", lambda text, data, trace_id, ts: judged.append(trace_id) or verdict)
+
+    first = service.process_text(NOTE)
+    assert first.cache_status == "miss" and first.evaluation_status == "skipped"
+
+    # Sampled on the hit: the cached "skipped" status must not stick
+    evaluations.sample_rate = 1.0
+    second = service.process_text(NOTE)
+    assert service._crew.runs == 1
+    assert second.cache_status == "hit"
+    assert second.evaluation_status == "completed"
+    assert judged == [second.trace_id] and second.trace_id != first.trace_id
+    assert first.token_usage == {"total_tokens": 42}
+    assert second.token_usage is None and second.stage_attempts is None
+
+    # Without evaluation the same cache entry is served
+    third = service.process_text(NOTE, include_evaluation=False)
+    assert third.cache_status == "hit" and third.evaluation_status is None
+
+
+def test_result_cache_key_follows_active_index_version(monkeypatch):
+    from app.core.result_cache import result_cache_key
+
+    _fixed_index_versions(monkeypatch, "20250101")
+    before = result_cache_key(NOTE)
+    # A rebuilt local index carries a new manifest version
+    _fixed_index_versions(monkeypatch, "20250202")
+    assert result_cache_key(NOTE) != before
+
+
+# Stage retries and failover (user-022)
+
+class _ProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_retry_policy_backs_off_then_fails_over():
+    from app.core.llm_retry import StageRetryPolicy
+
+    policy = StageRetryPolicy(attempts=2, base_seconds=0.0, max_seconds=0.0)
+    calls = []
+
+    def run(llm):
+        calls.append(llm)
+        if llm == "primary":
+            raise _ProviderError(503)
+        return "codes"
+
+    result, records = policy.run("icd_codes", [("groq/a", "primary"), ("gemini/b", "fallback")], run)
+    assert result == "codes"
+    assert calls == ["primary", "primary", "fallback"]
+    assert [(r["model"], r["status"]) for r in records] == [
+        ("groq/a", "failed"), ("groq/a", "failed"), ("gemini/b", "succeeded")
+    ]
+    assert policy.stats()["retries"] == 1 and policy.stats()["failovers"] == 1
+
+
+def test_retry_policy_fails_fast_on_permanent_errors():
+    from app.core.llm_retry import StageRetryPolicy, is_transient
+    from app.utils.exceptions import CodingAgentError, LLMRateLimitError
+
+    assert is_transient(LLMRateLimitError("wait too long"))
+    assert not is_transient(ValueError("output does not match the schema"))
+    wrapped = RuntimeError("task failed")
+    wrapped.__cause__ = _ProviderError(429)
+    assert is_transient(wrapped)
+
+    policy = StageRetryPolicy(attempts=3, base_seconds=0.0, max_seconds=0.0)
+    calls = []
+
+    def run(llm):
+        calls.append(llm)
+        raise _ProviderError(400)
+
+    with pytest.raises(CodingAgentError):
+        policy.run("cpt_codes", [("groq/a", "primary"), ("gemini/b", "fallback")], run)
+    assert calls == ["primary"]
+
+
+# LLM rate limits and call hooks (user-021)
+
+def test_limiter_provider_budget_is_shared_and_bounded():
+    from app.core.rate_limiter import LLMRateLimiter
+    from app.utils.exceptions import LLMRateLimitError
+
+    limiter = LLMRateLimiter("groq=2:0,groq/special=60:0", max_wait=0.1)
+    assert limiter.limiter_for("groq/a") is limiter.limiter_for("groq/b")
+    assert limiter.limiter_for("groq/special").key == "groq/special"
+    assert limiter.limiter_for("gemini/x").rpm == 0
+
+    shared = limiter.limiter_for("groq/a")
+    assert shared.acquire(10, max_wait=0.1) == 0.0
+    assert shared.acquire(10, max_wait=0.1) == 0.0
+    # Bucket empty: the next request needs ~30s, far beyond max_wait
+    with pytest.raises(LLMRateLimitError):
+        shared.acquire(10, max_wait=0.1)
+    assert shared.stats()["timeouts"] == 1
+
+
+def test_limiter_settles_token_estimate(monkeypatch):
+    from app.core.rate_limiter import LLMRateLimiter
+
+    monkeypatch.setattr(settings, "LLM_RATE_LIMIT_ENABLED", True)
+    limiter = LLMRateLimiter("gemini=0:10000", max_wait=0.1)
+    with limiter.limit("gemini/flash", "x" * 400, max_tokens=1000) as usage:
+        usage.completion = "y" * 40
+    bucket = limiter.limiter_for("gemini/flash").tokens
+    # Reserved 101 + 1000 tokens, settled to the measured 101 + 11
+    assert 9888 <= bucket.level < 9900
+
+
+def test_llm_hooks_run_in_order_and_short_circuit():
+    from contextlib import contextmanager
+    from app.core.llm_hooks import LLMCall, LLMHook, run_llm_call
+
+    events = []
+
+    class Recorder(LLMHook):
+        def __init__(self, name, answer=None):
+            self.name, self.answer = name, answer
+
+        def before(self, call):
+            events.append(f"{self.name}.before")
+            return self.answer
+
+        @contextmanager
+        def around(self, call):
+            events.append(f"{self.name}.enter")
+            yield
+            events.append(f"{self.name}.exit")
+
+        def after(self, call):
+            events.append(f"{self.name}.after:{call.completion}")
+
+    call = LLMCall("groq/a", [{"role": "user", "content": "hi"}])
+    result = run_llm_call([Recorder("a"), Recorder("b")], call, lambda: events.append("send") or "done")
+    assert result == "done"
+    assert events == ["a.before", "b.before", "a.enter", "b.enter", "send",
+                      "b.exit", "a.exit", "a.after:done", "b.after:done"]
+
+    events.clear()
+    result = run_llm_call([Recorder("cache", answer="cached"), Recorder("b")], call, lambda: "sent")
+    assert result == "cached" and events == ["cache.before"]
+
+
+def test_completion_cache_hook_answers_repeated_call(completion_cache):
+    from app.core.completion_cache import completion_cache_hook
+    from app.core.llm_hooks import LLMCall, run_llm_call
+
+    sent = []
+    hooks = [completion_cache_hook]
+    for _ in range(2):
+        call = LLMCall("groq/a", ENTITY_MESSAGES, tools=None, temperature=0.0, stage="icd_codes")
+        assert run_llm_call(hooks, call, lambda: sent.append(1) or "E11.9") == "E11.9"
+    assert len(sent) == 1 and completion_cache.hits == 1
+
+    # Calls outside a cached stage always reach the provider
+    run_llm_call(hooks, LLMCall("groq/a", ENTITY_MESSAGES, stage="cpt_codes"), lambda: sent.append(1) or "x")
+    assert len(sent) == 2
+
+
+def test_completion_cache_skips_tool_exchanges(completion_cache):
+    from app.core.completion_cache import completion_cache_hook
+    from app.core.llm_hooks import LLMCall, run_llm_call
+
+    tools = [{"type": "function", "function": {"name": "icd_search", "parameters": {}}}]
+    tool_turns = ENTITY_MESSAGES + [
+        {"role": "assistant", "content": None, "tool_calls": [{"id": "1", "function": {"name": "icd_search"}}]},
+        {"role": "tool", "tool_call_id": "1", "content": "E11.9 Type 2 diabetes mellitus"},
+    ]
+    sent = []
+    for _ in range(2):
+        # The tool's output comes back as a plain string
+        for call in (LLMCall("groq/a", ENTITY_MESSAGES, tools=tools, stage="icd_codes"),
+                     LLMCall("groq/a", tool_turns, stage="icd_codes")):
+            assert run_llm_call([completion_cache_hook], call,
+                                lambda: sent.append(1) or "E11.9 Type 2 diabetes mellitus")
+    assert len(sent) == 4
+    assert completion_cache.hits == 0 and completion_cache.misses == 0
+
+
+def test_judge_runs_through_the_shared_llm_hooks(completion_cache, monkeypatch):
+    pytest.importorskip("toon_format")
+    from app.core import rate_limiter
+    from app.models.judge_models import MedicalCodingJudgeOutput
+    from app.services.judge_service import JUDGE_PROVIDER_MODEL, JudgeService
+
+    limiter = rate_limiter.LLMRateLimiter()
+    monkeypatch.setattr(rate_limiter, "llm_rate_limiter", limiter)
+    monkeypatch.setattr(settings, "LLM_RATE_LIMIT_ENABLED", True)
+
+    class Chain:
+        invocations = 0
+
+        def invoke(self, inputs):
+            Chain.invocations += 1
+            return MedicalCodingJudgeOutput(
+                overall_verdict="pass", overall_score=0.9, section_judgements=[], code_judgements=[],
+                compliance_risk="low", summary="Every code is documented in the clinical note."
+            )
+
+    judge = JudgeService()
+    judge._chain, judge._initialized = Chain(), True
+    for _ in range(2):
+        verdict = judge.evaluate(NOTE, {"icd_codes": ["E11.9"]})
+        assert verdict.overall_score == 0.9
+    assert Chain.invocations == 1 and completion_cache.hits == 1
+    assert limiter.limiter_for(JUDGE_PROVIDER_MODEL).calls == 1
+
+
+# Concurrent initialization (user-014)
+
+def test_llm_models_initialize_once_across_threads(monkeypatch):
+    import threading
+    import app.core.llm_config as llm_config
+
+    built = []
+
+    def slow_factory(name):
+        def build():
+            time.sleep(0.02)
+            built.append(name)
+            return name
+        return build
+
+    for name in ("get_gemini_flash", "get_kimi_k2", "get_llama_3_3_70b", "get_xiaomi_mimo"):
+        monkeypatch.setattr(llm_config, name, slow_factory(name))
+    monkeypatch.setattr(llm_config, "setup_llm_environment", lambda: None)
+    models = llm_config.llm_models
+    monkeypatch.setattr(models, "_initialized", False)
+
+    threads = [threading.Thread(target=models.initialize) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(built) == sorted(["get_gemini_flash", "get_kimi_k2", "get_llama_3_3_70b", "get_xiaomi_mimo"])
+    assert [model for model, _ in models.get_stage_llms("icd_codes", fallbacks=True)][0] == llm_config.KIMI_K2_MODEL
+
+
+def test_warmup_ready_despite_failing_optional_component(monkeypatch):
+    from app.services.warmup_service import WarmupService
+
+    monkeypatch.setattr(settings, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(settings, "WARMUP_COMPONENTS", "")
+    monkeypatch.setattr(settings, "WARMUP_RETRY_SECONDS", 0.01)
+    flaky = []
+
+    def model():
+        flaky.append(1)
+        if len(flaky) < 2:
+            raise ConnectionError("hub unreachable")
+
+    def judge():
+        raise RuntimeError("judge LLM misconfigured")
+
+    service = WarmupService(
+        components={"model": ((), model), "index": (("model",), lambda: None), "judge": ((), judge)},
+        optional=frozenset({"judge"})
+    )
+    service.start()
+    assert service.wait(5)
+    status = service.status()
+    assert status["ready"] and status["status"] == "degraded" and status["attempts"] == 2
+    assert status["degraded"] == ["judge"]
+    assert status["components"]["index"]["status"] == "ok"
+    assert "misconfigured" in status["components"]["judge"]["error"]
+
+
+# Hybrid retrieval and the retrieval cache (user-010)
+
+def _lexical_index():
+    from app.core.lexical_index import LexicalIndex
+
+    rows = [
+        ("E11.9", "type 2 diabetes mellitus without complications"),
+        ("E10.9", "type 1 diabetes mellitus without complications"),
+        ("I10", "essential primary hypertension"),
+    ]
+    return LexicalIndex(
+        [code for code, _ in rows],
+        [text for _, text in rows],
+        [{"description": text} for _, text in rows],
+    )
+
+
+def test_bm25_ranks_and_exact_matches():
+    index = _lexical_index()
+    assert index.search("type 2 diabetes", top_k=2)[0]["id"] == "E11.9"
+    assert index.exact_match("Essential (primary) hypertension")["id"] == "I10"
+    assert index.exact_match("i10")["id"] == "I10"
+    assert index.exact_match("diabetes mellitus") is None
+
+
+def test_rrf_labels_fused_scores_and_keeps_cosine():
+    from app.core.lexical_index import reciprocal_rank_fusion
+    from app.utils.compression import compress_vector_db_response
+
+    dense = [{"id": "E11.9", "score": 0.83, "metadata": {"description": "T2DM"}},
+             {"id": "E10.9", "score": 0.71, "metadata": {"description": "T1DM"}}]
+    lexical = _lexical_index().search("type 2 diabetes", top_k=3)
+    fused = reciprocal_rank_fusion([dense, lexical], top_k=3, k=60, dense=0)
+
+    top = fused.matches[0]
+    assert top["id"] == "E11.9" and top["score"] == pytest.approx(1.0)
+    shown = compress_vector_db_response(fused)["matches"]
+    assert shown[0]["rrf_score"] == 1.0 and shown[0]["cosine"] == 0.83
+    assert "score" not in shown[0]
+    # Dense-only responses keep the plain cosine score
+    from app.core.vector_store import QueryResult
+    assert compress_vector_db_response(QueryResult(dense))["matches"][0] == {
+        "id": "E11.9", "desc": "T2DM", "score": 0.83
+    }
+
+
+def test_retrieval_cache_separates_retrieval_modes(monkeypatch):
+    from app.core.retrieval_cache import RetrievalCache
+    from app.tools.vector_search import retrieval_mode
+
+    cache = RetrievalCache(max_entries=10, ttl_seconds=60)
+    hybrid = f"icd10@v1|{retrieval_mode(True)}"
+    cache.put(hybrid, "diabetes", 5, "fused")
+    assert cache.get(f"icd10@v1|{retrieval_mode(False)}", "diabetes", 5) is None
+    monkeypatch.setattr(settings, "LEXICAL_RRF_K", 10)
+    assert cache.get(f"icd10@v1|{retrieval_mode(True)}", "diabetes", 5) is None
+    assert cache.get(hybrid, "diabetes", 5) == "fused"
+    assert cache.invalidate("icd10") == 1
+
+
+# Embedding cache (user-006)
+
+def test_embedding_cache_tiers_return_identical_vectors(tmp_path):
+    import numpy as np
+    from app.core.embedding_cache import EmbeddingCache
+
+    vector = np.random.default_rng(0).standard_normal(16).astype(np.float32)
+    cache = EmbeddingCache("model", 16, memory_bytes=1 << 20, disk_dir=str(tmp_path))
+    (_, fresh), = cache.put_many([("diabetes", vector)])
+    memory = cache.get_many(["diabetes"])[0]["diabetes"]
+
+    reopened = EmbeddingCache("model", 16, memory_bytes=1 << 20, disk_dir=str(tmp_path))
+    disk = reopened.get_many(["diabetes"])[0]["diabetes"]
+
+    assert fresh.dtype == memory.dtype == disk.dtype == np.float32
+    assert np.array_equal(fresh, memory) and np.array_equal(memory, disk)
+
+
+def test_disk_embedding_store_recovers_from_torn_index_line(tmp_path):
+    import numpy as np
+    from app.core.embedding_cache import DiskEmbeddingStore
+
+    store = DiskEmbeddingStore(str(tmp_path), "model", 4)
+    store.put_many([("asthma", np.ones(4, dtype=np.float32))])
+    # A writer crashed halfway through its index line
+    with open(store._index_path, "a", encoding="utf-8") as f:
+        f.write('"diabe')
+
+    store.put_many([("diabetes", np.full(4, 2, dtype=np.float32))])
+    reopened = DiskEmbeddingStore(str(tmp_path), "model", 4)
+    assert len(reopened) == 2
+    assert reopened.get("diabetes").tolist() == [2.0] * 4
+    assert reopened.get("asthma").tolist() == [1.0] * 4
+
+
+# Admission control (user-002)
+
+def test_admission_rejects_when_full_and_times_out_queued_callers():
+    import asyncio
+    import threading
+    from app.services.admission_control import AdmissionController
+    from app.utils.exceptions import AdmissionRejectedError
+
+    release = threading.Event()
+    controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=0.2, retry_after=7)
+
+    async def scenario():
+        running = asyncio.ensure_future(controller.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(controller.run(lambda: "queued"))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(AdmissionRejectedError) as full:
+            await controller.run(lambda: "rejected")
+        with pytest.raises(AdmissionRejectedError) as timed_out:
+            await queued
+        release.set()
+        assert await running is True
+        return full.value, timed_out.value
+
+    try:
+        full, timed_out = asyncio.run(scenario())
+    finally:
+        release.set()
+        controller.shutdown()
+
+    assert (full.status_code, full.retry_after) == (429, 7)
+    assert (timed_out.status_code, timed_out.retry_after) == (503, 7)
+    stats = controller.stats()
+    assert (stats["admitted"], stats["rejected"], stats["timed_out"]) == (2, 1, 1)
+
+
+# Completion cache size tracking (user-024)
+
+def test_completion_cache_tracks_size_without_queries(tmp_path, monkeypatch):
+    from app.core.completion_cache import CompletionCache
+
+    path = str(tmp_path / "completions.sqlite3")
+    cache = CompletionCache(path=path, max_mb=2500 / (1024 * 1024))
+    for index in range(5):
+        cache.put(f"key-{index}", "x" * 1000, tokens=10, model="groq/a")
+    cache.put("key-4", "y" * 500, tokens=5, model="groq/a")
+
+    # Stats come from the in-memory totals; the file is never touched
+    monkeypatch.setattr(cache, "_connection", lambda: pytest.fail("stats queried SQLite"))
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"]) == (2, 3)
+    assert stats["size_mb"] == round(1500 / (1024 * 1024), 2)
+
+    reopened = CompletionCache(path=path)
+    reopened.get("key-4")
+    assert (reopened._entries, reopened._size) == (2, 1500)
+
+
+# Local index compatibility (user-008)
+
+def test_local_index_rejects_other_embedding_model(tmp_path, monkeypatch):
+    import numpy as np
+    from app.core.vector_store import LocalVectorStore
+    from app.utils.exceptions import VectorSearchError
+
+    LocalVectorStore.write(
+        str(tmp_path / "icd10"), ids=["E11.9"], embeddings=np.ones((1, 8)), metadata=[{}],
+        manifest={"name": "icd10", "version": "1", "model": "Qwen/Qwen3-Embedding-0.6B", "runtime": "int8"}
+    )
+    monkeypatch.setattr(settings, "VECTOR_STORE_BACKEND", "local")
+    monkeypatch.setattr(settings, "LOCAL_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PINECONE_INDEX_ICD", "icd10")
+
+    matching = embedding_manager(model_id="Qwen/Qwen3-Embedding-0.6B@int8")
+    assert matching.get_index("ICD").describe()["model"] == "Qwen/Qwen3-Embedding-0.6B@int8"
+
+    with pytest.raises(VectorSearchError, match="int8"):
+        embedding_manager(model_id="Qwen/Qwen3-Embedding-0.6B").get_index("ICD")
+    with pytest.raises(VectorSearchError, match="dimension"):
+        embedding_manager(model_id="Qwen/Qwen3-Embedding-0.6B@int8", dimension=16).get_index("ICD")
+
+
+def test_local_vector_store_round_trip(tmp_path):
+    import numpy as np
+    from app.core.vector_store import LocalVectorStore, VectorStore
+
+    directory = str(tmp_path / "icd10")
+    embeddings = np.array([[1, 0, 0, 0], [0, 3, 0, 0], [1, 1, 0, 0]], dtype=np.float32)
+    LocalVectorStore.write(
+        directory, ids=["E11.9", "I10", "E10.9"], embeddings=embeddings,
+        metadata=[{"description": "T2DM"}, {"description": "HTN"}, {"description": "T1DM"}],
+        manifest={"name": "icd10", "version": "7"}
+    )
+    store = LocalVectorStore(directory)
+    assert store.embeddings.dtype == np.float16
+    assert store.describe()["count"] == 3 and store.version == "7"
+
+    # Stored rows are normalized, so scores are cosine similarities
+    matches = store.query([2, 0, 0, 0], top_k=2).matches
+    assert [m["id"] for m in matches] == ["E11.9", "E10.9"]
+    assert matches[0]["score"] == pytest.approx(1.0, abs=1e-3)
+    assert matches[1]["score"] == pytest.approx(0.7071, abs=1e-3)
+    assert matches[0]["metadata"] == {"description": "T2DM"}
+    assert len(store.query([0, 1, 0, 0], top_k=10).matches) == 3
+    assert "metadata" not in store.query([0, 1, 0, 0], top_k=1, include_metadata=False).matches[0]
+
+    # Query vectors from another embedding dimension are refused
+    with pytest.raises(ValueError, match="8 dimensions"):
+        store.query([0.1] * 8)
+
+    # A backend missing part of the interface fails when constructed
+    with pytest.raises(TypeError):
+        type("PartialStore", (VectorStore,), {"describe": lambda self: {}})()
+
+
+# Job status (user-001)
+
+def test_job_status_merges_deferred_evaluation_without_mutating_job(monkeypatch):
+    from app.models.jobs import StageStatus
+    from app.models.responses import PipelineResponse
+    import sys
+    from app.services.evaluation_service import EvaluationService
+
+    job_module = sys.modules["app.services.job_service"]
+
+    evaluations = EvaluationService(max_workers=1)
+    monkeypatch.setattr(job_module, "evaluation_service", evaluations)
+    service = job_module.JobService(max_workers=1)
+
+    job = job_module.CodingJob("text", "note", include_evaluation=True, stages=["entities", "evaluation"])
+    job.result = PipelineResponse(success=True, trace_id="trace-1", evaluation_status="pending")
+    job.stages["evaluation"] = StageStatus.pending
+    assert service.job_status(job).result.evaluation_status == "pending"
+
+    evaluations.submit("trace-1", lambda: None)
+    while not evaluations.get("trace-1").finished:
+        time.sleep(0.01)
+    evaluations.shutdown()
+
+    response = service.job_status(job)
+    assert response.result.evaluation_status == "completed"
+    assert response.stages["evaluation"] == StageStatus.completed
+    assert job.result.evaluation_status == "pending"
+    assert job.stages["evaluation"] == StageStatus.pending
+
+    with pytest.raises(TypeError):
+        type("PartialQueue", (job_module.JobQueue,), {"put": lambda self, job_id: None})()
+
+
+# Single-flight coalescing (user-018)
+
+def test_single_flight_coalesces_concurrent_callers():
+    import threading
+    from app.core.single_flight import SingleFlight
+
+    flights = SingleFlight(wait_timeout=5)
+    gate = threading.Event()
+    runs, events = [], []
+
+    def run(progress):
+        runs.append(1)
+        progress("entities", "completed", None)
+        gate.wait(5)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do("note", run)))
+    leader.start()
+    while not runs:
+        time.sleep(0.01)
+    follower = threading.Thread(target=lambda: results.append(
+        flights.do("note", run, progress_callback=lambda *event: events.append(event[:2]))
+    ))
+    follower.start()
+    while not flights._flights["note"].listeners:
+        time.sleep(0.01)
+    gate.set()
+    leader.join()
+    follower.join()
+
+    assert len(runs) == 1
+    assert sorted(results) == [("result", False), ("result", True)]
+    assert events == [("entities", "completed")]
+
+
+def test_single_flight_retry_does_not_replay_seen_progress():
+    import threading
+    from app.core.single_flight import SingleFlight
+
+    flights = SingleFlight(wait_timeout=5)
+    events = []
+    first_gate, second_gate, second_started = threading.Event(), threading.Event(), threading.Event()
+
+    def failing_run(progress):
+        progress("entities", "completed", None)
+        first_gate.wait(5)
+        return "failed"
+
+    def second_run(progress):
+        progress("entities", "completed", None)
+        second_started.set()
+        second_gate.wait(5)
+        progress("icd_codes", "completed", None)
+        return "ok"
+
+    second_leader = threading.Thread(target=lambda: flights.do("note", second_run))
+
+    def is_transient_failure(result):
+        # Runs in the follower once the first leader has landed: start the
+        # next run and let it report progress before the follower rejoins
+        if result == "failed":
+            second_leader.start()
+            second_started.wait(5)
+            return True
+        return False
+
+    first_leader = threading.Thread(target=lambda: flights.do("note", failing_run))
+    first_leader.start()
+    while "note" not in flights._flights:
+        time.sleep(0.01)
+    result = []
+    follower = threading.Thread(target=lambda: result.append(flights.do(
+        "note", second_run, progress_callback=lambda *event: events.append(event[:2]),
+        is_transient_failure=is_transient_failure
+    )))
+    follower.start()
+    while not flights._flights["note"].listeners:
+        time.sleep(0.01)
+    first_gate.set()
+    second_started.wait(5)
+    while not flights._flights["note"].listeners:
+        time.sleep(0.01)
+    second_gate.set()
+    for thread in (first_leader, follower, second_leader):
+        thread.join(5)
+
+    assert result == [("ok", True)]
+    assert events.count(("entities", "completed")) == 1
+    assert flights.stats()["follower_retries"] == 1
+
+
+def test_single_flight_shares_permanent_failures():
+    import threading
+    from app.core.single_flight import SingleFlight
+
+    flights = SingleFlight(wait_timeout=5)
+    gate, runs = threading.Event(), []
+
+    def bad_pdf(progress):
+        runs.append(1)
+        gate.wait(5)
+        raise ValueError("not a PDF")
+
+    outcomes = []
+
+    def call():
+        try:
+            flights.do("pdf", bad_pdf, progress_callback=lambda *event: None)
+        except ValueError as e:
+            outcomes.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    threads[0].start()
+    while not runs:
+        time.sleep(0.01)
+    for thread in threads[1:]:
+        thread.start()
+    while len(flights._flights["pdf"].listeners) < 3:
+        time.sleep(0.01)
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(runs) == 1
+    assert outcomes == ["not a PDF"] * 3
+    assert flights.stats()["follower_retries"] == 0
+
+
+# Batched embeddings in the search tools (user-004)
+
+def test_search_terms_are_deduplicated_and_embedded_in_one_batch():
+    from app.core.embedding_cache import EmbeddingCache
+    from app.utils.text_utils import dedupe_terms
+
+    terms = dedupe_terms(["Type 2  Diabetes", "type 2 diabetes", " Hypertension ", ""])
+    assert terms == {"type 2 diabetes": "Type 2  Diabetes", "hypertension": "Hypertension"}
+
+    model = CountingEmbedder(8)
+    manager = embedding_manager(model, embedding_cache=EmbeddingCache("model", 8, memory_bytes=1 << 20))
+    vectors = manager.get_embeddings(list(terms))
+    assert model.batches == [["type 2 diabetes", "hypertension"]]
+    assert len(vectors) == 2 and len(vectors[0]) == 8
+
+    # Known terms come from the cache; only the new one is encoded
+    again = manager.get_embeddings(["hypertension", "asthma", "type 2 diabetes"])
+    assert model.batches[1:] == [["asthma"]]
+    assert again[0] == vectors[1] and again[2] == vectors[0]
+
+
+# Concurrent index queries (user-005)
+
+def test_index_queries_run_concurrently_and_failures_stay_in_place(monkeypatch):
+    pytest.importorskip("toon_format")
+    import threading
+    from app.core.vector_store import QueryResult
+    from app.tools import vector_search
+    from app.utils.compression import compress_vector_db_response
+
+    manager = embedding_manager(CountingEmbedder(8))
+    monkeypatch.setattr(manager, "index_namespace", lambda code_system: "cpt@1")
+    monkeypatch.setattr(vector_search, "vector_db", manager)
+    monkeypatch.setattr(settings, "RETRIEVAL_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LEXICAL_SEARCH_ENABLED", False)
+
+    # Both healthy queries must be in flight at once to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    class Index:
+        def query(self, vector, top_k, include_metadata=True):
+            if vector == manager.get_embedding("broken"):
+                raise RuntimeError("index unavailable")
+            barrier.wait()
+            return QueryResult([{"id": "99213", "score": 0.9, "metadata": {"description": "visit"}}])
+
+    results, failures = vector_search.search_vector_index(
+        ["office visit", "broken", "follow up"], Index(), compress_vector_db_response,
+        "CPT", "procedure term"
+    )
+    assert [block.splitlines()[0] for block in results] == [
+        "Results for procedure term 'office visit':",
+        "Results for procedure term 'broken':",
+        "Results for procedure term 'follow up':",
+    ]
+    assert "99213" in results[0] and "99213" in results[2]
+    assert "ERROR: CPT search failed" in results[1]
+    assert failures == [{"term": "broken", "error": "index unavailable"}]
+
+
+# Retrieval result cache (user-007)
+
+def test_retrieval_cache_expires_evicts_and_invalidates(monkeypatch):
+    from app.core import retrieval_cache as cache_module
+
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = cache_module.RetrievalCache(max_entries=2, ttl_seconds=60)
+
+    cache.put("icd10@1|dense", "diabetes", 5, "E11.9")
+    cache.put("cpt@1|dense", "office visit", 5, "99213")
+    assert cache.get("icd10@1|dense", "diabetes", 5) == "E11.9"
+    assert cache.get("icd10@2|dense", "diabetes", 5) is None  # version bump
+    assert cache.get("icd10@1|dense", "diabetes", 3) is None  # other top_k
+
+    # Least recently used entry goes first
+    cache.put("cpt@1|dense", "follow up", 5, "99214")
+    assert cache.get("cpt@1|dense", "office visit", 5) is None
+    assert cache.stats()["evictions"] == 1
+
+    now[0] += 61
+    assert cache.get("icd10@1|dense", "diabetes", 5) is None
+    assert cache.stats()["expirations"] == 1
+
+    cache.put("icd10@1|dense", "diabetes", 5, "E11.9")
+    assert cache.invalidate("icd10") == 1
+    assert cache.get("cpt@1|dense", "follow up", 5) is None  # expired, not invalidated
+    assert cache.stats()["invalidations"] == 1
+
+
+# Embedding micro-batcher (user-013)
+
+def test_micro_batcher_coalesces_concurrent_callers():
+    import threading
+    import numpy as np
+    from app.core.embedding_batcher import EmbeddingBatcher
+
+    model = CountingEmbedder(8)
+    batcher = EmbeddingBatcher(model.encode, max_batch_size=16, max_wait_ms=200)
+    requests = [["diabetes", "asthma"], ["asthma"], ["hypertension", "diabetes"]]
+    results = [None] * len(requests)
+
+    def call(position):
+        results[position] = batcher.encode(requests[position])
+
+    threads = [threading.Thread(target=call, args=(position,)) for position in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(model.batches) == 1
+    assert sorted(model.batches[0]) == ["asthma", "diabetes", "hypertension"]
+    for texts, rows in zip(requests, results):
+        assert np.array_equal(rows, model.model.encode(texts))
+    assert batcher.stats()["duplicate_texts"] == 2
+
+    def failing(texts):
+        raise RuntimeError("model crashed")
+
+    batcher.encode_fn = failing
+    with pytest.raises(RuntimeError, match="model crashed"):
+        batcher.encode(["asthma"])
+
+
+# Hedged stage requests (user-023)
+
+def _hedger(monkeypatch, default_delay=0.01, min_delay=0.01, **options):
+    """StageHedger for ``icd_codes`` with short hedge delays"""
+    from app.core.hedging import StageHedger
+
+    monkeypatch.setattr(settings, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "HEDGE_DEFAULT_DELAY_SECONDS", default_delay)
+    monkeypatch.setattr(settings, "HEDGE_MIN_DELAY_SECONDS", min_delay)
+    hedger = StageHedger(percentile=95, min_samples=3, **options)
+    hedger.stages = {"icd_codes"}
+    return hedger
+
+
+def test_hedge_wins_and_cancels_the_slow_primary(monkeypatch):
+    import threading
+    from app.core.hedging import hedge_cancel_hook
+    from app.core.llm_hooks import LLMCall, run_llm_call
+    from app.utils.exceptions import HedgeCancelledError
+
+    hedger = _hedger(monkeypatch, default_delay=0.05, min_delay=0.5, budget_ratio=1.0)
+
+    released, primary_outcome = threading.Event(), []
+
+    def llm_call():
+        return run_llm_call([hedge_cancel_hook], LLMCall("groq/a", []), lambda: "sent")
+
+    def primary():
+        released.wait(5)
+        try:
+            return llm_call()
+        except HedgeCancelledError as e:
+            primary_outcome.append(e)
+            raise
+
+    result, info = hedger.run("icd_codes", primary, llm_call, "groq/b", is_valid=lambda r: r == "sent")
+    released.set()
+    assert result == "sent"
+    assert info == {"hedge_model": "groq/b", "hedge_after_seconds": 0.05, "served_by": "hedge"}
+
+    deadline = time.monotonic() + 5
+    while not primary_outcome and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert primary_outcome, "the losing primary reached the provider"
+    assert hedger.stats()["stages"]["icd_codes"]["hedge_wins"] == 1
+
+    # Fast observed durations never push the hedge delay below the floor
+    for _ in range(3):
+        hedger._record("icd_codes", 0.01)
+    assert hedger.delay("icd_codes") == 0.5
+
+
+def test_hedge_budget_allowance_and_worker_cap(monkeypatch):
+
+    def slow_primary():
+        time.sleep(0.2)
+        return "primary"
+
+    def run(hedger):
+        return hedger.run("icd_codes", slow_primary, lambda: "hedge", "groq/b", is_valid=bool)
+
+    # No ratio budget yet: the allowance alone lets the first slow call hedge
+    hedger = _hedger(monkeypatch, budget_ratio=0.0, budget_allowance=1, max_workers=4)
+    assert run(hedger) == ("hedge", {"hedge_model": "groq/b", "hedge_after_seconds": 0.01, "served_by": "hedge"})
+    assert run(hedger) == ("primary", None)
+    counters = hedger.stats()["stages"]["icd_codes"]
+    assert counters["hedged"] == 1 and counters["budget_denied"] == 1
+
+    # With every worker busy the stage runs unhedged instead of spawning threads
+    hedger = _hedger(monkeypatch, budget_ratio=1.0, max_workers=1)
+    assert run(hedger) == ("primary", None)
+    counters = hedger.stats()["stages"]["icd_codes"]
+    assert counters["hedged"] == 0 and counters["saturated"] == 1